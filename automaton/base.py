@@ -12,6 +12,9 @@ from automaton.context import AutomatonContext
 class AutomatonCoroutine(ABC):
     """Базовый класс для корутин автомата."""
     
+    # Приглашение ко вводу, которое менеджер выводит после run()
+    prompt = "Ваш выбор: "
+    
     def __init__(self, context: AutomatonContext):
         self.context = context
         self.next_state: Optional[State] = None
@@ -0,0 +1,78 @@
+"""
+Асинхронный ввод с консоли для автомата.
+
+Встроенный ``input()`` блокирует цикл событий целиком. ``AsyncConsole``
+читает stdin в отдельном потоке и передаёт строки в цикл через очередь,
+так что корутины ждут ввода через ``await`` и не мешают фоновым задачам.
+"""
+
+import asyncio
+import sys
+import threading
+
+
+class AsyncConsole:
+    """
+    Построчный ввод из stdin без блокировки цикла событий.
+    
+    Создаётся внутри работающего цикла. Поток чтения запускается при первом
+    запросе ввода и живёт до конца stdin; строки, набранные заранее,
+    дожидаются своей очереди.
+    """
+    
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdin
+        self._loop = asyncio.get_running_loop()
+        self._lines = asyncio.Queue()
+        self._reader = None
+        self._eof = False
+        # Приглашение, которое сейчас ждёт ввода (для повторного вывода)
+        self._prompt = None
+    
+    def _start_reader(self):
+        self._reader = threading.Thread(target=self._read_loop, name="console-reader", daemon=True)
+        self._reader.start()
+    
+    def _read_loop(self):
+        while True:
+            line = self.stream.readline()
+            try:
+                self._loop.call_soon_threadsafe(self._lines.put_nowait, line or None)
+            except RuntimeError:
+                # Цикл уже закрыт: программа завершается
+                return
+            if not line:
+                return
+    
+    async def input(self, prompt=""):
+        """
+        Аналог ``input()``: выводит приглашение и ждёт строку без ``\\n``.
+        
+        Raises
+        ------
+        EOFError
+            Если stdin закончился
+        """
+        if self._eof:
+            raise EOFError
+        if self._reader is None:
+            self._start_reader()
+        
+        print(prompt, end="", flush=True)
+        self._prompt = prompt
+        try:
+            line = await self._lines.get()
+        finally:
+            self._prompt = None
+        
+        if line is None:
+            self._eof = True
+            raise EOFError
+        return line.rstrip("\r\n")
+    
+    def notify(self, text):
+        """Выводит сообщение фоновой задачи, не теряя текущее приглашение."""
+        if self._prompt is None:
+            print(text)
+        else:
+            print(f"\n{text}\n{self._prompt}", end="", flush=True)
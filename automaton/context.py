@@ -2,12 +2,14 @@
 Контекст для хранения данных между состояниями.
 """
 
+from pointset import PointSet
+
 
 class AutomatonContext:
     """Контекст для хранения данных между состояниями."""
     
     def __init__(self):
-        self.points = []
+        self.points = PointSet()
         self.method = None
         self.result = None
         self.methods_map = {
@@ -15,4 +17,21 @@ class AutomatonContext:
             '2': ('sequential', 'Последовательный'),
             '3': ('min_sum', 'Минимальная сумма'),
             '4': ('min_x', 'Минимальный X')
-        }
\ No newline at end of file
+        }
+        # Асинхронный ввод с консоли (AsyncConsole), задаётся менеджером
+        self.console = None
+        # Фоновая обработка: задача и её собственные точки, метод и результат,
+        # чтобы не затирать набор, с которым пользователь работает сейчас
+        self.background = None
+        self.background_points = None
+        self.background_method = None
+        self.background_result = None
+    
+    def set_points(self, points):
+        """Заменяет точки; результат прежних точек к новым не относится."""
+        self.points = points
+        self.method = None
+        self.result = None
+    
+    def background_running(self):
+        return self.background is not None and not self.background.done()
\ No newline at end of file
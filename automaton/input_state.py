@@ -4,7 +4,7 @@
 
 from typing import Optional
 from exceptions import InvalidMenuChoiceException
-from input_data import input_by_hand, make_random_points
+from input_data import input_by_hand_async, make_random_points
 from automaton.base import AutomatonCoroutine
 from automaton.context import AutomatonContext
 from automaton.states import State
@@ -52,19 +52,19 @@ class InputState(AutomatonCoroutine):
     async def _input_manual(self):
         """Ручной ввод точек."""
         print("\nРУЧНОЙ ВВОД")
-        points = input_by_hand()
-        self.context.points = points
+        points = await input_by_hand_async(self.context.console.input)
+        self.context.set_points(points)
     
     async def _input_random(self):
         """Случайная генерация точек."""
         print("\nСЛУЧАЙНАЯ ГЕНЕРАЦИЯ")
         try:
-            n = int(input("Сколько точек создать? (5): ") or "5")
+            n = int(await self.context.console.input("Сколько точек создать? (5): ") or "5")
             if n <= 0:
                 raise ValueError("Количество должно быть положительным")
             
             points = make_random_points(n)
-            self.context.points = points
+            self.context.set_points(points)
             
         except ValueError as e:
             print(f"Ошибка: {e}")
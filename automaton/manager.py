@@ -3,15 +3,22 @@
 """
 
 import asyncio
+import importlib
 from exceptions import InvalidMenuChoiceException
 
 from automaton.states import State
+from automaton.console import AsyncConsole
 from automaton.context import AutomatonContext
-from automaton.menu_state import MenuState
-from automaton.input_state import InputState
-from automaton.process_state import ProcessState
-from automaton.view_state import ViewState
-from automaton.exit_state import ExitState
+
+
+# Модуль и класс корутины каждого состояния: импортируются при первом входе
+STATE_CLASSES = {
+    State.MENU: ("automaton.menu_state", "MenuState"),
+    State.INPUT: ("automaton.input_state", "InputState"),
+    State.PROCESS: ("automaton.process_state", "ProcessState"),
+    State.VIEW: ("automaton.view_state", "ViewState"),
+    State.EXIT: ("automaton.exit_state", "ExitState"),
+}
 
 
 class AutomatonManager:
@@ -20,17 +27,24 @@ class AutomatonManager:
     def __init__(self):
         self.state = State.MENU
         self.context = AutomatonContext()
-        self.coroutines = {
-            State.MENU: MenuState(self.context),
-            State.INPUT: InputState(self.context),
-            State.PROCESS: ProcessState(self.context),
-            State.VIEW: ViewState(self.context),
-            State.EXIT: ExitState(self.context)
-        }
+        self.coroutines = {}
+    
+    def get_coroutine(self, state):
+        """Корутина состояния; создаётся при первом обращении."""
+        coroutine = self.coroutines.get(state)
+        if coroutine is None:
+            module_name, class_name = STATE_CLASSES[state]
+            coroutine_class = getattr(importlib.import_module(module_name), class_name)
+            coroutine = self.coroutines[state] = coroutine_class(self.context)
+        return coroutine
     
     def run(self):
         """Основной цикл автомата."""
-        asyncio.run(self._run_async())
+        try:
+            asyncio.run(self._run_async())
+        except KeyboardInterrupt:
+            # Повторный Ctrl+C во время ожидания фоновой обработки
+            print("\n\nПрограмма прервана")
     
     async def _run_async(self):
         """Асинхронный основной цикл автомата."""
@@ -39,10 +53,12 @@ class AutomatonManager:
         print("ОБРАБОТКА ТОЧЕК НА ПЛОСКОСТИ")
         print("="*50)
         
+        self.context.console = AsyncConsole()
+        
         while self.state != State.EXIT:
             try:
                 # Получаем текущую корутину
-                coroutine = self.coroutines[self.state]
+                coroutine = self.get_coroutine(self.state)
                 
                 # Запускаем корутину
                 next_state = await coroutine.run()
@@ -52,25 +68,33 @@ class AutomatonManager:
                     self.state = next_state
                     continue
                 
-                # Получаем ввод пользователя
-                if self.state == State.MENU:
-                    prompt = "Ваш выбор (1-3): "
-                else:
-                    prompt = "Ваш выбор: "
-                
-                user_input = input(prompt).strip()
+                # Получаем ввод пользователя, не блокируя фоновые задачи
+                user_input = (await self.context.console.input(coroutine.prompt)).strip()
                 
                 # Обрабатываем ввод через корутину
                 success = await coroutine.handle_input(user_input)
                 
                 if success and coroutine.next_state:
                     self.state = coroutine.next_state
-                
+            
             except InvalidMenuChoiceException as e:
                 print(f"{e}")
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                # asyncio.run превращает Ctrl+C в отмену главной задачи
                 print("\n\nПрограмма прервана")
                 self.state = State.EXIT
+            except EOFError:
+                print("\n\nВвод закончен")
+                self.state = State.EXIT
             except Exception as e:
                 print(f"Критическая ошибка: {e}")
-                self.state = State.MENU
\ No newline at end of file
+                self.state = State.MENU
+        
+        await self._wait_background()
+    
+    async def _wait_background(self):
+        """Дожидается фоновой обработки: поток с расчётом прервать нельзя."""
+        if not self.context.background_running():
+            return
+        print("Дожидаемся завершения фоновой обработки (Ctrl+C — выйти, не дожидаясь)...")
+        await asyncio.wait([self.context.background])
\ No newline at end of file
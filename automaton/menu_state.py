@@ -2,12 +2,24 @@
 Состояние главного меню.
 """
 
+import asyncio
 from typing import Optional
 from exceptions import InvalidMenuChoiceException
 from automaton.base import AutomatonCoroutine
 from automaton.context import AutomatonContext
 from automaton.states import State
-from points import process_points
+from pointset import format_point
+
+
+# Сколько точек выводить из большого фонового набора
+PREVIEW_POINTS = 10
+
+
+def _preview(points):
+    shown = ", ".join(map(format_point, points[:PREVIEW_POINTS]))
+    if len(points) > PREVIEW_POINTS:
+        shown += f", ... и ещё {len(points) - PREVIEW_POINTS}"
+    return f"[{shown}]"
 
 
 class MenuState(AutomatonCoroutine):
@@ -16,6 +28,13 @@ class MenuState(AutomatonCoroutine):
     def __init__(self, context: AutomatonContext):
         super().__init__(context)
     
+    @property
+    def prompt(self) -> str:
+        return f"Ваш выбор (1-{4 if self._has_result() else 3}): "
+    
+    def _has_result(self) -> bool:
+        return self.context.background_result is not None
+    
     async def run(self) -> Optional[State]:
         print("\n" + "="*40)
         print("ГЛАВНОЕ МЕНЮ")
@@ -23,16 +42,23 @@ class MenuState(AutomatonCoroutine):
         print("1. Обработать точки")
         print("2. Сравнить все методы")
         print("3. Выход")
+        if self._has_result():
+            print("4. Результаты фоновой обработки")
+        if self.context.background_running():
+            print("(идёт фоновая обработка; выход дождётся её завершения)")
         print("-"*40)
         
         return None
     
     async def handle_input(self, choice: str) -> bool:
-        valid_choices = {'1', '2', '3'}
+        valid_choices = {'1', '2', '3', '4'} if self._has_result() else {'1', '2', '3'}
         if choice not in valid_choices:
             raise InvalidMenuChoiceException(choice, valid_choices)
         
-        if choice == '1':
+        if choice == '4':
+            self.next_state = State.MENU
+            await self._show_background_result()
+        elif choice == '1':
             self.next_state = State.INPUT
         elif choice == '2':
             self.next_state = State.MENU
@@ -42,6 +68,26 @@ class MenuState(AutomatonCoroutine):
         
         return True
     
+    async def _show_background_result(self):
+        """Результат фоновой обработки вместе с точками, для которых он считался."""
+        points = self.context.background_points
+        result = self.context.background_result
+        method_name = next(
+            (name for code, name in self.context.methods_map.values()
+             if code == self.context.background_method),
+            self.context.background_method,
+        )
+        
+        print("\n" + "="*40)
+        print("РЕЗУЛЬТАТЫ ФОНОВОЙ ОБРАБОТКИ")
+        print("="*40)
+        print(f"Метод: {method_name}")
+        print(f"Точек: {len(points)}")
+        print(f"Исходные точки: {_preview(points)}")
+        print(f"Результат: {_preview(result)}")
+        
+        await self.context.console.input("\nНажмите Enter для продолжения...")
+    
     async def _compare_methods(self):
         """Сравнение всех методов обработки."""
         if not self.context.points:
@@ -53,13 +99,20 @@ class MenuState(AutomatonCoroutine):
         print("СРАВНЕНИЕ ВСЕХ МЕТОДОВ")
         print("="*40)
         
+        try:
+            # Модуль обработки нужен только для сравнения, меню без него открывается быстрее
+            from points import process_all_methods
+            # Считаем в потоке, чтобы фоновые задачи цикла не стояли
+            results, errors = await asyncio.to_thread(process_all_methods, self.context.points)
+        except Exception as e:
+            print(f"Ошибка сравнения: {e}")
+            results, errors = {}, {}
+        
         for method_key, (method_code, method_name) in self.context.methods_map.items():
-            try:
-                result = process_points(self.context.points, method_code)
+            if method_code in results:
                 print(f"{method_name}:")
-                print(f"   Результат: {result}")
-            except Exception as e:
-                print(f"{method_name}: ошибка - {e}")
+                print(f"   Результат: {results[method_code]}")
+            elif method_code in errors:
+                print(f"{method_name}: ошибка - {errors[method_code]}")
         
-        print("\nНажмите Enter для продолжения...")
-        input()
\ No newline at end of file
+        await self.context.console.input("\nНажмите Enter для продолжения...")
\ No newline at end of file
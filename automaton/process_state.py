@@ -2,6 +2,8 @@
 Состояние выбора метода обработки.
 """
 
+import asyncio
+import threading
 from typing import Optional
 from exceptions import InvalidMenuChoiceException
 from points import process_points
@@ -10,6 +12,10 @@ from automaton.context import AutomatonContext
 from automaton.states import State
 
 
+# Наборы больше этого размера обрабатываются в фоне, а меню остаётся доступным
+BACKGROUND_MIN_POINTS = 20000
+
+
 class ProcessState(AutomatonCoroutine):
     """Состояние выбора метода обработки."""
     
@@ -43,14 +49,76 @@ class ProcessState(AutomatonCoroutine):
             return True
         
         method_code, method_name = self.context.methods_map[choice]
-        self.context.method = method_code
         
+        if len(self.context.points) > BACKGROUND_MIN_POINTS:
+            return self._start_background(method_code, method_name)
+        
+        self.context.method = method_code
         try:
             print(f"\nОбработка методом '{method_name}'...")
             self.context.result = process_points(self.context.points, method_code)
             self.next_state = State.VIEW
             return True
-            
+        
         except Exception as e:
             print(f"Ошибка обработки: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def _start_background(self, method_code: str, method_name: str) -> bool:
+        """Запускает обработку в фоне и возвращает в главное меню."""
+        if self.context.background_running():
+            print("Фоновая обработка ещё идёт, дождитесь результата")
+            return False
+        
+        print(f"\nОбработка {len(self.context.points)} точек методом '{method_name}' запущена в фоне.")
+        print("Результат появится в главном меню, когда будет готов.")
+        self.context.background = asyncio.create_task(
+            self._process_in_background(self.context.points, method_code, method_name)
+        )
+        self.next_state = State.MENU
+        return True
+    
+    async def _process_in_background(self, points, method_code: str, method_name: str) -> None:
+        console = self.context.console
+        try:
+            result = await _run_in_daemon_thread(process_points, points, method_code)
+        except Exception as e:
+            console.notify(f"❌ Ошибка фоновой обработки методом '{method_name}': {e}")
+            return
+        
+        # Текущий набор не трогаем: пользователь мог уже ввести новые точки
+        self.context.background_points = points
+        self.context.background_method = method_code
+        self.context.background_result = result
+        console.notify(f"✅ Обработка методом '{method_name}' завершена: пункт 4 главного меню")
+
+
+async def _run_in_daemon_thread(func, *args):
+    """
+    Выполняет ``func(*args)`` в потоке-демоне и ждёт результат.
+    
+    В отличие от ``asyncio.to_thread`` такой поток не держит выход
+    из программы, если пользователь прервал её, не дождавшись расчёта.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def deliver(setter, value):
+        if not future.done():
+            setter(value)
+    
+    def target():
+        try:
+            result = func(*args)
+        except BaseException as e:
+            outcome = (future.set_exception, e)
+        else:
+            outcome = (future.set_result, result)
+        try:
+            loop.call_soon_threadsafe(deliver, *outcome)
+        except RuntimeError:
+            # Цикл уже закрыт: результат больше никому не нужен
+            pass
+    
+    threading.Thread(target=target, name="background-processing", daemon=True).start()
+    return await future
\ No newline at end of file
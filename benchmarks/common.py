@@ -0,0 +1,71 @@
+"""Общие части бенчмарков: описание окружения, статистика, JSON-отчёты."""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+
+def environment():
+    """Сведения о машине и версии кода, с которыми снят отчёт."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def summarize(samples):
+    """Распределение замеров: минимум, медиана, среднее, отклонение, p95, максимум."""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "max": ordered[-1],
+    }
+
+
+def write_report(report, path=None):
+    """Пишет отчёт в файл или, если путь не задан, в stdout."""
+    if path is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def read_report(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def parse_sizes(text):
+    """Разбирает список размеров вида ``10,100,1e3,10**4``."""
+    sizes = []
+    for item in text.split(","):
+        item = item.strip()
+        if "**" in item:
+            base, power = item.split("**")
+            sizes.append(int(base) ** int(power))
+        else:
+            sizes.append(int(float(item)))
+    return sizes
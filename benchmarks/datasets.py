@@ -0,0 +1,54 @@
+"""
+Наборы точек для бенчмарков.
+
+Каждое распределение воспроизводимо по ``seed`` и отдаётся как ``PointSet`` —
+в том же виде, в каком точки приходят в обработку из бота и консоли.
+"""
+
+import random
+
+from pointset import PointSet
+
+
+DISTRIBUTIONS = ("uniform", "clustered", "duplicates", "collinear")
+
+# Координаты лежат в квадрате [-SPAN, SPAN]
+SPAN = 1000.0
+
+
+def make_points(distribution, n, seed=0):
+    """
+    Генерирует ``n`` точек заданного распределения.
+    
+    - ``uniform`` — равномерно по квадрату;
+    - ``clustered`` — 20 плотных гауссовых скоплений;
+    - ``duplicates`` — около 5% различных точек, остальные их повторы;
+    - ``collinear`` — все точки на одной прямой (худший случай для k-d дерева).
+    
+    Raises
+    ------
+    ValueError
+        Если распределение неизвестно
+    """
+    rng = random.Random(f"{distribution}:{n}:{seed}")
+    points = PointSet()
+    
+    if distribution == "uniform":
+        points.extend((rng.uniform(-SPAN, SPAN), rng.uniform(-SPAN, SPAN)) for _ in range(n))
+    elif distribution == "clustered":
+        centers = [(rng.uniform(-SPAN, SPAN), rng.uniform(-SPAN, SPAN)) for _ in range(20)]
+        for _ in range(n):
+            cx, cy = rng.choice(centers)
+            points.append((rng.gauss(cx, 5.0), rng.gauss(cy, 5.0)))
+    elif distribution == "duplicates":
+        pool = [(float(rng.randint(-100, 100)), float(rng.randint(-100, 100)))
+                for _ in range(max(1, n // 20))]
+        points.extend(rng.choice(pool) for _ in range(n))
+    elif distribution == "collinear":
+        for _ in range(n):
+            x = rng.uniform(-SPAN, SPAN)
+            points.append((x, 2.0 * x + 1.0))
+    else:
+        raise ValueError(f"неизвестное распределение: {distribution}")
+    
+    return points
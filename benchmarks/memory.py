@@ -0,0 +1,308 @@
+"""
+Замеры памяти методов обработки точек.
+
+Для каждого метода ``process_points`` и для ``distance.find_closest``
+на наборах разных размеров и распределений снимаются:
+
+- ``peak_bytes`` — пик выделений Python во время вызова (tracemalloc);
+- ``retained_bytes`` — сколько осталось выделено после вызова вместе
+  с результатом, ``leaked_bytes`` — сколько осталось после удаления результата;
+- ``rss_peak_delta_bytes`` — прирост RSS процесса над уровнем до вызова,
+  по фоновой выборке ``/proc/self/statm`` (отдельный прогон без tracemalloc,
+  который сам расходует память).
+
+Каждый случай по умолчанию считается в отдельном процессе, чтобы RSS
+не наследовал кучу предыдущих случаев. Потолки задаются JSON-файлом
+(см. ``memory_ceilings.json``); при превышении хотя бы одного процесс
+завершается с кодом 1.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.memory run --sizes 1e3,1e4,1e5 --output memory.json
+    python -m benchmarks.memory run --ceilings benchmarks/memory_ceilings.json
+"""
+
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+from benchmarks.common import environment, parse_sizes, write_report
+from benchmarks.datasets import DISTRIBUTIONS, make_points
+from distance import find_closest
+from points import METHODS, process_points
+
+
+DEFAULT_SIZES = "1000,10000,100000"
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CEILINGS = os.path.join(_REPO_ROOT, "benchmarks", "memory_ceilings.json")
+
+# Период выборки RSS в секундах
+RSS_SAMPLE_INTERVAL = 0.001
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def case_function(name):
+    """Функция от набора точек по имени случая."""
+    if name == "find_closest":
+        return lambda points: find_closest(points[len(points) // 2], points)
+    method = name[len("process_points["):-1]
+    return lambda points: process_points(points, method)
+
+
+def case_names(methods):
+    return [f"process_points[{method}]" for method in methods] + ["find_closest"]
+
+
+def current_rss():
+    """Текущий RSS процесса в байтах или None, если его не узнать."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RSSSampler(threading.Thread):
+    """Фоновый поток, запоминающий максимальный RSS за время работы."""
+    
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = current_rss()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+            time.sleep(self.interval)
+    
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+        return self.peak
+
+
+def measure_case(name, distribution, n, seed=0):
+    """Замеряет один случай в текущем процессе."""
+    func = case_function(name)
+    points = make_points(distribution, n, seed=seed)
+    input_bytes = points.nbytes
+    
+    # Прогон 1: RSS без накладных расходов tracemalloc
+    gc.collect()
+    rss_before = current_rss()
+    sampler = RSSSampler()
+    sampler.start()
+    result = func(points)
+    rss_peak = sampler.stop()
+    del result
+    gc.collect()
+    
+    # Прогон 2: выделения Python
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    result = func(points)
+    retained, peak = tracemalloc.get_traced_memory()
+    del result
+    gc.collect()
+    leaked, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        "name": name,
+        "distribution": distribution,
+        "n": n,
+        "input_bytes": input_bytes,
+        "peak_bytes": peak - before,
+        "retained_bytes": retained - before,
+        "leaked_bytes": max(0, leaked - before),
+        "rss_before_bytes": rss_before,
+        "rss_peak_delta_bytes": None if rss_before is None else rss_peak - rss_before,
+    }
+
+
+def measure_isolated(name, distribution, n, seed=0):
+    """Замеряет случай в отдельном процессе интерпретатора."""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.memory", "case", name, distribution, str(n), "--seed", str(seed)],
+        capture_output=True, text=True, check=True, cwd=_REPO_ROOT,
+    )
+    return json.loads(completed.stdout)
+
+
+def load_ceilings(path):
+    """
+    Читает потолки: список правил вида
+    ``{"name": "process_points[*]", "distribution": "*", "peak_bytes_per_point": 200}``.
+    
+    Поддерживаемые ограничения: ``peak_mb``, ``retained_mb``, ``leaked_mb``,
+    ``rss_delta_mb`` и те же величины на точку — ``peak_bytes_per_point``,
+    ``retained_bytes_per_point``, ``rss_delta_bytes_per_point``. Необязательные
+    ``min_n``/``max_n`` ограничивают размеры, к которым правило применяется.
+    
+    Raises
+    ------
+    ValueError
+        Если правило не подходит ни к одному известному случаю (см. ``validate_ceilings``)
+    """
+    with open(path, encoding="utf-8") as f:
+        ceilings = json.load(f)["ceilings"]
+    validate_ceilings(ceilings)
+    return ceilings
+
+
+def match_pattern(pattern, value):
+    """
+    Сопоставляет имя случая с шаблоном правила.
+    
+    Работают только ``*`` и ``?``: квадратные скобки — часть имён вида
+    ``process_points[original]``, а не класс символов, как в ``fnmatch``.
+    """
+    escaped = "".join({"[": "[[]", "]": "[]]"}.get(char, char) for char in pattern)
+    return fnmatch.fnmatchcase(value, escaped)
+
+
+def validate_ceilings(ceilings, names=None, distributions=DISTRIBUTIONS):
+    """
+    Проверяет, что каждое правило подходит хотя бы к одному известному случаю
+    и распределению — опечатка в имени иначе молча отключила бы потолок.
+    
+    Raises
+    ------
+    ValueError
+        Если есть правила, не подходящие ни к чему
+    """
+    if names is None:
+        names = case_names(METHODS)
+    unmatched = [
+        rule for rule in ceilings
+        if not any(match_pattern(rule.get("name", "*"), name) for name in names)
+        or not any(match_pattern(rule.get("distribution", "*"), d) for d in distributions)
+    ]
+    if unmatched:
+        raise ValueError(f"Правила потолков не подходят ни к одному случаю: {unmatched}")
+
+
+_LIMITS = {
+    "peak_mb": ("peak_bytes", 1024 * 1024, False),
+    "retained_mb": ("retained_bytes", 1024 * 1024, False),
+    "leaked_mb": ("leaked_bytes", 1024 * 1024, False),
+    "rss_delta_mb": ("rss_peak_delta_bytes", 1024 * 1024, False),
+    "peak_bytes_per_point": ("peak_bytes", 1, True),
+    "retained_bytes_per_point": ("retained_bytes", 1, True),
+    "rss_delta_bytes_per_point": ("rss_peak_delta_bytes", 1, True),
+}
+
+
+def check_ceilings(results, ceilings):
+    """Возвращает список нарушений потолков."""
+    violations = []
+    for entry in results:
+        for rule in ceilings:
+            if not match_pattern(rule.get("name", "*"), entry["name"]):
+                continue
+            if not match_pattern(rule.get("distribution", "*"), entry["distribution"]):
+                continue
+            if not rule.get("min_n", 0) <= entry["n"] <= rule.get("max_n", float("inf")):
+                continue
+            
+            for limit, (field, scale, per_point) in _LIMITS.items():
+                if limit not in rule or entry.get(field) is None:
+                    continue
+                allowed = rule[limit] * scale * (entry["n"] if per_point else 1)
+                if entry[field] > allowed:
+                    violations.append({
+                        "name": entry["name"],
+                        "distribution": entry["distribution"],
+                        "n": entry["n"],
+                        "limit": limit,
+                        "allowed_bytes": allowed,
+                        "actual_bytes": entry[field],
+                    })
+    return violations
+
+
+def run(args):
+    sizes = parse_sizes(args.sizes)
+    measure = measure_case if args.no_isolate else measure_isolated
+    
+    results = []
+    for distribution in args.distributions.split(","):
+        for n in sizes:
+            for name in case_names(args.methods.split(",")):
+                entry = measure(name, distribution, n, seed=args.seed)
+                results.append(entry)
+                if args.verbose:
+                    print(f"{name:28} {distribution:11} n={n:<8} "
+                          f"peak={entry['peak_bytes'] / 2**20:8.2f} MiB  "
+                          f"retained={entry['retained_bytes'] / 2**20:8.2f} MiB  "
+                          f"rss+={(entry['rss_peak_delta_bytes'] or 0) / 2**20:8.2f} MiB",
+                          file=sys.stderr)
+    
+    ceilings = load_ceilings(args.ceilings) if args.ceilings else []
+    violations = check_ceilings(results, ceilings)
+    report = {
+        "benchmark": "memory",
+        "environment": environment(),
+        "config": {"seed": args.seed, "isolated": not args.no_isolate, "ceilings": args.ceilings},
+        "results": results,
+        "violations": violations,
+    }
+    write_report(report, args.output)
+    
+    for violation in violations:
+        print(f"ПРЕВЫШЕН ПОТОЛОК {violation['limit']}: {violation['name']} "
+              f"{violation['distribution']} n={violation['n']}: "
+              f"{violation['actual_bytes']} > {violation['allowed_bytes']:.0f} байт",
+              file=sys.stderr)
+    return 1 if violations else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = sub.add_parser("run", help="замерить память и проверить потолки")
+    run_parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    run_parser.add_argument("--distributions", default=",".join(DISTRIBUTIONS))
+    run_parser.add_argument("--methods", default=",".join(METHODS))
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--ceilings", default=DEFAULT_CEILINGS,
+                            help="JSON с потолками; пустая строка — без проверки")
+    run_parser.add_argument("--no-isolate", action="store_true",
+                            help="считать все случаи в этом процессе (RSS будет неточным)")
+    run_parser.add_argument("--output", help="файл отчёта (по умолчанию stdout)")
+    run_parser.add_argument("-v", "--verbose", action="store_true")
+    
+    # Служебная команда: один случай в отдельном процессе
+    case_parser = sub.add_parser("case")
+    case_parser.add_argument("name")
+    case_parser.add_argument("distribution")
+    case_parser.add_argument("n", type=int)
+    case_parser.add_argument("--seed", type=int, default=0)
+    
+    args = parser.parse_args(argv)
+    if args.command == "case":
+        json.dump(measure_case(args.name, args.distribution, args.n, seed=args.seed), sys.stdout)
+        return 0
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Бенчмарк методов обработки точек.
+
+Замеряет ``process_points`` для каждого метода и ``distance.find_closest``
+на наборах разных размеров и распределений (см. ``benchmarks.datasets``),
+с прогревом и повторами, и пишет JSON-отчёт. Режим сравнения сопоставляет
+два отчёта и завершается с кодом 1, если что-то замедлилось сильнее порога.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.processing run --output baseline.json
+    python -m benchmarks.processing run --sizes 10,1000,1e5 --baseline baseline.json
+    python -m benchmarks.processing compare baseline.json current.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+
+from benchmarks.common import environment, parse_sizes, read_report, summarize, write_report
+from benchmarks.datasets import DISTRIBUTIONS, make_points
+from distance import find_closest
+from points import METHODS, process_points
+
+
+DEFAULT_SIZES = "10,100,1000,10000,100000,1000000"
+
+# Короткие операции повторяются в цикле, пока один замер не займёт столько секунд
+MIN_SAMPLE_SECONDS = 0.001
+
+# Замедление медианы больше чем на THRESHOLD считается регрессией, если
+# при этом абсолютная разница больше MIN_DELTA_SECONDS (шум на микросекундах)
+DEFAULT_THRESHOLD = 0.10
+MIN_DELTA_SECONDS = 50e-6
+
+
+def cases(methods, backends):
+    """Замеряемые операции: (имя, функция от набора точек)."""
+    for backend in backends:
+        for method in methods:
+            name = f"process_points[{method}]"
+            if backend != "python":
+                name = f"process_points[{method},{backend}]"
+            yield name, lambda points, method=method, backend=backend: process_points(
+                points, method, backend=backend
+            )
+    yield "find_closest", lambda points: find_closest(points[len(points) // 2], points)
+
+
+def measure(func, points, repeat, warmup, budget):
+    """
+    Замеряет ``func(points)``: секунды на вызов для каждого повтора.
+    
+    Прогрев заодно определяет, сколько вызовов нужно на один замер, чтобы
+    он был не короче ``MIN_SAMPLE_SECONDS``. Повторы прекращаются, если
+    вместе с прогревом превышен бюджет ``budget`` секунд (но хотя бы один
+    замер делается всегда).
+    """
+    started = time.perf_counter()
+    single = None
+    for _ in range(max(1, warmup)):
+        t0 = time.perf_counter()
+        func(points)
+        single = time.perf_counter() - t0
+    loops = max(1, math.ceil(MIN_SAMPLE_SECONDS / max(single, 1e-9)))
+    
+    samples = []
+    while len(samples) < repeat:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            func(points)
+        samples.append((time.perf_counter() - t0) / loops)
+        if time.perf_counter() - started > budget:
+            break
+    return samples, loops
+
+
+def run(args):
+    sizes = parse_sizes(args.sizes)
+    distributions = args.distributions.split(",")
+    methods = args.methods.split(",")
+    backends = args.backends.split(",")
+    
+    results = []
+    for distribution in distributions:
+        for n in sizes:
+            points = make_points(distribution, n, seed=args.seed)
+            for name, func in cases(methods, backends):
+                samples, loops = measure(func, points, args.repeat, args.warmup, args.budget)
+                entry = {
+                    "name": name,
+                    "distribution": distribution,
+                    "n": n,
+                    "loops": loops,
+                    "samples": samples,
+                    "stats": summarize(samples),
+                }
+                results.append(entry)
+                if args.verbose:
+                    print(f"{name:36} {distribution:11} n={n:<8} "
+                          f"median={entry['stats']['median']:.6f}s", file=sys.stderr)
+    
+    report = {
+        "benchmark": "processing",
+        "environment": environment(),
+        "config": {
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "budget": args.budget,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    write_report(report, args.output)
+    
+    if args.baseline:
+        comparison = compare(read_report(args.baseline), report, args.threshold)
+        # Отчёт мог уйти в stdout, поэтому сравнение печатается в stderr
+        json.dump(comparison, sys.stderr, indent=2)
+        print(file=sys.stderr)
+        return 1 if comparison["regressions"] else 0
+    return 0
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Сравнивает медианы двух отчётов.
+    
+    Returns
+    -------
+    dict
+        ``regressions`` и ``improvements`` — случаи, изменившиеся сильнее
+        порога, ``missing`` — случаи из базового отчёта, которых нет в текущем
+    """
+    def key(entry):
+        return entry["name"], entry["distribution"], entry["n"]
+    
+    current_by_key = {key(entry): entry for entry in current["results"]}
+    regressions, improvements, missing = [], [], []
+    
+    for base in baseline["results"]:
+        cur = current_by_key.get(key(base))
+        if cur is None:
+            missing.append(dict(zip(("name", "distribution", "n"), key(base))))
+            continue
+        
+        before, after = base["stats"]["median"], cur["stats"]["median"]
+        change = {
+            "name": base["name"],
+            "distribution": base["distribution"],
+            "n": base["n"],
+            "baseline": before,
+            "current": after,
+            "ratio": after / before if before else math.inf,
+        }
+        if abs(after - before) <= MIN_DELTA_SECONDS:
+            continue
+        if after > before * (1 + threshold):
+            regressions.append(change)
+        elif after < before / (1 + threshold):
+            improvements.append(change)
+    
+    return {
+        "threshold": threshold,
+        "regressions": regressions,
+        "improvements": improvements,
+        "missing": missing,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.processing")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = sub.add_parser("run", help="замерить и записать отчёт")
+    run_parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    run_parser.add_argument("--distributions", default=",".join(DISTRIBUTIONS))
+    run_parser.add_argument("--methods", default=",".join(METHODS))
+    run_parser.add_argument("--backends", default="python", help="например python,numpy")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--budget", type=float, default=60.0, help="секунд на один случай")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="файл отчёта (по умолчанию stdout)")
+    run_parser.add_argument("--baseline", help="сразу сравнить с этим отчётом")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    run_parser.add_argument("-v", "--verbose", action="store_true")
+    
+    compare_parser = sub.add_parser("compare", help="сравнить два отчёта")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    
+    comparison = compare(read_report(args.baseline), read_report(args.current), args.threshold)
+    write_report(comparison)
+    return 1 if comparison["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
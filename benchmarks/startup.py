@@ -0,0 +1,312 @@
+"""
+Бенчмарк холодного старта консольного приложения и бота.
+
+Замеряет в свежих процессах интерпретатора:
+
+- ``import`` — время ``python -c "import <модуль>"`` за вычетом пустого
+  ``python -c pass`` и разбор ``-X importtime``: суммарное время импорта
+  модуля и самые дорогие из вложенных импортов;
+- ``first_prompt`` — время от запуска процесса до первого приглашения:
+  у консоли — до строки ``Ваш выбор`` в stdout, у бота — до первого
+  ``sendMessage`` в ответ на ``/start``. Бот ходит в заглушку Bot API,
+  поднятую здесь же (``TELEGRAM_BASE_URL``), так что сеть и токен не нужны.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.startup run --repeat 10 --output startup.json
+    python -m benchmarks.startup run --targets console -v
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.common import environment, summarize, write_report
+
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модуль, с импорта которого начинается каждая точка входа
+ENTRY_MODULES = {"console": "automaton.manager", "bot": "bot"}
+
+TARGETS = tuple(ENTRY_MODULES)
+
+CONSOLE_COMMAND = "from automaton.manager import AutomatonManager; AutomatonManager().run()"
+CONSOLE_PROMPT = "Ваш выбор"
+
+# Сколько секунд ждать приглашения, прежде чем считать запуск неудачным
+PROMPT_TIMEOUT = 60.0
+
+# Сколько самых дорогих вложенных импортов показывать
+TOP_IMPORTS = 15
+
+BOT_TOKEN = "123456:STARTUP-BENCHMARK"
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _run_python(args, env=None):
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, cwd=_REPO_ROOT, env=env,
+    )
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} завершился с кодом {completed.returncode}:\n{completed.stderr}")
+    return elapsed, completed.stderr
+
+
+def parse_importtime(text):
+    """
+    Разбирает вывод ``-X importtime``.
+    
+    Returns
+    -------
+    list[dict]
+        Записи ``{"module", "self_us", "cumulative_us", "depth"}`` в порядке вывода
+    """
+    entries = []
+    for line in text.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            entries.append({
+                "module": match.group(4),
+                "self_us": int(match.group(1)),
+                "cumulative_us": int(match.group(2)),
+                "depth": len(match.group(3)) // 2,
+            })
+    return entries
+
+
+def measure_import(module, repeat, env):
+    """Время импорта модуля в свежем процессе и разбор ``-X importtime`` последнего прогона."""
+    baseline = [_run_python(["-c", "pass"], env)[0] for _ in range(repeat)]
+    wall = [_run_python(["-c", f"import {module}"], env)[0] for _ in range(repeat)]
+    
+    _, stderr = _run_python(["-X", "importtime", "-c", f"import {module}"], env)
+    entries = parse_importtime(stderr)
+    top_level = {entry["module"]: entry for entry in entries if entry["depth"] == 0}
+    nested = sorted(entries, key=lambda entry: entry["cumulative_us"], reverse=True)
+    return {
+        "module": module,
+        "interpreter_seconds": summarize(baseline),
+        "wall_seconds": summarize(wall),
+        "import_seconds_median": max(0.0, statistics.median(wall) - statistics.median(baseline)),
+        "importtime_us": top_level[module]["cumulative_us"] if module in top_level else None,
+        "modules_imported": len(entries),
+        "top_imports": nested[:TOP_IMPORTS],
+    }
+
+
+def console_first_prompt(env):
+    """Секунды от запуска консольного приложения до первого приглашения ко вводу."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-u", "-c", CONSOLE_COMMAND],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        cwd=_REPO_ROOT, env=env,
+    )
+    try:
+        return _wait_for_prompt(process, started)
+    finally:
+        process.kill()
+        process.wait()
+
+
+def _wait_for_prompt(process, started):
+    # Приглашение выводится без перевода строки, поэтому читаем всё, что пришло
+    seen = b""
+    prompt = CONSOLE_PROMPT.encode("utf-8")
+    while prompt not in seen:
+        chunk = process.stdout.read1(4096)
+        if not chunk:
+            raise RuntimeError("консольное приложение завершилось, не показав приглашения")
+        seen += chunk
+        if time.perf_counter() - started > PROMPT_TIMEOUT:
+            raise RuntimeError("консольное приложение не показало приглашения вовремя")
+    return time.perf_counter() - started
+
+
+class _FakeBotAPI(ThreadingHTTPServer):
+    """
+    Заглушка Bot API: на первый ``getUpdates`` отдаёт ``/start``, а время
+    первого ``sendMessage`` запоминает как момент ответа бота.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _FakeBotAPIHandler)
+        self.start_sent = False
+        self.replied_at = None
+        self.replied = threading.Event()
+    
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/bot"
+    
+    def reset(self):
+        self.start_sent = False
+        self.replied_at = None
+        self.replied.clear()
+    
+    def handle_error(self, request, client_address):
+        # Бот, остановленный посреди опроса, рвёт соединение — это не ошибка
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _FakeBotAPIHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        method = self.path.rsplit("/", 1)[-1]
+        server = self.server
+        chat = {"id": 1, "type": "private"}
+        
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Benchmark", "username": "benchmark_bot"}
+        elif method == "getUpdates":
+            if server.start_sent:
+                # Пустой длинный опрос: не даём боту крутиться впустую
+                time.sleep(0.2)
+                result = []
+            else:
+                server.start_sent = True
+                result = [{
+                    "update_id": 1,
+                    "message": {
+                        "message_id": 1,
+                        "date": int(time.time()),
+                        "chat": chat,
+                        "from": {"id": 1, "is_bot": False, "first_name": "Benchmark"},
+                        "text": "/start",
+                        "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+                    },
+                }]
+        elif method in ("sendMessage", "editMessageText"):
+            if server.replied_at is None:
+                server.replied_at = time.perf_counter()
+                server.replied.set()
+            result = {"message_id": 2, "date": int(time.time()), "chat": chat, "text": ""}
+        else:
+            result = True
+        
+        body = json.dumps({"ok": True, "result": result}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def bot_first_prompt(server, env):
+    """Секунды от запуска бота до его первого ответа на ``/start``."""
+    server.reset()
+    env = dict(
+        env,
+        TELEGRAM_BOT_TOKEN=BOT_TOKEN,
+        TELEGRAM_BASE_URL=server.base_url,
+        BOT_MODE="polling",
+        SESSION_DB_PATH="",
+        METRICS_FILE="",
+        TRACE_FILE="",
+        PROFILE_TARGETS="",
+    )
+    # Журнал бота — во временный файл: канал мог бы переполниться и остановить бота
+    with tempfile.TemporaryFile() as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "bot.py"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=log,
+            cwd=_REPO_ROOT, env=env,
+        )
+        try:
+            if not server.replied.wait(PROMPT_TIMEOUT):
+                log.seek(0)
+                raise RuntimeError(f"бот не ответил на /start:\n{log.read().decode(errors='replace')}")
+            return server.replied_at - started
+        finally:
+            _stop_bot(process)
+
+
+def _stop_bot(process):
+    # SIGINT даёт боту штатно остановить опрос и пул процессов
+    if process.poll() is None:
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    process.wait()
+
+
+def run(args):
+    targets = args.targets.split(",")
+    env = dict(os.environ)
+    
+    server = None
+    if "bot" in targets:
+        server = _FakeBotAPI()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    results = []
+    try:
+        for target in targets:
+            if target not in ENTRY_MODULES:
+                raise SystemExit(f"Неизвестная точка входа: {target}")
+            entry = measure_import(ENTRY_MODULES[target], args.repeat, env)
+            if target == "console":
+                prompts = [console_first_prompt(env) for _ in range(args.repeat)]
+            else:
+                prompts = [bot_first_prompt(server, env) for _ in range(args.repeat)]
+            entry = {"name": target, **entry, "first_prompt_seconds": summarize(prompts)}
+            results.append(entry)
+            if args.verbose:
+                print(f"{target:8} import={entry['import_seconds_median']:.3f}s "
+                      f"importtime={(entry['importtime_us'] or 0) / 1e6:.3f}s "
+                      f"first_prompt={entry['first_prompt_seconds']['median']:.3f}s",
+                      file=sys.stderr)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    
+    report = {
+        "benchmark": "startup",
+        "environment": environment(),
+        "config": {"repeat": args.repeat},
+        "results": results,
+    }
+    write_report(report, args.output)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = sub.add_parser("run", help="замерить холодный старт")
+    run_parser.add_argument("--targets", default=",".join(TARGETS))
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--output", help="файл отчёта (по умолчанию stdout)")
+    run_parser.add_argument("-v", "--verbose", action="store_true")
+    
+    args = parser.parse_args(argv)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
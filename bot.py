@@ -5,40 +5,52 @@
 """
 
 import os
+import asyncio
+import functools
 import logging
-from typing import Dict, Any, Optional
+import tempfile
+from typing import Optional
 from dataclasses import dataclass, field
-from dotenv import load_dotenv
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application, 
     CommandHandler, 
     CallbackQueryHandler, 
     MessageHandler, 
+    TypeHandler,
     filters, 
     ContextTypes, 
     ConversationHandler
 )
 
-# Загружаем переменные окружения
-load_dotenv()
+if __name__ == '__main__':
+    # .env читается до импорта модулей ниже: они берут настройки из окружения
+    # при импорте. При импорте bot как модуля окружение не трогаем
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Импортируем модули из консольного приложения
 from exceptions import (
-    InvalidInputFormatException, 
-    InvalidNumberException, 
     EmptyPointsListException,
     InsufficientPointsException,
-    InvalidMethodException
+    InvalidMethodException,
+    ProcessingTimeoutException,
+    InvalidPointFileException,
+    UploadTooLargeException
 )
-from input_data import input_by_hand, make_random_points
-from points import process_points
+from input_data import make_random_points, parse_points
+from cache import result_cache
+from dynamic import DynamicPointSet
+from executor import processing_executor
+from sessions import SessionStore
+from points import ALL_METHODS, METHODS, measure_processing
+from pointset import PointSet, format_point
+from metrics import registry as metrics
+from telegram_request import InstrumentedRequest
+from tracing import tracer
+from loop_watchdog import watchdog
+from profiling import MODES as PROFILE_MODES, parse_targets, profiler
 
-# Настройка логирования
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
 logger = logging.getLogger(__name__)
 
 # Состояния для ConversationHandler
@@ -57,25 +69,213 @@ CALLBACK_INPUT_RANDOM = "input_random"
 CALLBACK_BACK = "back"
 CALLBACK_COMPARE = "compare"
 CALLBACK_EXIT = "exit"
+CALLBACK_PAGE_PREFIX = "page_"
+CALLBACK_NOOP = "noop"
+CALLBACK_EXPORT_CSV = "export_csv"
+CALLBACK_EXPORT_BINARY = "export_binary"
+CALLBACK_EXPORT_COMPARE = "export_compare"
+
+# Максимальный размер файла с точками, присланного документом
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 20 * 1024 * 1024))
+
+# Пользователи, которым доступна команда /stats
+ADMIN_IDS = frozenset(
+    int(user_id) for user_id in os.getenv("ADMIN_IDS", "").replace(" ", "").split(",") if user_id
+)
+
+# Периодический сброс метрик в файл в формате Prometheus (пусто — выключен)
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", 15))
+
+# Сколько точек показывать на одной странице результатов
+RESULTS_PAGE_SIZE = 30
+
+# Сколько точек показывать в подтверждении ввода: сообщение Telegram не длиннее 4096 символов
+POINTS_PREVIEW_SIZE = 10
+
+# Накладные расходы одной сессии помимо точек: объект, поля, ключ хранилища
+SESSION_OVERHEAD_BYTES = 512
+
+# Поля сессии, присваивание которых — изменение, которое нужно сохранить
+_SESSION_FIELDS = frozenset({"points", "method", "result", "current_input", "live"})
 
 @dataclass
 class UserData:
-    """Класс для хранения данных пользователя между состояниями."""
+    """
+    Класс для хранения данных пользователя между состояниями.
+    
+    ``version`` растёт при каждом изменении сессии: присваивании её полей
+    и правке точек через методы класса. ``saved_version`` — версия,
+    записанная на диск; по их расхождению persistence находит сессии,
+    которые действительно нужно переписать.
+    """
     user_id: int
-    points: list = field(default_factory=list)
+    points: PointSet = field(default_factory=PointSet)
     method: Optional[str] = None
-    result: Optional[list] = None
+    result: Optional[PointSet] = None
     current_input: str = ""  # Для накопления ввода
+    live: Optional[DynamicPointSet] = None  # Ручной ввод с готовыми результатами
+    version: int = field(default=0, compare=False, repr=False)
+    saved_version: int = field(default=-1, compare=False, repr=False)
+    
+    def __setattr__(self, name, value):
+        if name in _SESSION_FIELDS:
+            object.__setattr__(self, "version", self.__dict__.get("version", 0) + 1)
+        object.__setattr__(self, name, value)
     
     def clear(self):
         """Очистить данные пользователя."""
-        self.points.clear()
+        self.points = PointSet()
+        self.live = None
         self.method = None
         self.result = None
         self.current_input = ""
+    
+    def nbytes(self):
+        """Примерный объём памяти сессии в байтах."""
+        size = SESSION_OVERHEAD_BYTES + len(self.current_input)
+        if self.live is not None:
+            size += self.live.nbytes
+        else:
+            size += self.points.nbytes
+        if self.result is not None:
+            size += self.result.nbytes
+        return size
+    
+    def start_live_input(self):
+        """Начать ручной ввод: результаты обновляются с каждой точкой."""
+        self.clear()
+        self.live = DynamicPointSet()
+        self.points = self.live.points
+    
+    def add_points(self, points):
+        """Добавить точки, обновив готовые результаты при ручном вводе."""
+        if self.live is not None:
+            self.live.extend(points)
+        else:
+            self.points.extend(points)
+        self.version += 1
+    
+    def clear_points(self):
+        """Удалить все точки, сохранив режим ввода."""
+        if self.live is not None:
+            self.live.clear()
+        else:
+            self.points.clear()
+        self.version += 1
+    
+    async def process(self, method):
+        """Результат метода: готовый при ручном вводе, иначе через кэш и пул."""
+        if self.live is not None and self.points:
+            with measure_processing(method, len(self.points)):
+                return self.live.result(method)
+        return await result_cache.aprocess(self.points, method, processing_executor)
+    
+    async def process_all(self):
+        """
+        Результаты всех методов: готовые при ручном вводе, иначе через кэш и пул.
+        
+        Возвращает ``(results, errors)``, как ``process_all_methods``:
+        ошибка одного метода не отменяет результаты остальных.
+        """
+        if self.live is not None and self.points:
+            results = {}
+            errors = {}
+            with measure_processing(ALL_METHODS, len(self.points)):
+                for method in METHODS:
+                    try:
+                        results[method] = self.live.result(method)
+                    except Exception as e:
+                        errors[method] = str(e)
+            return results, errors
+        return await result_cache.aprocess_all(self.points, processing_executor)
+    
+    def to_record(self):
+        """Снимок сессии для сохранения: (meta, points, result)."""
+        meta = {
+            "method": self.method,
+            "current_input": self.current_input,
+            "live": self.live is not None,
+        }
+        result = self.result.tobytes() if self.result is not None else None
+        return meta, self.points.tobytes(), result
+    
+    @classmethod
+    def from_record(cls, user_id, meta, points, result):
+        """Восстановить сессию из снимка ``to_record``."""
+        user_data = cls(user_id=user_id, method=meta.get("method"),
+                        current_input=meta.get("current_input", ""))
+        if meta.get("live"):
+            user_data.live = DynamicPointSet(PointSet.frombytes(points))
+            user_data.points = user_data.live.points
+        else:
+            user_data.points = PointSet.frombytes(points)
+        if result is not None:
+            user_data.result = PointSet.frombytes(result)
+        # Сессия совпадает с записанной: переписывать её незачем
+        user_data.saved_version = user_data.version
+        return user_data
+
+# Хранилище данных пользователей с TTL и бюджетом памяти
+user_data_store = SessionStore(
+    ttl=float(os.getenv("SESSION_TTL_SECONDS", 7 * 24 * 3600)),
+    max_bytes=int(os.getenv("SESSION_MAX_BYTES", 256 * 1024 * 1024)),
+    max_sessions=int(os.getenv("SESSION_MAX_COUNT", 100000)),
+)
 
-# Глобальный словарь для хранения данных пользователей
-user_data_store: Dict[int, UserData] = {}
+def _load_user_data(persistence, user_id):
+    """Загрузить сессию с диска для ``SessionStore``."""
+    record = persistence.load_session(user_id)
+    if record is None:
+        return None
+    return UserData.from_record(user_id, *record)
+
+async def _prefetch_session(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Подгружает сессию пользователя с диска до обработчиков диалога.
+    
+    Чтение и разбор идут в отдельном потоке, так что обработчики дальше
+    находят сессию в памяти и не читают базу из цикла событий.
+    """
+    if update.effective_user is not None:
+        await user_data_store.aget(update.effective_user.id)
+
+HANDLER_SECONDS = metrics.histogram(
+    "bot_handler_seconds", "Длительность обработчиков бота", ("handler",)
+)
+HANDLER_ERRORS = metrics.counter(
+    "bot_handler_errors_total", "Обработчики, завершившиеся исключением", ("handler",)
+)
+metrics.gauge("bot_sessions", "Сессий в памяти", lambda: len(user_data_store))
+metrics.gauge("bot_sessions_bytes", "Память сессий в байтах", lambda: user_data_store.total_bytes)
+metrics.gauge("result_cache_bytes", "Память кэша результатов в байтах", lambda: result_cache.stats()["bytes"])
+metrics.gauge("result_cache_hits", "Попаданий в кэш результатов", lambda: result_cache.hits)
+metrics.gauge("result_cache_misses", "Промахов кэша результатов", lambda: result_cache.misses)
+
+def instrumented(func):
+    """
+    Записывать длительность и ошибки обработчика в метрики под его именем,
+    открывать для него интервал трассы с user_id и снимать профиль, если
+    обработчик взведён в ``profiler``.
+    """
+    name = func.__name__
+    watchdog.register_handler(func)
+    timed = metrics.timed(HANDLER_SECONDS, (name,), errors=HANDLER_ERRORS)(func)
+    
+    async def traced(update, context, *args, **kwargs):
+        if not tracer.enabled:
+            return await timed(update, context, *args, **kwargs)
+        user = update.effective_user
+        with tracer.span(f"handler.{name}", user_id=user.id if user else None):
+            return await timed(update, context, *args, **kwargs)
+    
+    @functools.wraps(func)
+    async def wrapper(update, context, *args, **kwargs):
+        capture = profiler.take(name)
+        if capture is None:
+            return await traced(update, context, *args, **kwargs)
+        return await capture.run_async(traced(update, context, *args, **kwargs))
+    return wrapper
 
 # Словарь методов обработки
 METHODS_MAP = {
@@ -85,6 +285,7 @@ METHODS_MAP = {
     '4': ('min_x', 'Минимальный X')
 }
 
+@instrumented
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обработчик команды /start - точка входа в бота."""
     user_id = update.effective_user.id
@@ -126,6 +327,7 @@ async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             parse_mode='Markdown'
         )
 
+@instrumented
 async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обработчик выбора в главном меню."""
     query = update.callback_query
@@ -146,6 +348,9 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     elif choice == CALLBACK_COMPARE:
         await compare_methods(update, context)
         return MAIN_MENU
+    elif choice == CALLBACK_EXPORT_COMPARE:
+        await send_export(update, context, choice)
+        return MAIN_MENU
     elif choice == CALLBACK_EXIT:
         await query.edit_message_text("👋 До свидания!")
         return ConversationHandler.END
@@ -174,6 +379,7 @@ async def show_input_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         parse_mode='Markdown'
     )
 
+@instrumented
 async def input_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обработчик выбора в меню ввода."""
     query = update.callback_query
@@ -204,11 +410,12 @@ async def show_manual_input_instructions(update: Update, context: ContextTypes.D
     """Показать инструкции для ручного ввода."""
     user_id = update.effective_user.id
     user_data = user_data_store[user_id]
-    user_data.clear()  # Очищаем предыдущие точки
+    user_data.start_live_input()  # Очищаем предыдущие точки
     
     message = (
         "✍️ *РУЧНОЙ ВВОД ТОЧЕК*\n\n"
         "Вводите точки в формате: *x,y*\n"
+        "Можно прислать сразу много точек в одном сообщении\n"
         "Примеры:\n"
         "• *3,4*\n"
         "• *-1.5,2.7*\n"
@@ -217,6 +424,7 @@ async def show_manual_input_instructions(update: Update, context: ContextTypes.D
         "• /done - завершить ввод\n"
         "• /cancel - отменить ввод\n"
         "• /clear - очистить все точки\n\n"
+        "📎 Можно прислать файл: CSV/TSV (x,y в строке) или двоичный .pnts\n\n"
         "Введите первую точку:"
     )
     
@@ -225,6 +433,7 @@ async def show_manual_input_instructions(update: Update, context: ContextTypes.D
         parse_mode='Markdown'
     )
 
+@instrumented
 async def handle_manual_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обработчик ручного ввода точек."""
     user_id = update.effective_user.id
@@ -244,7 +453,7 @@ async def handle_manual_input(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         await update.message.reply_text(
             f"✅ Введено точек: {len(user_data.points)}\n"
-            f"Точки: {user_data.points}\n\n"
+            f"Точки: {_format_points_preview(user_data.points)}\n\n"
             "Переходим к выбору метода обработки..."
         )
         await show_method_menu(update, context)
@@ -257,41 +466,109 @@ async def handle_manual_input(update: Update, context: ContextTypes.DEFAULT_TYPE
         return MAIN_MENU
     
     elif text.lower() in ['/clear', 'очистить']:
-        user_data.points.clear()
+        user_data.clear_points()
         await update.message.reply_text("🗑 Все точки очищены. Введите первую точку:")
         return MANUAL_INPUT
     
-    # Парсинг точки
-    try:
-        parts = text.split(',')
-        if len(parts) != 2:
-            raise InvalidInputFormatException(text)
-        
-        try:
-            x = float(parts[0].strip())
-        except ValueError:
-            raise InvalidNumberException(parts[0], "координата X")
-        
-        try:
-            y = float(parts[1].strip())
-        except ValueError:
-            raise InvalidNumberException(parts[1], "координата Y")
-        
-        user_data.points.append((x, y))
-        
+    # Парсинг точек: в одном сообщении их может быть сколько угодно
+    with tracer.span("parse", chars=len(text)) as span:
+        points, errors = parse_points(text)
+        span.set("n", len(points))
+    user_data.add_points(points)
+    
+    if len(points) == 1 and not errors:
         await update.message.reply_text(
-            f"✅ Добавлена точка: ({x}, {y})\n"
+            f"✅ Добавлена точка: {format_point(points[0])}\n"
             f"Всего точек: {len(user_data.points)}\n\n"
             "Введите следующую точку или /done для завершения:"
         )
-        
-    except (InvalidInputFormatException, InvalidNumberException) as e:
-        await update.message.reply_text(f"❌ Ошибка: {e}")
-    except Exception as e:
-        await update.message.reply_text(f"❌ Неожиданная ошибка: {e}")
+    elif points:
+        message = (
+            f"✅ Добавлено точек: {len(points)}\n"
+            f"Всего точек: {len(user_data.points)}\n"
+        )
+        if errors:
+            message += f"⚠️ Пропущено с ошибками: {len(errors)}\n"
+            message += _format_parse_errors(errors)
+        message += "\nВведите следующие точки или /done для завершения:"
+        await update.message.reply_text(message)
+    elif len(errors) == 1:
+        await update.message.reply_text(f"❌ Ошибка: {errors[0].error}")
+    else:
+        await update.message.reply_text(
+            f"❌ Ни одной точки не распознано, ошибок: {len(errors)}\n"
+            + _format_parse_errors(errors)
+        )
     
     return MANUAL_INPUT
 
+@instrumented
+async def handle_document_upload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """
+    Обработчик файла с точками в режиме ручного ввода.
+    
+    Файл скачивается во временный каталог блоками с проверкой размера,
+    разбирается в отдельном потоке и целиком заменяет точки сессии.
+    """
+    user_id = update.effective_user.id
+    user_data = user_data_store.get(user_id)
+    
+    if not user_data:
+        await start(update, context)
+        return MAIN_MENU
+    
+    from uploads import download_document, read_points_upload
+    
+    document = update.message.document
+    await update.message.reply_text(f"📥 Загружаю файл {document.file_name or ''}...")
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "upload")
+            await download_document(context.bot, document, path, UPLOAD_MAX_BYTES)
+            points, errors, error_count = await asyncio.to_thread(read_points_upload, path)
+    except (UploadTooLargeException, InvalidPointFileException) as e:
+        await update.message.reply_text(f"❌ {e}")
+        return MANUAL_INPUT
+    except Exception as e:
+        logger.warning("Не удалось загрузить файл от %s: %s", user_id, e)
+        await update.message.reply_text(f"❌ Не удалось загрузить файл: {e}")
+        return MANUAL_INPUT
+    
+    if not points:
+        await update.message.reply_text(
+            f"❌ В файле не найдено ни одной точки, ошибок: {error_count}\n"
+            + _format_parse_errors(errors, total=error_count)
+        )
+        return MANUAL_INPUT
+    
+    user_data.clear()
+    user_data.points = points
+    
+    message = f"✅ Загружено точек из файла: {len(points)}\n"
+    if error_count:
+        message += f"⚠️ Пропущено с ошибками: {error_count}\n"
+        message += _format_parse_errors(errors, total=error_count)
+    await update.message.reply_text(message)
+    
+    await show_method_menu(update, context)
+    return PROCESS_METHOD
+
+def _format_points_preview(points, limit=POINTS_PREVIEW_SIZE):
+    """Первые ``limit`` точек в одну строку; полный список — в результатах и экспорте."""
+    preview = ", ".join(map(format_point, points[:limit]))
+    if len(points) > limit:
+        preview += f", ... и ещё {len(points) - limit}"
+    return preview
+
+def _format_parse_errors(errors, limit=5, total=None):
+    """Форматирует первые ошибки разбора с их позициями; ``total`` — общее число ошибок."""
+    total = len(errors) if total is None else total
+    lines = [f"• строка {e.line}, позиция {e.column}: {e.error}" for e in errors[:limit]]
+    if total > limit:
+        lines.append(f"• ... и ещё {total - limit}")
+    return "\n".join(lines) + "\n"
+
 async def show_random_input_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Показать меню для случайной генерации."""
     message = (
@@ -307,6 +584,7 @@ async def show_random_input_menu(update: Update, context: ContextTypes.DEFAULT_T
         parse_mode='Markdown'
     )
 
+@instrumented
 async def handle_random_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обработчик случайной генерации точек."""
     user_id = update.effective_user.id
@@ -344,7 +622,7 @@ async def handle_random_input(update: Update, context: ContextTypes.DEFAULT_TYPE
         user_data.points = make_random_points(n)
         
         # Для бота переопределяем функцию вывода
-        points_str = "\n".join([f"({x}, {y})" for x, y in user_data.points])
+        points_str = "\n".join(map(format_point, user_data.points))
         
         await update.message.reply_text(
             f"✅ Создано {n} случайных точек:\n\n"
@@ -397,6 +675,7 @@ async def show_method_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             parse_mode='Markdown'
         )
 
+@instrumented
 async def method_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обработчик выбора метода."""
     query = update.callback_query
@@ -424,14 +703,19 @@ async def method_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         
         method_code, method_name = METHODS_MAP[method_key]
         user_data.method = method_code
+        span = tracer.current()
+        if span is not None:
+            span.set("method", method_code)
+            span.set("n", len(user_data.points))
         
         # Обрабатываем точки
         try:
-            user_data.result = process_points(user_data.points, method_code)
+            user_data.result = await user_data.process(method_code)
             await show_results(update, context)
             return VIEW_RESULTS
             
-        except (EmptyPointsListException, InsufficientPointsException, InvalidMethodException) as e:
+        except (EmptyPointsListException, InsufficientPointsException, InvalidMethodException,
+                ProcessingTimeoutException) as e:
             await query.edit_message_text(f"❌ Ошибка обработки: {e}")
             return PROCESS_METHOD
         except Exception as e:
@@ -440,8 +724,24 @@ async def method_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     return PROCESS_METHOD
 
-async def show_results(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Показать результаты обработки."""
+def _results_page_keyboard(page: int, pages: int) -> list:
+    """Кнопки листания результатов: назад, номер страницы, вперёд."""
+    row = []
+    if page > 0:
+        row.append(InlineKeyboardButton("◀️", callback_data=f"{CALLBACK_PAGE_PREFIX}{page - 1}"))
+    row.append(InlineKeyboardButton(f"{page + 1}/{pages}", callback_data=CALLBACK_NOOP))
+    if page < pages - 1:
+        row.append(InlineKeyboardButton("▶️", callback_data=f"{CALLBACK_PAGE_PREFIX}{page + 1}"))
+    return row
+
+@instrumented
+async def show_results(update: Update, context: ContextTypes.DEFAULT_TYPE, page: int = 0) -> None:
+    """
+    Показать страницу результатов обработки.
+    
+    Форматируются только RESULTS_PAGE_SIZE точек запрошенной страницы:
+    результат уже лежит в сессии, поэтому листание ничего не пересчитывает.
+    """
     user_id = update.effective_user.id
     user_data = user_data_store.get(user_id)
     
@@ -458,20 +758,39 @@ async def show_results(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         'min_x': 'Минимальный X'
     }
     
-    # Форматируем точки для читаемости
-    points_str = "\n".join([f"({x}, {y})" for x, y in user_data.points])
-    result_str = "\n".join([f"({x}, {y})" for x, y in user_data.result])
-    
-    message = (
-        "📊 *РЕЗУЛЬТАТЫ ОБРАБОТКИ*\n\n"
-        f"*Метод:* {method_names.get(user_data.method, user_data.method)}\n\n"
-        f"*Исходные точки ({len(user_data.points)}):*\n"
-        f"```\n{points_str}\n```\n\n"
-        f"*Результат ({len(user_data.result)}):*\n"
-        f"```\n{result_str}\n```"
-    )
+    with tracer.span("render.results", n=len(user_data.result), page=page):
+        total = len(user_data.result)
+        pages = max(1, -(-total // RESULTS_PAGE_SIZE))
+        page = max(0, min(page, pages - 1))
+        start_index = page * RESULTS_PAGE_SIZE
+        stop_index = min(start_index + RESULTS_PAGE_SIZE, total)
+    
+        # Форматируем только видимый срез: исходная точка и её результат
+        lines = [
+            f"{i + 1}. {format_point(point)} → {format_point(result)}"
+            for i, (point, result) in enumerate(
+                zip(user_data.points[start_index:stop_index], user_data.result[start_index:stop_index]),
+                start_index,
+            )
+        ]
+        page_str = "\n".join(lines)
+    
+        message = (
+            "📊 *РЕЗУЛЬТАТЫ ОБРАБОТКИ*\n\n"
+            f"*Метод:* {method_names.get(user_data.method, user_data.method)}\n"
+            f"*Точек:* {len(user_data.points)}, *результатов:* {total}\n\n"
+            f"*Точки {start_index + 1}–{stop_index}:*\n"
+            f"```\n{page_str}\n```"
+        )
     
-    keyboard = [
+    keyboard = []
+    if pages > 1:
+        keyboard.append(_results_page_keyboard(page, pages))
+    keyboard += [
+        [
+            InlineKeyboardButton("📄 CSV", callback_data=CALLBACK_EXPORT_CSV),
+            InlineKeyboardButton("💾 Бинарный файл", callback_data=CALLBACK_EXPORT_BINARY)
+        ],
         [InlineKeyboardButton("🏠 В главное меню", callback_data="main_menu")],
         [InlineKeyboardButton("🔄 Другой метод", callback_data="another_method")]
     ]
@@ -483,6 +802,7 @@ async def show_results(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         parse_mode='Markdown'
     )
 
+@instrumented
 async def results_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обработчик действий с результатами."""
     query = update.callback_query
@@ -503,9 +823,14 @@ async def results_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     elif choice == "another_method":
         await show_method_menu(update, context)
         return PROCESS_METHOD
+    elif choice in (CALLBACK_EXPORT_CSV, CALLBACK_EXPORT_BINARY):
+        await send_export(update, context, choice)
+    elif choice.startswith(CALLBACK_PAGE_PREFIX):
+        await show_results(update, context, page=int(choice[len(CALLBACK_PAGE_PREFIX):]))
     
     return VIEW_RESULTS
 
+@instrumented
 async def compare_methods(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Сравнение всех методов обработки."""
     query = update.callback_query
@@ -519,19 +844,31 @@ async def compare_methods(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     message = "📊 *СРАВНЕНИЕ ВСЕХ МЕТОДОВ*\n\n"
     
-    for method_key, (method_code, method_name) in METHODS_MAP.items():
-        try:
-            result = process_points(user_data.points, method_code)
+    # Все методы считаются за один общий проход по точкам,
+    # а повторное сравнение того же набора берётся из кэша
+    # Ошибка одного метода показывается рядом с результатами остальных
+    try:
+        results, errors = await user_data.process_all()
+    except Exception as e:
+        results = {}
+        errors = {method_code: str(e) for method_code, _ in METHODS_MAP.values()}
+    
+    with tracer.span("render.compare", n=len(user_data.points)):
+        for method_key, (method_code, method_name) in METHODS_MAP.items():
+            message += f"*{method_name}:*\n"
+            if method_code in errors:
+                message += f"❌ Ошибка: {errors[method_code]}\n\n"
+                continue
+            result = results[method_code]
             # Ограничиваем вывод для читаемости
             result_preview = str(result[:3]) + ("..." if len(result) > 3 else "")
-            message += f"*{method_name}:*\n"
             message += f"Результат: `{result_preview}`\n"
             message += f"Количество: {len(result)}\n\n"
-        except Exception as e:
-            message += f"*{method_name}:*\n"
-            message += f"Ошибка: {e}\n\n"
     
-    keyboard = [[InlineKeyboardButton("⬅️ Назад", callback_data=CALLBACK_BACK)]]
+    keyboard = [
+        [InlineKeyboardButton("📄 Экспорт в CSV", callback_data=CALLBACK_EXPORT_COMPARE)],
+        [InlineKeyboardButton("⬅️ Назад", callback_data=CALLBACK_BACK)]
+    ]
     reply_markup = InlineKeyboardMarkup(keyboard)
     
     await query.edit_message_text(
@@ -540,6 +877,54 @@ async def compare_methods(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         parse_mode='Markdown'
     )
 
+@instrumented
+async def send_export(update: Update, context: ContextTypes.DEFAULT_TYPE, choice: str) -> None:
+    """
+    Отправить точки и результаты документом.
+    
+    CSV результата содержит исходные точки и результат метода, CSV сравнения —
+    исходные точки и результаты всех методов (они берутся из кэша или готовых
+    результатов ручного ввода), бинарный файл — результат в формате pointfile.
+    Файл пишется блоками во временный файл в отдельном потоке.
+    """
+    user_id = update.effective_user.id
+    user_data = user_data_store.get(user_id)
+    chat_id = update.effective_chat.id
+    
+    if not user_data or not user_data.points:
+        await context.bot.send_message(chat_id, "❌ Нет данных для экспорта!")
+        return
+    
+    from export import export_csv, export_binary
+    
+    try:
+        if choice == CALLBACK_EXPORT_COMPARE:
+            # Методы с ошибкой в файл не попадают: их ошибки видны на экране сравнения
+            results, _ = await user_data.process_all()
+            columns = [("input", user_data.points)]
+            columns += [(method, results[method]) for method in METHODS if method in results]
+            document = await asyncio.to_thread(export_csv, columns)
+            filename = "points_compare.csv"
+        elif user_data.result is None:
+            await context.bot.send_message(chat_id, "❌ Нет результатов для экспорта!")
+            return
+        elif choice == CALLBACK_EXPORT_CSV:
+            columns = [("input", user_data.points), (user_data.method, user_data.result)]
+            document = await asyncio.to_thread(export_csv, columns)
+            filename = f"points_{user_data.method}.csv"
+        else:
+            document = await asyncio.to_thread(export_binary, user_data.result)
+            filename = f"result_{user_data.method}.pnts"
+    except Exception as e:
+        await context.bot.send_message(chat_id, f"❌ Ошибка экспорта: {e}")
+        return
+    
+    try:
+        await context.bot.send_document(chat_id, document=document, filename=filename)
+    finally:
+        document.close()
+
+@instrumented
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обработчик отмены/выхода."""
     user_id = update.effective_user.id
@@ -549,6 +934,7 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     await update.message.reply_text("👋 До свидания!")
     return ConversationHandler.END
 
+@instrumented
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик команды /help."""
     help_text = (
@@ -571,18 +957,151 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     
     await update.message.reply_text(help_text, parse_mode='Markdown')
 
+@instrumented
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Обработчик команды /stats: метрики процесса, только для ADMIN_IDS."""
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+    
+    text = (
+        "📈 Статистика\n\n"
+        f"Сессии: {user_data_store.stats()}\n"
+        f"Кэш: {result_cache.stats()}\n\n"
+        + (metrics.summary() if metrics.enabled else "Метрики выключены (METRICS_DISABLED)")
+    )
+    # Длинную сводку отправляем несколькими сообщениями
+    for start_index in range(0, len(text), 4000):
+        await update.message.reply_text(text[start_index:start_index + 4000])
+
+@instrumented
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Обработчик команды /profile, только для ADMIN_IDS.
+    
+    ``/profile process_points:5 [cprofile|tracemalloc]`` — снять следующие
+    5 вызовов цели (``process_points`` или имени обработчика),
+    ``/profile off`` — снять все взводы, ``/profile`` — показать взведённые цели.
+    """
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+    
+    args = context.args or []
+    if args == ["off"]:
+        profiler.disarm()
+        await update.message.reply_text("Профилирование выключено")
+        return
+    if args:
+        mode = args[1] if len(args) > 1 else "cprofile"
+        try:
+            targets = parse_targets(args[0])
+            for target, count in targets:
+                profiler.arm(target, count, mode)
+        except ValueError as e:
+            await update.message.reply_text(
+                f"❌ {e}\nФормат: /profile цель[:количество] [{'|'.join(PROFILE_MODES)}]"
+            )
+            return
+    
+    status = profiler.status()
+    text = "\n".join(
+        f"{target}: ещё {count}, {mode}" for target, (count, mode) in sorted(status.items())
+    )
+    await update.message.reply_text(
+        f"🔬 Профилирование (файлы в {profiler.directory}):\n{text}" if status
+        else "Профилирование не взведено"
+    )
+
+async def _dump_metrics_periodically(path: str, interval: float) -> None:
+    """Раз в ``interval`` секунд записывает метрики в файл в формате Prometheus."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            # Текст собирается в цикле событий, где меняются метрики, а пишется в потоке
+            text = metrics.render_prometheus()
+            await asyncio.to_thread(metrics.dump, path, text)
+        except Exception:
+            logger.exception("Не удалось записать метрики в %s", path)
+
+_background_tasks = []
+
+async def _post_init(application: Application) -> None:
+    """Запускает фоновую запись сессий, сброс метрик и сторож цикла, если они включены."""
+    if application.persistence is not None:
+        application.persistence.start()
+    if watchdog.threshold > 0:
+        watchdog.start()
+    if METRICS_FILE and metrics.enabled:
+        _background_tasks.append(asyncio.get_running_loop().create_task(
+            _dump_metrics_periodically(METRICS_FILE, METRICS_DUMP_INTERVAL)
+        ))
+
+async def _shutdown_executor(application: Application) -> None:
+    """Останавливает пул обработки и фоновые задачи, закрывает базу сессий."""
+    processing_executor.shutdown()
+    watchdog.stop()
+    tracer.close()
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    if application.persistence is not None:
+        application.persistence.close()
+
 def main() -> None:
     """Главная функция для запуска бота."""
+    # Настройка логирования
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    
     # Получаем токен из переменных окружения
     token = os.getenv("TELEGRAM_BOT_TOKEN")
     if not token:
         raise ValueError("TELEGRAM_BOT_TOKEN не найден в переменных окружения!")
+    # Режим запуска проверяем сразу, а не после подъёма пула и базы сессий
+    webhook = webhook_settings()
+    
+    # Поднимаем пул обработки до старта цикла событий, чтобы процессы
+    # порождались из ещё однопоточного процесса
+    processing_executor.start()
+    
+    # Запросы к Bot API идут через клиент, замеряющий каждый вызов
+    builder = (
+        Application.builder()
+        .token(token)
+        .request(InstrumentedRequest(connection_pool_size=256))
+        .get_updates_request(InstrumentedRequest())
+    )
+    # Локальный сервер Bot API (или заглушка для нагрузочных прогонов)
+    base_url = os.getenv("TELEGRAM_BASE_URL")
+    if base_url:
+        builder = builder.base_url(base_url)
+    
+    # Сессии и состояния диалогов переживают перезапуск, если задан путь к базе
+    db_path = os.getenv("SESSION_DB_PATH", "bot_sessions.sqlite3")
+    if db_path:
+        from persistence import SQLitePersistence
+        persistence = SQLitePersistence(
+            db_path,
+            flush_interval=float(os.getenv("SESSION_FLUSH_INTERVAL", 5)),
+            ttl=user_data_store.ttl,
+        )
+        user_data_store.loader = lambda user_id: _load_user_data(persistence, user_id)
+        user_data_store.on_access = persistence.track_session
+        builder = builder.persistence(persistence)
     
     # Создаем приложение
-    application = Application.builder().token(token).build()
+    application = (
+        builder
+        .post_init(_post_init)
+        .post_shutdown(_shutdown_executor)
+        .build()
+    )
     
     # Создаем ConversationHandler для управления состояниями
     conv_handler = ConversationHandler(
+        name="points_conversation",
+        persistent=bool(db_path),
         entry_points=[CommandHandler("start", start)],
         states={
             MAIN_MENU: [
@@ -593,6 +1112,7 @@ def main() -> None:
             ],
             MANUAL_INPUT: [
                 MessageHandler(filters.TEXT & ~filters.COMMAND, handle_manual_input),
+                MessageHandler(filters.Document.ALL, handle_document_upload),
                 CommandHandler("done", lambda u, c: handle_manual_input(u, c)),
                 CommandHandler("cancel", cancel),
                 CommandHandler("clear", lambda u, c: handle_manual_input(u, c))
@@ -617,12 +1137,65 @@ def main() -> None:
     )
     
     # Добавляем обработчики
+    if db_path:
+        application.add_handler(TypeHandler(Update, _prefetch_session), group=-1)
     application.add_handler(conv_handler)
     application.add_handler(CommandHandler("help", help_command))
+    application.add_handler(CommandHandler("stats", stats_command))
+    application.add_handler(CommandHandler("profile", profile_command))
     
     # Запускаем бота
     print("🤖 Бот запущен...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    run_application(application, webhook)
+
+def webhook_settings() -> Optional[dict]:
+    """
+    Параметры ``run_webhook`` из окружения или None, если BOT_MODE — polling.
+    
+    В режиме webhook бот сам поднимает HTTP-сервер на WEBHOOK_LISTEN:WEBHOOK_PORT,
+    принимает POST с обновлениями по пути WEBHOOK_PATH, сверяет заголовок
+    X-Telegram-Bot-Api-Secret-Token с WEBHOOK_SECRET и кладёт обновления
+    прямо в очередь приложения. WEBHOOK_URL — внешний адрес, который
+    регистрируется в Telegram (например, адрес обратного прокси); несколько
+    экземпляров могут слушать разные порты за одним прокси.
+    
+    Raises
+    ------
+    ValueError
+        Если BOT_MODE неизвестен или в режиме webhook не заданы WEBHOOK_SECRET
+        или WEBHOOK_URL: без адреса Telegram не узнает, куда слать обновления,
+        и бот молча ничего не получит
+    """
+    mode = os.getenv("BOT_MODE", "polling").lower()
+    if mode == "polling":
+        return None
+    if mode != "webhook":
+        raise ValueError(f"Неизвестный BOT_MODE: {mode} (ожидается polling или webhook)")
+    
+    secret = os.getenv("WEBHOOK_SECRET")
+    if not secret:
+        raise ValueError("WEBHOOK_SECRET не найден в переменных окружения!")
+    webhook_url = os.getenv("WEBHOOK_URL")
+    if not webhook_url:
+        raise ValueError("WEBHOOK_URL не найден в переменных окружения!")
+    
+    return {
+        "listen": os.getenv("WEBHOOK_LISTEN", "127.0.0.1"),
+        "port": int(os.getenv("WEBHOOK_PORT", 8443)),
+        "url_path": os.getenv("WEBHOOK_PATH", "telegram"),
+        "webhook_url": webhook_url,
+        "secret_token": secret,
+        "max_connections": int(os.getenv("WEBHOOK_MAX_CONNECTIONS", 40)),
+    }
+
+def run_application(application: Application, webhook: Optional[dict] = None) -> None:
+    """
+    Запустить бота: опросом или, если переданы параметры ``webhook_settings()``, через webhook.
+    """
+    if webhook is None:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
+    else:
+        application.run_webhook(allowed_updates=Update.ALL_TYPES, **webhook)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
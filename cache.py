@@ -0,0 +1,185 @@
+"""
+Кэш результатов обработки точек.
+
+Ключ — хэш содержимого набора точек плюс метод, поэтому повторный запуск
+того же набора (кнопки «Другой метод» и «Сравнить», совпавшие случайные
+наборы разных пользователей) стоит одного поиска в словаре. Размер кэша
+ограничен в байтах, вытесняются давно не использованные результаты.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+
+from points import ALL_METHODS, METHODS, measure_processing, process_all_methods, process_points
+from pointset import PointSet
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Примерные накладные расходы на одну запись: ключ, узел словаря, объект PointSet
+ENTRY_OVERHEAD = 200
+
+
+class ResultCache:
+    """
+    LRU-кэш результатов ``process_points`` с ограничением по байтам.
+    
+    Кэшируются только наборы ``PointSet``: их буфер хэшируется напрямую.
+    Результаты отдаются без копирования и общие для всех пользователей,
+    поэтому изменять их нельзя.
+    """
+    
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+    
+    @staticmethod
+    def digest(points):
+        """Хэш содержимого набора точек."""
+        return hashlib.blake2b(points.buffer, digest_size=16).digest()
+    
+    def get(self, digest, method):
+        """Возвращает результат из кэша или None."""
+        key = (digest, method)
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+    
+    def put(self, digest, method, result):
+        """Кладёт результат в кэш, вытесняя старые записи при переполнении."""
+        size = result.nbytes + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        
+        key = (digest, method)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes + ENTRY_OVERHEAD
+        
+        self._entries[key] = result
+        self._bytes += size
+        
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes + ENTRY_OVERHEAD
+            self.evictions += 1
+    
+    def process(self, points, method, use_cache=True):
+        """``process_points`` через кэш; исключения те же, что у ``process_points``."""
+        if not (use_cache and self.enabled and isinstance(points, PointSet)):
+            return process_points(points, method)
+        
+        digest = self.digest(points)
+        result = self.get(digest, method)
+        if result is None:
+            result = process_points(points, method)
+            self.put(digest, method, result)
+        return result
+    
+    def process_all(self, points, use_cache=True):
+        """
+        ``process_all_methods`` через кэш.
+        
+        Результаты всех методов кладутся по отдельности, поэтому дальше
+        их находит и ``process``; ошибки методов не кэшируются. Возвращает
+        то же, что ``process_all_methods``, и с теми же исключениями.
+        """
+        if not (use_cache and self.enabled and isinstance(points, PointSet)):
+            return process_all_methods(points)
+        
+        digest = self.digest(points)
+        cached = self._get_all(digest)
+        if cached is not None:
+            return cached, {}
+        
+        results, errors = process_all_methods(points)
+        self._put_all(digest, results)
+        return results, errors
+    
+    async def aprocess(self, points, method, executor):
+        """Асинхронный ``process``: при промахе считает через ``executor.run``."""
+        if not (self.enabled and isinstance(points, PointSet)):
+            return await executor.run(
+                process_points, points, method, measure=measure_processing(method, len(points))
+            )
+        
+        digest = self.digest(points)
+        result = self.get(digest, method)
+        if result is None:
+            result = await executor.run(
+                process_points, points, method, measure=measure_processing(method, len(points))
+            )
+            self.put(digest, method, result)
+        return result
+    
+    async def aprocess_all(self, points, executor):
+        """Асинхронный ``process_all``: при промахе считает через ``executor.run``."""
+        if not (self.enabled and isinstance(points, PointSet)):
+            return await executor.run(
+                process_all_methods, points, measure=measure_processing(ALL_METHODS, len(points))
+            )
+        
+        digest = self.digest(points)
+        cached = self._get_all(digest)
+        if cached is not None:
+            return cached, {}
+        
+        results, errors = await executor.run(
+            process_all_methods, points, measure=measure_processing(ALL_METHODS, len(points))
+        )
+        self._put_all(digest, results)
+        return results, errors
+    
+    def _get_all(self, digest):
+        """
+        Результаты всех методов из кэша или None, если хоть одного нет.
+        
+        Совместный запрос считается одним попаданием или одним промахом,
+        как и одиночный ``get``, иначе доля попаданий в ``stats`` смещена.
+        """
+        cached = {method: self._entries.get((digest, method)) for method in METHODS}
+        if any(result is None for result in cached.values()):
+            self.misses += 1
+            return None
+        for method in METHODS:
+            self._entries.move_to_end((digest, method))
+        self.hits += 1
+        return cached
+    
+    def _put_all(self, digest, results):
+        for method, result in results.items():
+            self.put(digest, method, result)
+    
+    def stats(self):
+        """Счётчики кэша."""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+    
+    def clear(self):
+        """Очищает кэш (счётчики сохраняются)."""
+        self._entries.clear()
+        self._bytes = 0
+
+
+# Общий кэш процесса: один на всех пользователей бота
+result_cache = ResultCache(
+    max_bytes=int(os.getenv("POINTS_CACHE_BYTES", DEFAULT_MAX_BYTES)),
+    enabled=os.getenv("POINTS_CACHE_DISABLED", "") not in ("1", "true", "yes"),
+)
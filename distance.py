@@ -1,5 +1,6 @@
 import math
 from exceptions import DistanceCalculationException, InsufficientPointsException
+from metrics import FIND_ALL_CLOSEST_SECONDS, size_bucket, registry as metrics
 
 
 def calc_dist(p1, p2):
@@ -43,4 +44,227 @@ def find_closest(target, points):
         return closest
     
     except ValueError as e:
-        raise InsufficientPointsException(actual=len(points)) from e
\ No newline at end of file
+        raise InsufficientPointsException(actual=len(points)) from e
+
+
+def unique_points(points):
+    """
+    Склеивает точки с равными координатами.
+    
+    Точки с теми же координатами исключаются из поиска вместе с самой
+    точкой, как в ``find_closest``, поэтому дереву достаточно уникальных.
+    Уникальные точки нумеруются в порядке первого вхождения.
+    
+    Returns
+    -------
+    tuple
+        ``(xs, ys, first, owner)``: координаты уникальных точек, индекс
+        первого вхождения каждой и номер уникальной точки для каждой исходной
+    
+    Raises
+    ------
+    DistanceCalculationException
+        Если какую-то точку нельзя разобрать как пару чисел
+    """
+    xs = []
+    ys = []
+    first = []
+    owner = []
+    
+    index = {}
+    for i, p in enumerate(points):
+        try:
+            x, y = p
+            key = (float(x), float(y))
+        except (TypeError, ValueError) as e:
+            raise DistanceCalculationException(p, p) from e
+        
+        uid = index.get(key)
+        if uid is None:
+            uid = len(xs)
+            index[key] = uid
+            xs.append(key[0])
+            ys.append(key[1])
+            first.append(i)
+        owner.append(uid)
+    
+    return xs, ys, first, owner
+
+
+class KDTree:
+    """
+    k-d дерево для поиска ближайших соседей на плоскости.
+    
+    Дерево хранит только уникальные координаты. Для каждой из них
+    запоминается индекс первого вхождения в исходный список: при равных
+    расстояниях побеждает точка, стоящая в списке раньше, как у ``min``
+    в ``find_closest``.
+    
+    Raises
+    ------
+    DistanceCalculationException
+        Если какую-то точку нельзя разобрать как пару чисел
+    """
+    
+    LEAF_SIZE = 16
+    
+    __slots__ = ('xs', 'ys', 'first', 'owner', '_split', '_axis', '_children', '_leaves')
+    
+    def __init__(self, points):
+        self.xs, self.ys, self.first, self.owner = unique_points(points)
+        
+        self._split = []
+        self._axis = []
+        self._children = []
+        self._leaves = []
+        if self.xs:
+            box = (min(self.xs), max(self.xs), min(self.ys), max(self.ys))
+            self._build(list(range(len(self.xs))), box)
+    
+    def __len__(self):
+        return len(self.xs)
+    
+    def _build(self, ids, box):
+        """Рекурсивно строит поддерево и возвращает номер его узла."""
+        node = len(self._split)
+        
+        if len(ids) <= self.LEAF_SIZE:
+            # Листья хранят координаты рядом с номерами, чтобы перебор
+            # не ходил за ними в общие списки
+            xs, ys, first = self.xs, self.ys, self.first
+            self._split.append(0.0)
+            self._axis.append(-1)
+            self._children.append(None)
+            self._leaves.append(tuple((c, xs[c], ys[c], first[c]) for c in ids))
+            return node
+        
+        # Делим ячейку по более длинной стороне: так коллинеарные
+        # наборы не вырождают дерево
+        x_lo, x_hi, y_lo, y_hi = box
+        axis = 0 if x_hi - x_lo >= y_hi - y_lo else 1
+        coords = self.xs if axis == 0 else self.ys
+        
+        ids.sort(key=coords.__getitem__)
+        mid = len(ids) // 2
+        split = coords[ids[mid]]
+        
+        self._split.append(split)
+        self._axis.append(axis)
+        self._children.append(None)
+        self._leaves.append(None)
+        
+        if axis == 0:
+            left_box = (x_lo, split, y_lo, y_hi)
+            right_box = (split, x_hi, y_lo, y_hi)
+        else:
+            left_box = (x_lo, x_hi, y_lo, split)
+            right_box = (x_lo, x_hi, split, y_hi)
+        
+        left = self._build(ids[:mid], left_box)
+        right = self._build(ids[mid:], right_box)
+        self._children[node] = (left, right)
+        return node
+    
+    def nearest(self, uid):
+        """
+        Находит ближайшую к уникальной точке ``uid`` другую точку.
+        
+        Returns
+        -------
+        int or None
+            Индекс найденной точки в исходном списке или None,
+            если других координат в дереве нет
+        """
+        split, axis, children, leaves = self._split, self._axis, self._children, self._leaves
+        sqrt = math.sqrt
+        
+        tx = self.xs[uid]
+        ty = self.ys[uid]
+        best_dist = math.inf
+        best_index = missing = len(self.owner)
+        
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound > best_dist:
+                continue
+            
+            while True:
+                bucket = leaves[node]
+                if bucket is not None:
+                    for c, x, y, i in bucket:
+                        if c == uid:
+                            continue
+                        d = sqrt((x - tx)**2 + (y - ty)**2)
+                        if d < best_dist or (d == best_dist and i < best_index):
+                            best_dist = d
+                            best_index = i
+                    break
+                
+                diff = (tx if axis[node] == 0 else ty) - split[node]
+                left, right = children[node]
+                if diff < 0:
+                    stack.append((right, -diff))
+                    node = left
+                else:
+                    stack.append((left, diff))
+                    node = right
+        
+        return None if best_index == missing else best_index
+    
+    def all_nearest(self):
+        """
+        Находит ближайшую другую точку для каждой уникальной точки.
+        
+        Точки обходятся в порядке листьев: соседние запросы проходят
+        по одним и тем же узлам, что заметно быстрее случайного порядка.
+        
+        Returns
+        -------
+        list
+            Для каждой уникальной точки результат ``nearest``
+        """
+        result = [None] * len(self.xs)
+        for c in self.leaf_order():
+            result[c] = self.nearest(c)
+        return result
+    
+    def leaf_order(self):
+        """Возвращает номера уникальных точек в порядке обхода листьев."""
+        return [c for bucket in self._leaves if bucket is not None for c, _, _, _ in bucket]
+
+
+def find_all_closest(points):
+    """
+    Находит ближайшую точку для каждой точки списка за O(n log n).
+    
+    Результат совпадает с поэлементным вызовом ``find_closest``:
+    точки с теми же координатами, что и искомая, не рассматриваются,
+    а из равноудалённых выбирается стоящая в списке раньше.
+    
+    Returns
+    -------
+    list
+        Для каждой точки индекс ближайшей к ней в ``points``
+        или None, если ближайшей нет
+    
+    Raises
+    ------
+    DistanceCalculationException
+        Если какую-то точку нельзя разобрать как пару чисел
+    """
+    if len(points) <= 1:
+        return [None] * len(points)
+    
+    if not metrics.enabled:
+        return _find_all_closest(points)
+    with metrics.timer(FIND_ALL_CLOSEST_SECONDS, (size_bucket(len(points)),)):
+        return _find_all_closest(points)
+
+
+def _find_all_closest(points):
+    tree = KDTree(points)
+    
+    # Дубликаты делят один ответ, поэтому ищем только по уникальным точкам
+    nearest = tree.all_nearest()
+    return [nearest[uid] for uid in tree.owner]
\ No newline at end of file
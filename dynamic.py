@@ -0,0 +1,286 @@
+"""
+Изменяемый набор точек с инкрементально поддерживаемыми результатами.
+
+При ручном вводе точки добавляются по одной, а результаты нужны сразу
+после /done. ``DynamicPointSet`` пересчитывает при каждой вставке и
+удалении только то, что действительно изменилось:
+
+- ``sequential`` — две соседние с правкой позиции;
+- ``min_sum`` и ``min_x`` — особая точка сравнивается только с новой,
+  а общий пересчёт нужен лишь когда особая точка сменилась;
+- ``original`` — только точки, у которых сменился ближайший сосед.
+"""
+
+import math
+from array import array
+
+from distance import find_all_closest
+from points import METHODS, process_sequential
+from pointset import PointSet
+
+
+# Пакетная вставка дешевле полной перестройки, пока m * n не больше
+# REBUILD_FACTOR * (n + m): перестройка через k-d дерево стоит O((n + m) log)
+REBUILD_FACTOR = 32
+
+_SPECIAL_KEYS = {
+    "min_sum": lambda x, y: x + y,
+    "min_x": lambda x, y: (x, y),
+}
+
+
+class DynamicPointSet:
+    """
+    Набор точек, для которого результаты всех методов всегда актуальны.
+    
+    Атрибут ``points`` — обычный ``PointSet``; его можно читать и передавать
+    куда угодно, но изменять следует только через методы этого класса.
+    """
+    
+    def __init__(self, points=()):
+        self.points = PointSet()
+        self._reset()
+        self.extend(points)
+    
+    def _reset(self):
+        """Сбрасывает служебные структуры под пустой набор."""
+        # Для каждой точки: индекс ближайшей (-1, если её нет) и расстояние до неё
+        self._nearest = array('q')
+        self._nearest_dist = array('d')
+        self._results = {method: PointSet() for method in METHODS}
+        # Индекс особой точки или None, если её нужно найти заново;
+        # результат min-метода None, пока его не материализовали
+        self._special = {method: None for method in _SPECIAL_KEYS}
+    
+    def __len__(self):
+        return len(self.points)
+    
+    @property
+    def nbytes(self):
+        """Объём памяти под точки, результаты и служебные массивы в байтах."""
+        size = self.points.nbytes
+        size += self._nearest.itemsize * len(self._nearest)
+        size += self._nearest_dist.itemsize * len(self._nearest_dist)
+        for result in self._results.values():
+            if result is not None:
+                size += result.nbytes
+        return size
+    
+    def __iter__(self):
+        return iter(self.points)
+    
+    def __getitem__(self, index):
+        return self.points[index]
+    
+    def result(self, method):
+        """
+        Возвращает актуальный результат метода (копию).
+        
+        Raises
+        ------
+        KeyError
+            Если метод неизвестен
+        """
+        if method in _SPECIAL_KEYS and self._results[method] is None:
+            self._materialize(method)
+        return self._results[method].copy()
+    
+    def append(self, point):
+        self.insert(len(self.points), point)
+    
+    def extend(self, points):
+        """Добавляет точки: по одной или полной перестройкой, если так дешевле."""
+        new = points if isinstance(points, PointSet) else PointSet(points)
+        n, m = len(self.points), len(new)
+        if m * n <= REBUILD_FACTOR * (n + m) and n:
+            for point in new:
+                self.append(point)
+            return
+        
+        self.points.extend(new)
+        self._rebuild()
+    
+    def clear(self):
+        self.points.clear()
+        self._reset()
+    
+    def insert(self, index, point):
+        """Вставляет точку в позицию ``index`` и обновляет результаты."""
+        n = len(self.points)
+        i = max(0, min(index if index >= 0 else index + n, n))
+        self.points.insert(i, point)
+        x, y = self.points[i]
+        n += 1
+        
+        # Ближайшие соседи: новая точка может стать соседом для любой другой
+        nearest, nearest_dist = self._nearest, self._nearest_dist
+        nearest.insert(i, -1)
+        nearest_dist.insert(i, math.inf)
+        
+        best, best_dist = -1, math.inf
+        changed = []
+        for k, (px, py) in enumerate(self.points):
+            if k == i:
+                continue
+            j = nearest[k]
+            if j >= i:
+                j += 1
+                nearest[k] = j
+            if px == x and py == y:
+                continue
+            
+            d = math.sqrt((px - x)**2 + (py - y)**2)
+            if best == -1 or d < best_dist:
+                best, best_dist = k, d
+            if j == -1 or d < nearest_dist[k] or (d == nearest_dist[k] and i < j):
+                nearest[k] = i
+                nearest_dist[k] = d
+                changed.append(k)
+        
+        nearest[i] = best
+        nearest_dist[i] = best_dist
+        
+        original = self._results["original"]
+        if best == -1:
+            original.insert(i, (x, y))
+        else:
+            bx, by = self.points[best]
+            original.insert(i, (x + bx, y + by))
+        for k in changed:
+            px, py = self.points[k]
+            original[k] = (px + x, py + y)
+        
+        # Последовательный: меняются пары (i - 1, i) и (i, i + 1)
+        sequential = self._results["sequential"]
+        sequential.insert(i, (x, y))
+        self._update_sequential(i)
+        self._update_sequential((i - 1) % n)
+        
+        # Особые точки: новая сравнивается только с текущей
+        for method, key in _SPECIAL_KEYS.items():
+            s = self._special[method]
+            if s is None:
+                if n == 1:
+                    self._special[method] = i
+                self._results[method] = None
+                continue
+            if s >= i:
+                s += 1
+            sx, sy = self.points[s]
+            new_key, old_key = key(x, y), key(sx, sy)
+            if new_key < old_key or (new_key == old_key and i < s):
+                self._special[method] = i
+                self._results[method] = None
+            else:
+                self._special[method] = s
+                if self._results[method] is not None:
+                    self._results[method].insert(i, (x + sx, y + sy))
+    
+    def __delitem__(self, index):
+        """Удаляет точку и обновляет результаты."""
+        n = len(self.points)
+        i = index + n if index < 0 else index
+        if not 0 <= i < n:
+            raise IndexError("индекс точки вне диапазона")
+        
+        del self.points[i]
+        n -= 1
+        
+        nearest, nearest_dist = self._nearest, self._nearest_dist
+        del nearest[i]
+        del nearest_dist[i]
+        
+        # Соседей заново ищут только те, чьим соседом была удалённая точка
+        orphans = []
+        for k in range(n):
+            j = nearest[k]
+            if j == i:
+                orphans.append(k)
+            elif j > i:
+                nearest[k] = j - 1
+        
+        original = self._results["original"]
+        del original[i]
+        for k in orphans:
+            j, d = self._scan_nearest(k)
+            nearest[k] = j
+            nearest_dist[k] = d
+            px, py = self.points[k]
+            if j == -1:
+                original[k] = (px, py)
+            else:
+                cx, cy = self.points[j]
+                original[k] = (px + cx, py + cy)
+        
+        del self._results["sequential"][i]
+        if n:
+            self._update_sequential((i - 1) % n)
+        
+        for method in _SPECIAL_KEYS:
+            s = self._special[method]
+            if s == i or n == 0:
+                self._special[method] = None
+                self._results[method] = None
+                continue
+            if s is not None and s > i:
+                self._special[method] = s - 1
+            if self._results[method] is not None:
+                del self._results[method][i]
+    
+    def _rebuild(self):
+        """Пересчитывает всё с нуля через k-d дерево."""
+        points = self.points
+        self._reset()
+        if not points:
+            return
+        
+        closest = find_all_closest(points)
+        original = self._results["original"]
+        for k, ((px, py), j) in enumerate(zip(points, closest)):
+            if j is None:
+                self._nearest.append(-1)
+                self._nearest_dist.append(math.inf)
+                original.append((px, py))
+            else:
+                cx, cy = points[j]
+                self._nearest.append(j)
+                self._nearest_dist.append(math.sqrt((cx - px)**2 + (cy - py)**2))
+                original.append((px + cx, py + cy))
+        
+        self._results["sequential"] = process_sequential(points)
+        for method in _SPECIAL_KEYS:
+            self._results[method] = None
+    
+    def _materialize(self, method):
+        """Находит особую точку (если нужно) и строит результат min-метода."""
+        points = self.points
+        s = self._special[method]
+        if s is None and points:
+            key = _SPECIAL_KEYS[method]
+            s = min(range(len(points)), key=lambda k: key(*points[k]))
+            self._special[method] = s
+        
+        result = PointSet()
+        if points:
+            sx, sy = points[s]
+            result.extend((x + sx, y + sy) for x, y in points)
+        self._results[method] = result
+    
+    def _update_sequential(self, k):
+        """Пересчитывает k-й элемент результата ``sequential``."""
+        n = len(self.points)
+        x, y = self.points[k]
+        nx, ny = self.points[(k + 1) % n]
+        self._results["sequential"][k] = (x + nx, y + ny)
+    
+    def _scan_nearest(self, k):
+        """Ищет ближайшую к k-й точке перебором, как find_closest."""
+        x, y = self.points[k]
+        best, best_dist = -1, math.inf
+        for c, (px, py) in enumerate(self.points):
+            if c == k or (px == x and py == y):
+                continue
+            d = math.sqrt((px - x)**2 + (py - y)**2)
+            if best == -1 or d < best_dist:
+                best, best_dist = c, d
+        return best, best_dist
@@ -35,6 +35,24 @@ class InvalidNumberException(InputException):
         super().__init__(f"Некорректное значение {field}: '{value}'. Ожидается число")
 
 
+class InvalidPointFileException(InputException):
+    """Файл не соответствует двоичному формату точек."""
+    
+    def __init__(self, path, reason):
+        self.path = path
+        self.reason = reason
+        super().__init__(f"Некорректный файл точек '{path}': {reason}")
+
+
+class UploadTooLargeException(InputException):
+    """Загружаемый файл больше допустимого размера."""
+    
+    def __init__(self, size, limit):
+        self.size = size
+        self.limit = limit
+        super().__init__(f"Файл слишком большой: {size} байт, допустимо не более {limit}")
+
+
 class ProcessingException(PointsProcessorException):
     """Исключения, связанные с обработкой точек."""
     pass
@@ -64,6 +82,42 @@ class InvalidMethodException(ProcessingException):
         super().__init__(f"Неизвестный метод обработки: '{method}'")
 
 
+class NonReiterableSourceException(ProcessingException):
+    """Источник точек нельзя обойти повторно."""
+    
+    def __init__(self, method):
+        self.method = method
+        super().__init__(
+            f"Метод '{method}' читает точки в два прохода: "
+            "нужен переитерируемый источник (список, файл), а не итератор"
+        )
+
+
+class InvalidBackendException(ProcessingException):
+    """Некорректный вычислительный бэкенд."""
+    
+    def __init__(self, backend):
+        self.backend = backend
+        super().__init__(f"Неизвестный бэкенд обработки: '{backend}'")
+
+
+class BackendUnavailableException(ProcessingException):
+    """Бэкенд известен, но его зависимости не установлены."""
+    
+    def __init__(self, backend, dependency):
+        self.backend = backend
+        self.dependency = dependency
+        super().__init__(f"Бэкенд '{backend}' недоступен: не установлен пакет '{dependency}'")
+
+
+class ProcessingTimeoutException(ProcessingException):
+    """Обработка не уложилась в отведённое время."""
+    
+    def __init__(self, timeout):
+        self.timeout = timeout
+        super().__init__(f"Обработка не завершилась за {timeout:g} с")
+
+
 class CalculationException(PointsProcessorException):
     """Исключения, связанные с вычислениями."""
     pass
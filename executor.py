@@ -0,0 +1,223 @@
+"""
+Вынос тяжёлой обработки точек из цикла событий бота.
+
+Обработчики бота асинхронные, а ``process_points`` — синхронный и на
+больших наборах может работать секундами, замораживая ``run_polling`` для
+всех пользователей. ``ProcessingExecutor`` держит заранее запущенный пул
+процессов с уже импортированными модулями обработки: маленькие наборы
+считаются прямо в цикле (это дешевле пересылки), большие — в пуле,
+а обработчик ждёт результат через ``await`` с ограничением по времени.
+
+Отменить уже начатую задачу в процессе пула нельзя, поэтому при таймауте
+такой задачи пул заменяется свежим, а старый вместе с зависшим процессом
+останавливается, когда все его задачи отслужат свой таймаут.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from exceptions import ProcessingTimeoutException
+from metrics import registry as metrics
+from profiling import profiler
+from tracing import tracer
+
+
+# Наборы не больше этого размера считаются прямо в цикле событий
+DEFAULT_INLINE_MAX_POINTS = 2000
+
+# Сколько секунд ждать одну задачу в пуле
+DEFAULT_TIMEOUT = 30.0
+
+JOB_SECONDS = metrics.histogram(
+    "processing_job_seconds",
+    "Длительность задачи обработки с учётом ожидания пула",
+    ("mode",),
+)
+JOB_TIMEOUTS = metrics.counter("processing_job_timeouts_total", "Задачи, не уложившиеся в таймаут")
+POOL_RECYCLES = metrics.counter(
+    "processing_pool_recycles_total", "Замены пула из-за задачи, зависшей в процессе"
+)
+
+
+def _warm_worker(pids=None):
+    """
+    Импортирует модули обработки при старте процесса пула.
+    
+    В ``pids`` процесс сообщает родителю свой PID: по нему родитель находит
+    процессы пула, чтобы остановить зависший.
+    """
+    import distance  # noqa: F401
+    import points  # noqa: F401
+    import pointset  # noqa: F401
+    
+    # Профилирование в пуле заказывает родитель: взводы, унаследованные
+    # при fork, здесь не действуют
+    profiler.disarm()
+    # Метрики и трассы процесса пула никто не читает: задачу замеряет родитель
+    metrics.enabled = False
+    tracer.path = None
+    
+    if pids is not None:
+        pids.put(os.getpid())
+
+
+def _noop():
+    return None
+
+
+class ProcessingExecutor:
+    """
+    Пул процессов для обработки точек с порогом и таймаутом.
+    
+    Пока пул не запущен через ``start``, все задачи выполняются в цикле
+    событий — так модуль можно использовать и без пула (консоль, тесты).
+    """
+    
+    def __init__(self, workers=None, inline_max_points=DEFAULT_INLINE_MAX_POINTS, timeout=DEFAULT_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.inline_max_points = inline_max_points
+        self.timeout = timeout
+        self.recycles = 0
+        self._pool = None
+        # Пул -> (очередь, куда процессы пишут PID, уже прочитанные PID)
+        self._pids = {}
+        # Старый пул -> его процессы; ждут остановки после замены пула
+        self._retired = {}
+    
+    @property
+    def running(self):
+        return self._pool is not None
+    
+    def start(self):
+        """
+        Запускает пул и дожидается подъёма всех процессов.
+        
+        Вызывается до старта цикла событий: на Linux процессы порождаются
+        через fork сразу все и наследуют уже импортированные модули.
+        """
+        if self._pool is not None:
+            return
+        self._pool = self._new_pool(multiprocessing.get_context())
+        for future in [self._pool.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+    
+    def shutdown(self):
+        """Останавливает пул, отменяя задачи, которые ещё не начались."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pids.pop(self._pool, None)
+            self._pool = None
+        for pool, processes in self._retired.items():
+            _terminate(pool, processes)
+        self._retired.clear()
+    
+    def _recycle(self):
+        """
+        Заменяет пул свежим из-за задачи, которую нельзя отменить.
+        
+        Новые задачи сразу идут в новый пул. Старый доделывает уже принятые
+        и через ``timeout`` секунд останавливается вместе с процессами: к
+        этому моменту все, кто ждал его задач, уже получили таймаут.
+        Цикл событий к этому времени работает в других потоках, поэтому
+        новый пул порождает процессы через forkserver, а не fork.
+        """
+        old = self._pool
+        context = multiprocessing.get_context("forkserver" if os.name == "posix" else "spawn")
+        self._pool = self._new_pool(context)
+        self._retired[old] = self._processes(old)
+        old.shutdown(wait=False)
+        asyncio.get_running_loop().call_later(self.timeout, self._stop_retired, old)
+        self.recycles += 1
+        if metrics.enabled:
+            POOL_RECYCLES.inc()
+    
+    def _new_pool(self, context):
+        pids = context.SimpleQueue()
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_warm_worker, initargs=(pids,), mp_context=context,
+        )
+        self._pids[pool] = (pids, set())
+        return pool
+    
+    def _processes(self, pool):
+        """
+        Процессы пула по PID, которые они сообщили при старте.
+        
+        Сами объекты процессов берутся из ``multiprocessing.active_children``:
+        в отличие от голого PID, они не укажут на чужой процесс, если
+        завершившийся процесс пула уже освободил свой номер.
+        """
+        queue, pids = self._pids.pop(pool)
+        while not queue.empty():
+            pids.add(queue.get())
+        queue.close()
+        return [process for process in multiprocessing.active_children() if process.pid in pids]
+    
+    def _stop_retired(self, pool):
+        processes = self._retired.pop(pool, None)
+        if processes is not None:
+            _terminate(pool, processes)
+    
+    async def run(self, func, points, *args, measure=None):
+        """
+        Выполняет ``func(points, *args)`` в пуле или в цикле событий.
+        
+        Parameters
+        ----------
+        measure : context manager or None
+            Чем замерить задачу в пуле, например ``measure_processing``:
+            метрики и трассы процесса пула до родителя не доходят, поэтому
+            их пишет родитель, пока ждёт результат. В цикле событий не
+            используется — там ``func`` замеряет себя сама
+        
+        Raises
+        ------
+        ProcessingTimeoutException
+            Если задача в пуле не уложилась в ``timeout``. Если расчёт уже
+            начался, пул заменяется свежим, а процесс с ним останавливается
+        """
+        if self._pool is None or len(points) <= self.inline_max_points:
+            with tracer.span("processing", job=func.__name__, mode="inline", n=len(points)), \
+                    metrics.timer(JOB_SECONDS, ("inline",)):
+                return func(points, *args)
+        
+        capture = profiler.take(
+            func.__name__, method=args[0] if args and isinstance(args[0], str) else None, n=len(points)
+        )
+        pool = self._pool
+        if capture is None:
+            future = pool.submit(func, points, *args)
+        else:
+            future = pool.submit(capture.run, func, points, *args)
+        try:
+            with tracer.span("processing", job=func.__name__, mode="pool", n=len(points)), \
+                    metrics.timer(JOB_SECONDS, ("pool",)), \
+                    measure or contextlib.nullcontext():
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            # Задачу из очереди отменяет cancel, начатую — только замена пула;
+            # пул, уже заменённый из-за другой задачи, остановится и так
+            if not future.cancel() and not future.done() and pool is self._pool:
+                self._recycle()
+            if metrics.enabled:
+                JOB_TIMEOUTS.inc()
+            raise ProcessingTimeoutException(self.timeout) from None
+
+
+def _terminate(pool, processes):
+    """Останавливает процессы пула, не дожидаясь их задач."""
+    pool.shutdown(wait=False, cancel_futures=True)
+    # У ProcessPoolExecutor нет открытого способа прервать начатую задачу
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+processing_executor = ProcessingExecutor(
+    workers=int(os.getenv("PROCESS_POOL_WORKERS", "0")) or None,
+    inline_max_points=int(os.getenv("PROCESS_INLINE_MAX_POINTS", DEFAULT_INLINE_MAX_POINTS)),
+    timeout=float(os.getenv("PROCESS_JOB_TIMEOUT", DEFAULT_TIMEOUT)),
+)
@@ -0,0 +1,81 @@
+"""
+Выгрузка точек и результатов в файлы для отправки документом.
+
+Большие результаты не помещаются в сообщение, поэтому бот отдаёт их
+файлом. Файл пишется блоками во временный ``SpooledTemporaryFile``:
+небольшие выгрузки остаются в памяти, большие уходят на диск, и ни
+в какой момент не строится одна строка на весь набор.
+"""
+
+import tempfile
+
+from pointfile import write_points
+
+
+# До этого размера выгрузка держится в памяти, дальше — во временном файле
+SPOOL_MAX_BYTES = 4 * 1024 * 1024
+
+# Сколько строк CSV форматируется и пишется за раз
+CSV_CHUNK_ROWS = 4096
+
+
+def _spooled_file():
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b")
+
+
+def export_csv(columns):
+    """
+    Записывает наборы точек столбцами в CSV.
+    
+    Parameters
+    ----------
+    columns : list
+        Пары ``(имя, точки)``; каждый набор даёт столбцы ``имя_x`` и ``имя_y``.
+        Строк столько, сколько точек в самом длинном наборе, недостающие
+        значения остаются пустыми
+    
+    Returns
+    -------
+    SpooledTemporaryFile
+        Файл, перемотанный в начало
+    """
+    f = _spooled_file()
+    header = ["index"]
+    for name, _ in columns:
+        header += [f"{name}_x", f"{name}_y"]
+    f.write((",".join(header) + "\n").encode())
+    
+    total = max((len(points) for _, points in columns), default=0)
+    for start in range(0, total, CSV_CHUNK_ROWS):
+        stop = min(start + CSV_CHUNK_ROWS, total)
+        # Срезы PointSet копируют только этот блок
+        blocks = [list(points[start:stop]) for _, points in columns]
+        lines = []
+        for offset in range(stop - start):
+            row = [str(start + offset)]
+            for block in blocks:
+                if offset < len(block):
+                    x, y = block[offset]
+                    row += [repr(x), repr(y)]
+                else:
+                    row += ["", ""]
+            lines.append(",".join(row))
+        f.write(("\n".join(lines) + "\n").encode())
+    
+    f.seek(0)
+    return f
+
+
+def export_binary(points):
+    """
+    Записывает точки в двоичном формате ``pointfile``.
+    
+    Returns
+    -------
+    SpooledTemporaryFile
+        Файл, перемотанный в начало
+    """
+    f = _spooled_file()
+    write_points(f, points)
+    f.seek(0)
+    return f
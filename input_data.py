@@ -1,56 +1,31 @@
 import random
-from exceptions import InvalidInputFormatException, InvalidNumberException
+import re
+from itertools import islice
+from typing import NamedTuple
+
+from exceptions import InputException, InvalidInputFormatException, InvalidNumberException
+from pointset import PointSet
 
 
 def input_by_hand():
     """
     Интерактивный ввод точек с клавиатуры.
     
+    В одной строке можно вводить сразу несколько точек: строка целиком
+    разбирается через ``parse_points``, ошибки выводятся с позицией.
+    
     Returns
     -------
-    list
-        Список точек
-    
-    Raises
-    ------
-    InvalidInputFormatException
-        Если формат ввода некорректен
-    InvalidNumberException
-        Если введено некорректное число
+    PointSet
+        Введённые точки
     """
-    points = []
-    print("\n=== Ручной ввод ===")
-    print("Формат: x,y  (например: 3,4)")
-    print("Для выхода введите 'стоп'")
+    points = PointSet()
+    _print_manual_help()
     
-    count = 1
     while True:
         try:
-            user = input(f"Точка {count}: ").strip()
-            
-            if user.lower() in ['стоп', 'stop', '']:
+            if not _add_manual_line(points, input(f"Точка {len(points) + 1}: ")):
                 break
-            
-            parts = user.split(',')
-            if len(parts) != 2:
-                raise InvalidInputFormatException(user)
-            
-            try:
-                x = float(parts[0])
-            except ValueError:
-                raise InvalidNumberException(parts[0], "координата X")
-            
-            try:
-                y = float(parts[1])
-            except ValueError:
-                raise InvalidNumberException(parts[1], "координата Y")
-            
-            points.append((x, y))
-            count += 1
-        
-        except (InvalidInputFormatException, InvalidNumberException) as e:
-            print(f"Ошибка: {e}")
-            continue
         except Exception as e:
             print(f"Неожиданная ошибка: {e}")
             continue
@@ -59,6 +34,191 @@ def input_by_hand():
     return points
 
 
+async def input_by_hand_async(read):
+    """
+    Интерактивный ввод точек, как ``input_by_hand``, без блокировки цикла событий.
+    
+    Parameters
+    ----------
+    read : callable
+        Асинхронная функция ``read(prompt) -> str``, например ``AsyncConsole.input``
+    
+    Returns
+    -------
+    PointSet
+        Введённые точки
+    
+    Raises
+    ------
+    EOFError
+        Если ввод закончился
+    """
+    points = PointSet()
+    _print_manual_help()
+    
+    while _add_manual_line(points, await read(f"Точка {len(points) + 1}: ")):
+        pass
+    
+    print(f"Введено точек: {len(points)}")
+    return points
+
+
+def _print_manual_help():
+    print("\n=== Ручной ввод ===")
+    print("Формат: x,y  (например: 3,4)")
+    print("Можно несколько точек в строке: 1,2 3,4; 5,6")
+    print("Для выхода введите 'стоп'")
+
+
+def _add_manual_line(points, line):
+    """Разбирает строку ручного ввода в ``points``; False — ввод закончен."""
+    user = line.strip()
+    if user.lower() in ['стоп', 'stop', '']:
+        return False
+    
+    parsed, errors = parse_points(user)
+    points.extend(parsed)
+    
+    for error in errors:
+        print(f"Ошибка (позиция {error.column}): {error.error}")
+    return True
+
+
+class ParseError(NamedTuple):
+    """Ошибка разбора с позицией в тексте (строка и столбец с 1)."""
+    line: int
+    column: int
+    error: InputException
+
+
+# Токены: число (всё, что не разделитель) или конец записи
+_TOKEN_RE = re.compile(r"[^\s,;]+|[\n;]")
+
+
+def parse_points(text, start_line=1):
+    """
+    Разбирает сразу много точек из текста за один проход.
+    
+    Записи разделяются переводом строки или ``;``, числа внутри записи —
+    запятыми и/или пробелами и объединяются в пары по порядку. Так читаются
+    ``3,4``, ``3 4``, CSV-строки ``x,y`` и ``1,2 3,4 5,6`` в одной строке.
+    Ошибки не прерывают разбор: некорректная запись или пара пропускается,
+    а ошибка добавляется в список.
+    
+    Parameters
+    ----------
+    text : str
+        Текст с точками
+    start_line : int
+        Номер первой строки текста (для разбора файла по частям)
+    
+    Returns
+    -------
+    tuple
+        ``(PointSet, list[ParseError])``
+    """
+    points = PointSet()
+    errors = []
+    
+    line = start_line
+    line_start = 0
+    fields = []
+    
+    for match in _TOKEN_RE.finditer(text):
+        token = match.group()
+        if token != "\n" and token != ";":
+            fields.append((token, match.start()))
+            continue
+        
+        _flush_record(fields, points, errors, line, line_start, text)
+        fields = []
+        if token == "\n":
+            line += 1
+            line_start = match.end()
+    
+    _flush_record(fields, points, errors, line, line_start, text)
+    return points, errors
+
+
+# Сколько строк файла разбирается за один вызов parse_points
+PARSE_CHUNK_LINES = 4096
+
+
+def parse_points_file(path, max_errors=100, chunk_lines=PARSE_CHUNK_LINES):
+    """
+    Разбирает текстовый файл с точками (CSV, TSV, по точке в строке) блоками строк.
+    
+    В памяти одновременно держатся только текущий блок строк и уже
+    разобранные точки. Ошибки не прерывают разбор, как в ``parse_points``.
+    
+    Parameters
+    ----------
+    path : str or PathLike
+        Путь к файлу
+    max_errors : int
+        Сколько первых ошибок сохранить (остальные только считаются)
+    chunk_lines : int
+        Размер блока в строках
+    
+    Returns
+    -------
+    tuple
+        ``(PointSet, list[ParseError], int)`` — точки, первые ошибки и их общее число
+    """
+    points = PointSet()
+    errors = []
+    error_count = 0
+    
+    # utf-8-sig снимает BOM, который пишут табличные редакторы;
+    # нечитаемые байты превращаются в ошибки разбора, а не в исключение
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        line_no = 1
+        while True:
+            lines = list(islice(f, chunk_lines))
+            if not lines:
+                break
+            parsed, chunk_errors = parse_points("".join(lines), start_line=line_no)
+            points.extend(parsed)
+            error_count += len(chunk_errors)
+            errors.extend(chunk_errors[:max_errors - len(errors)])
+            line_no += len(lines)
+    
+    return points, errors, error_count
+
+
+def _flush_record(fields, points, errors, line, line_start, text):
+    """Превращает поля одной записи в точки или ошибки."""
+    if not fields:
+        return
+    
+    if len(fields) % 2:
+        start = fields[0][1]
+        end = fields[-1][1] + len(fields[-1][0])
+        errors.append(ParseError(
+            line, start - line_start + 1, InvalidInputFormatException(text[start:end])
+        ))
+        return
+    
+    for (x_token, x_pos), (y_token, y_pos) in zip(fields[0::2], fields[1::2]):
+        try:
+            x = float(x_token)
+        except ValueError:
+            errors.append(ParseError(
+                line, x_pos - line_start + 1, InvalidNumberException(x_token, "координата X")
+            ))
+            continue
+        
+        try:
+            y = float(y_token)
+        except ValueError:
+            errors.append(ParseError(
+                line, y_pos - line_start + 1, InvalidNumberException(y_token, "координата Y")
+            ))
+            continue
+        
+        points.append((x, y))
+
+
 def make_random_points(n=5):
     """
     Генерация случайных точек для тестирования.
@@ -70,8 +230,8 @@ def make_random_points(n=5):
     
     Returns
     -------
-    list
-        Список точек
+    PointSet
+        Сгенерированные точки
     
     Raises
     ------
@@ -81,11 +241,39 @@ def make_random_points(n=5):
     if n <= 0:
         raise InvalidNumberException(n, "количество точек")
     
-    points = []
+    points = PointSet()
     for i in range(n):
         x = random.randint(-10, 10)
         y = random.randint(-10, 10)
         points.append((x, y))
     
     print(f"Создано {n} случайных точек")
-    return points
\ No newline at end of file
+    return points
+
+
+class PointsFile:
+    """
+    Текстовый файл с точками, по одной или несколько на строку.
+    
+    Каждый обход заново открывает файл и читает его построчно через
+    ``parse_points``, поэтому источник можно проходить несколько раз,
+    не держа точки в памяти.
+    
+    Raises
+    ------
+    InvalidInputFormatException
+        Если строка не похожа на точки
+    InvalidNumberException
+        Если координата не является числом
+    """
+    
+    def __init__(self, path):
+        self.path = path
+    
+    def __iter__(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                points, errors = parse_points(line, start_line=line_no)
+                if errors:
+                    raise errors[0].error
+                yield from points
\ No newline at end of file
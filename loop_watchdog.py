@@ -0,0 +1,141 @@
+"""
+Сторож цикла событий: замер задержки и поиск блокирующих обработчиков.
+
+Фоновая задача в цикле событий просыпается каждые ``interval`` секунд и
+пишет, насколько позже положенного её разбудили, в гистограмму
+``event_loop_lag_seconds``. Отдельный поток следит за её пульсом: если
+пульса нет дольше ``threshold`` секунд, значит, какой-то колбэк держит
+цикл, и поток снимает стек потока цикла прямо во время блокировки —
+вместе с именем обработчика бота, в котором это происходит.
+
+Настройка из окружения: ``LOOP_LAG_THRESHOLD`` (секунды; 0 — выключено)
+и ``LOOP_WATCHDOG_INTERVAL``.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from metrics import registry as metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Корзины задержки цикла в секундах
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Сколько кадров стека выводить в журнал
+STACK_LIMIT = 30
+
+LOOP_LAG_SECONDS = metrics.histogram(
+    "event_loop_lag_seconds",
+    "Задержка пробуждения задачи-пульса относительно расписания",
+    buckets=LAG_BUCKETS,
+)
+LOOP_STALLS = metrics.counter(
+    "event_loop_stalls_total",
+    "Блокировки цикла дольше порога по обработчику",
+    ("handler",),
+)
+
+
+class LoopWatchdog:
+    """
+    Пульс в цикле событий и поток, снимающий стек при его остановке.
+    
+    Parameters
+    ----------
+    interval : float
+        Период пульса в секундах
+    threshold : float
+        Задержка, начиная с которой цикл считается заблокированным
+    """
+    
+    def __init__(self, interval=0.1, threshold=0.25):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls = 0
+        # Коды функций-обработчиков: по ним в стеке ищется виновник
+        self._handler_codes = set()
+        self._beat = None
+        self._reported_beat = None
+        self._loop_thread_id = None
+        self._task = None
+        self._thread = None
+        self._stop_event = threading.Event()
+    
+    def register_handler(self, func):
+        """Отмечает функцию как обработчик, чьё имя показывать при блокировке."""
+        self._handler_codes.add(func.__code__)
+        return func
+    
+    def start(self):
+        """Запускает пульс и поток наблюдения; вызывается из работающего цикла."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop_event.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Останавливает пульс и поток наблюдения."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+    
+    async def _heartbeat(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            LOOP_LAG_SECONDS.observe(max(0.0, now - expected))
+            self._beat = now
+    
+    def _watch(self):
+        # Проверяем чаще порога, чтобы застать блокировку, пока она идёт
+        period = min(self.interval, self.threshold) / 2
+        while not self._stop_event.wait(period):
+            beat = self._beat
+            blocked = time.perf_counter() - beat - self.interval
+            if blocked > self.threshold and beat != self._reported_beat:
+                self._reported_beat = beat
+                self._report(blocked)
+    
+    def _report(self, blocked):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        handler = self.handler_name(frame)
+        stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+        self.stalls += 1
+        LOOP_STALLS.inc((handler,))
+        logger.warning(
+            "Цикл событий заблокирован дольше %.3f с в обработчике %s:\n%s",
+            blocked, handler, stack,
+        )
+    
+    def handler_name(self, frame):
+        """Ближайший к вершине стека зарегистрированный обработчик или ``unknown``."""
+        while frame is not None:
+            if frame.f_code in self._handler_codes:
+                return frame.f_code.co_name
+            frame = frame.f_back
+        return "unknown"
+
+
+# Общий сторож процесса
+watchdog = LoopWatchdog(
+    interval=float(os.getenv("LOOP_WATCHDOG_INTERVAL", 0.1)),
+    threshold=float(os.getenv("LOOP_LAG_THRESHOLD", 0.25)),
+)
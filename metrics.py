@@ -0,0 +1,284 @@
+"""
+Лёгкий реестр метрик процесса: счётчики, гистограммы и вычисляемые значения.
+
+Метрики собираются прямо в памяти процесса и отдаются двумя способами:
+текстом в формате Prometheus (``render_prometheus``, периодический сброс
+в файл через ``dump``) и сводкой для команды /stats (``summary``).
+
+Выключенный реестр (``METRICS_DISABLED=1``) стоит одной проверки атрибута
+на вызов: ``timer`` и ``timed`` сразу отдают управление, не вызывая часов.
+"""
+
+import asyncio
+import functools
+import math
+import os
+import time
+from bisect import bisect_left
+
+
+# Границы корзин гистограммы задержек в секундах
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def size_bucket(n):
+    """Метка размера входа: наименьшая степень десяти, не меньшая ``n`` (``1e0``…``1e6``, ``inf``)."""
+    bound = 1
+    for power in range(7):
+        if n <= bound:
+            return f"1e{power}"
+        bound *= 10
+    return "inf"
+
+
+class Counter:
+    """Монотонный счётчик с метками."""
+    
+    kind = "counter"
+    
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+    
+    def inc(self, labels=(), amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+    
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name, labels, value
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин, суммой и числом наблюдений."""
+    
+    kind = "histogram"
+    
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [счётчики по корзинам (последняя — +Inf), сумма, количество]
+        self.values = {}
+    
+    def observe(self, value, labels=()):
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+    
+    def quantile(self, q, labels=()):
+        """Оценка квантиля по корзинам (верхняя граница корзины) или None."""
+        entry = self.values.get(labels)
+        if entry is None or entry[2] == 0:
+            return None
+        rank = q * entry[2]
+        seen = 0
+        for bound, count in zip(self.buckets + (math.inf,), entry[0]):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+    
+    def samples(self):
+        for labels, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                yield f"{self.name}_bucket", labels + (("le", le),), cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class Gauge:
+    """Значение, вычисляемое функцией в момент чтения."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name, help_text, func):
+        self.name = name
+        self.help = help_text
+        self.labelnames = ()
+        self.func = func
+    
+    def samples(self):
+        yield self.name, (), self.func()
+
+
+class MetricsRegistry:
+    """
+    Набор метрик процесса.
+    
+    Метки передаются кортежем значений в порядке ``labelnames`` метрики —
+    так запись в горячем пути не строит словарей.
+    """
+    
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = {}
+    
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+    
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+    
+    def gauge(self, name, help_text, func):
+        return self._register(Gauge(name, help_text, func))
+    
+    def get(self, name):
+        return self._metrics.get(name)
+    
+    def timer(self, histogram, labels=()):
+        """Контекстный менеджер, записывающий длительность блока в гистограмму."""
+        return _Timer(self, histogram, labels)
+    
+    def timed(self, histogram, labels=(), errors=None):
+        """
+        Декоратор: длительность каждого вызова функции (синхронной или
+        асинхронной) пишется в ``histogram``, исключения — в счётчик ``errors``.
+        """
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    started = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception:
+                        if errors is not None:
+                            errors.inc(labels)
+                        raise
+                    finally:
+                        histogram.observe(time.perf_counter() - started, labels)
+                return async_wrapper
+            
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    if errors is not None:
+                        errors.inc(labels)
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - started, labels)
+            return wrapper
+        return decorator
+    
+    def render_prometheus(self):
+        """Все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                pairs = list(zip(metric.labelnames, labels[:len(metric.labelnames)]))
+                pairs += labels[len(metric.labelnames):]
+                label_str = ",".join(f'{key}="{_escape(val)}"' for key, val in pairs)
+                lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+    
+    def dump(self, path, text=None):
+        """Атомарно записывает ``render_prometheus`` (или готовый ``text``) в файл."""
+        if text is None:
+            text = self.render_prometheus()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    
+    def summary(self):
+        """
+        Краткая сводка для людей: по счётчикам — значения, по гистограммам —
+        количество, среднее, p50 и p95 (оценки по корзинам).
+        """
+        lines = []
+        for metric in self._metrics.values():
+            if isinstance(metric, Counter):
+                for labels, value in sorted(metric.values.items()):
+                    lines.append(f"{metric.name}{_label_text(labels)}: {value}")
+            elif isinstance(metric, Histogram):
+                for labels, (_, total, count) in sorted(metric.values.items()):
+                    lines.append(
+                        f"{metric.name}{_label_text(labels)}: n={count} "
+                        f"avg={total / count * 1000:.2f}ms "
+                        f"p50≤{_ms(metric.quantile(0.5, labels))} "
+                        f"p95≤{_ms(metric.quantile(0.95, labels))}"
+                    )
+            else:
+                lines.append(f"{metric.name}: {metric.func()}")
+        return "\n".join(lines)
+
+
+class _Timer:
+    __slots__ = ("registry", "histogram", "labels", "started")
+    
+    def __init__(self, registry, histogram, labels):
+        self.registry = registry
+        self.histogram = histogram
+        self.labels = labels
+        self.started = None
+    
+    def __enter__(self):
+        if self.registry.enabled:
+            self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        if self.started is not None:
+            self.histogram.observe(time.perf_counter() - self.started, self.labels)
+        return False
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels):
+    return "[" + ",".join(map(str, labels)) + "]" if labels else ""
+
+
+def _ms(seconds):
+    if seconds is None:
+        return "-"
+    if seconds == math.inf:
+        return "inf"
+    return f"{seconds * 1000:g}ms"
+
+
+# Общий реестр процесса
+registry = MetricsRegistry(
+    enabled=os.getenv("METRICS_DISABLED", "") not in ("1", "true", "yes"),
+)
+
+PROCESS_POINTS_SECONDS = registry.histogram(
+    "points_process_seconds",
+    "Длительность process_points по методу и размеру входа",
+    ("method", "size"),
+)
+FIND_ALL_CLOSEST_SECONDS = registry.histogram(
+    "points_find_all_closest_seconds",
+    "Длительность find_all_closest (k-d дерево в одном процессе) по размеру входа",
+    ("size",),
+)
@@ -0,0 +1,120 @@
+"""
+Многопроцессный поиск ближайших соседей для оригинального метода.
+
+Уникальные координаты один раз копируются в ``multiprocessing.shared_memory``,
+каждый процесс пула строит по ним своё k-d дерево и отвечает за свой
+диапазон листьев, записывая номера соседей в общий выходной буфер. Ни точки,
+ни результаты не передаются через pickle, а результат побитово совпадает
+с однопроцессным ``distance.find_all_closest``: работает тот же ``KDTree``
+над теми же числами float64.
+"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from distance import KDTree, unique_points
+from pointset import PointSet
+
+
+# Меньше этого числа точек запуск пула дороже самой работы
+PARALLEL_MIN_POINTS = 10000
+
+# На сколько частей на процесс делится диапазон листьев: мелкие части
+# выравнивают нагрузку, если какие-то области плотнее других
+SHARDS_PER_WORKER = 4
+
+_NO_NEIGHBOUR = -1
+
+# Состояние процесса пула: заполняется в _init_worker
+_worker = {}
+
+
+def find_all_closest_parallel(points, workers):
+    """
+    Аналог ``distance.find_all_closest``, распределённый по процессам.
+    
+    Parameters
+    ----------
+    points : sequence
+        Точки
+    workers : int
+        Количество процессов
+    
+    Returns
+    -------
+    list
+        Для каждой точки индекс ближайшей к ней или None
+    
+    Raises
+    ------
+    DistanceCalculationException
+        Если какую-то точку нельзя разобрать как пару чисел
+    """
+    n = len(points)
+    if n <= 1:
+        return [None] * n
+    
+    xs, ys, first, owner = unique_points(points)
+    m = len(xs)
+    if m == 1:
+        return [None] * n
+    
+    coords = array('d', [0.0]) * (2 * m)
+    coords[0::2] = array('d', xs)
+    coords[1::2] = array('d', ys)
+    
+    coords_shm = shared_memory.SharedMemory(create=True, size=16 * m)
+    out_shm = shared_memory.SharedMemory(create=True, size=8 * m)
+    try:
+        coords_view = coords_shm.buf[:16 * m].cast('d')
+        coords_view[:] = coords
+        coords_view.release()
+        del coords
+        
+        step = max(1, -(-m // (workers * SHARDS_PER_WORKER)))
+        shards = [(start, min(start + step, m)) for start in range(0, m, step)]
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(coords_shm.name, out_shm.name, m),
+        ) as pool:
+            for _ in pool.map(_query_shard, shards):
+                pass
+        
+        # Уникальные точки пронумерованы в порядке первого вхождения,
+        # поэтому номер соседа переводится в индекс через first
+        out_view = out_shm.buf[:8 * m].cast('q')
+        nearest = [None if j == _NO_NEIGHBOUR else first[j] for j in out_view]
+        out_view.release()
+        return [nearest[uid] for uid in owner]
+    finally:
+        coords_shm.close()
+        coords_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+
+
+def _init_worker(coords_name, out_name, m):
+    """Подключает общую память и строит дерево в процессе пула."""
+    coords_shm = shared_memory.SharedMemory(name=coords_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    
+    tree = KDTree(PointSet.from_buffer(coords_shm.buf[:16 * m]))
+    
+    _worker['shm'] = (coords_shm, out_shm)
+    _worker['tree'] = tree
+    _worker['order'] = tree.leaf_order()
+    _worker['out'] = out_shm.buf[:8 * m].cast('q')
+
+
+def _query_shard(shard):
+    """Находит соседей для листьев из диапазона ``[start, stop)`` порядка обхода."""
+    start, stop = shard
+    tree = _worker['tree']
+    out = _worker['out']
+    
+    for uid in _worker['order'][start:stop]:
+        j = tree.nearest(uid)
+        out[uid] = _NO_NEIGHBOUR if j is None else j
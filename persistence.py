@@ -0,0 +1,303 @@
+"""
+Сохранение сессий бота и состояний диалога в SQLite.
+
+Без этого перезапуск бота стирал у всех пользователей введённые точки и
+сбрасывал ``ConversationHandler`` в начало. ``SQLitePersistence`` пишет
+изменения отложенно: хранилище сессий сообщает о каждой использованной
+сессии, а фоновая задача раз в ``flush_interval`` секунд отбирает те,
+что действительно изменились с прошлой записи, и в отдельном потоке
+сериализует их и записывает одной транзакцией. Сессии читаются с диска
+лениво — при первом обращении пользователя после старта, тоже в потоке,
+поэтому время запуска не зависит от числа сохранённых сессий.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# Как часто (в секундах) удалять с диска сессии старше TTL
+CLEANUP_INTERVAL = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    user_id INTEGER PRIMARY KEY,
+    meta TEXT NOT NULL,
+    points BLOB NOT NULL,
+    result BLOB,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (name, key)
+);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class SQLitePersistence(BasePersistence):
+    """
+    Хранилище сессий и состояний диалогов с отложенной пакетной записью.
+    
+    Для ``Application`` это обычная persistence, которая сохраняет только
+    состояния диалогов (``user_data``, ``chat_data`` и прочее бот хранит сам).
+    Сессии пользователей отслеживаются через ``track_session`` и читаются
+    через ``load_session``; сессия должна уметь ``to_record()``, возвращающий
+    кортеж ``(meta, points, result)``: словарь для JSON и два байтовых блока
+    (``result`` может быть None), и хранить счётчики ``version`` (растёт
+    при каждом изменении) и ``saved_version`` (записанная версия, её
+    выставляет persistence). ``to_record`` вызывается из потока записи.
+    
+    Parameters
+    ----------
+    path : str
+        Путь к файлу базы
+    flush_interval : float
+        Период фоновой записи в секундах
+    ttl : float or None
+        Сессии и диалоги, не менявшиеся дольше, удаляются с диска и
+        не восстанавливаются ни при старте, ни при ленивой загрузке
+    """
+    
+    def __init__(self, path, flush_interval=DEFAULT_FLUSH_INTERVAL, ttl=None):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=False, callback_data=False),
+            update_interval=flush_interval,
+        )
+        self.path = path
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self.writes = 0
+        self.loads = 0
+        
+        # Чтение и запись идут из разных потоков; в режиме WAL читатель
+        # не ждёт писателя
+        self._writer = sqlite3.connect(path, check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("PRAGMA synchronous=NORMAL")
+        self._writer.executescript(_SCHEMA)
+        self._writer.commit()
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        
+        # user_id -> сессия, использованная с последней записи; на диск
+        # попадут только те, у которых version разошлась с saved_version
+        self._tracked = {}
+        # (name, key) -> состояние или None (удалить)
+        self._conversations = {}
+        self._task = None
+        self._last_cleanup = 0.0
+    
+    # --- сессии пользователей ---
+    
+    def load_session(self, user_id):
+        """
+        Читает сессию с диска: ``(meta, points, result)`` или None.
+        
+        Сессии старше TTL не возвращаются, даже если их ещё не удалила
+        очистка. Вызов блокирующий: из цикла событий — через ``asyncio.to_thread``.
+        """
+        query = "SELECT meta, points, result FROM sessions WHERE user_id = ?"
+        params = [user_id]
+        if self.ttl is not None:
+            query += " AND updated >= ?"
+            params.append(time.time() - self.ttl)
+        with self._read_lock:
+            row = self._reader.execute(query, params).fetchone()
+        if row is None:
+            return None
+        self.loads += 1
+        meta, points, result = row
+        return json.loads(meta), points, result
+    
+    def track_session(self, user_id, session):
+        """Запоминает использованную сессию; если она изменится, попадёт на диск при ближайшей записи."""
+        self._tracked[user_id] = session
+    
+    # --- фоновая запись ---
+    
+    def start(self):
+        """Запускает фоновую запись в текущем цикле событий."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+    
+    async def stop(self):
+        """Останавливает фоновую запись и сохраняет всё накопленное."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush_pending()
+    
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush_pending()
+            except Exception:
+                logger.exception("Не удалось сохранить сессии")
+    
+    async def flush_pending(self):
+        """Отбирает изменённые сессии и в потоке сериализует их и пишет на диск."""
+        batch = self._take_batch()
+        if batch is None:
+            return
+        try:
+            changed = await asyncio.to_thread(self._write_batch, *batch)
+        except Exception:
+            # Незаписанные сессии попадут в следующую попытку
+            for user_id, session in batch[0].items():
+                self._tracked.setdefault(user_id, session)
+            raise
+        # Сессии, изменённые уже во время записи, ждут следующей
+        for user_id, session in changed.items():
+            self._tracked.setdefault(user_id, session)
+    
+    def _take_batch(self):
+        """Снимает в цикле событий список изменённых сессий и состояний диалогов."""
+        sessions = {
+            user_id: session for user_id, session in self._tracked.items()
+            if session.version != session.saved_version
+        }
+        self._tracked = {}
+        conversations, self._conversations = self._conversations, {}
+        if not sessions and not conversations:
+            return None
+        
+        now = time.time()
+        cleanup = None
+        if self.ttl is not None and now - self._last_cleanup >= CLEANUP_INTERVAL:
+            self._last_cleanup = now
+            cleanup = now - self.ttl
+        return sessions, conversations, now, cleanup
+    
+    def _write_batch(self, sessions, conversations, now, cleanup):
+        """
+        Сериализует сессии и пишет всё одной транзакцией.
+        
+        Returns
+        -------
+        dict
+            Сессии, изменённые, пока их сериализовали
+        """
+        rows = []
+        versions = {}
+        for user_id, session in sessions.items():
+            # Версия берётся до снимка: правка во время сериализации её обгонит
+            versions[user_id] = session.version
+            meta, points, result = session.to_record()
+            rows.append((user_id, json.dumps(meta), points, result, now))
+        
+        with self._write_lock, self._writer:
+            self._writer.executemany(
+                "INSERT OR REPLACE INTO sessions (user_id, meta, points, result, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            for (name, key), state in conversations.items():
+                if state is None:
+                    self._writer.execute(
+                        "DELETE FROM conversations WHERE name = ? AND key = ?", (name, key)
+                    )
+                else:
+                    self._writer.execute(
+                        "INSERT OR REPLACE INTO conversations (name, key, state, updated) "
+                        "VALUES (?, ?, ?, ?)",
+                        (name, key, json.dumps(state), now),
+                    )
+            if cleanup is not None:
+                self._writer.execute("DELETE FROM sessions WHERE updated < ?", (cleanup,))
+                self._writer.execute("DELETE FROM conversations WHERE updated < ?", (cleanup,))
+        self.writes += len(rows) + len(conversations)
+        
+        changed = {}
+        for user_id, session in sessions.items():
+            session.saved_version = versions[user_id]
+            if session.version != versions[user_id]:
+                changed[user_id] = session
+        return changed
+    
+    def close(self):
+        """Закрывает соединения с базой."""
+        with self._write_lock:
+            self._writer.close()
+        with self._read_lock:
+            self._reader.close()
+    
+    # --- BasePersistence ---
+    
+    async def get_conversations(self, name):
+        # Восстанавливаются только диалоги моложе TTL: их не больше,
+        # чем активных пользователей, а не всех когда-либо сохранённых
+        query = "SELECT key, state FROM conversations WHERE name = ?"
+        params = [name]
+        if self.ttl is not None:
+            query += " AND updated >= ?"
+            params.append(time.time() - self.ttl)
+        
+        rows = await asyncio.to_thread(self._read_all, query, params)
+        return {tuple(json.loads(key)): json.loads(state) for key, state in rows}
+    
+    def _read_all(self, query, params):
+        with self._write_lock:
+            return self._writer.execute(query, params).fetchall()
+    
+    async def update_conversation(self, name, key, new_state):
+        self._conversations[(name, json.dumps(list(key)))] = new_state
+    
+    async def flush(self):
+        await self.stop()
+    
+    async def get_user_data(self):
+        return {}
+    
+    async def get_chat_data(self):
+        return {}
+    
+    async def get_bot_data(self):
+        return {}
+    
+    async def get_callback_data(self):
+        return None
+    
+    async def update_user_data(self, user_id, data):
+        pass
+    
+    async def update_chat_data(self, chat_id, data):
+        pass
+    
+    async def update_bot_data(self, data):
+        pass
+    
+    async def update_callback_data(self, data):
+        pass
+    
+    async def drop_user_data(self, user_id):
+        pass
+    
+    async def drop_chat_data(self, chat_id):
+        pass
+    
+    async def refresh_user_data(self, user_id, user_data):
+        pass
+    
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+    
+    async def refresh_bot_data(self, bot_data):
+        pass
@@ -0,0 +1,145 @@
+"""
+Двоичный формат файла с точками.
+
+Файл состоит из 16-байтового заголовка и координат подряд:
+
+    смещение  размер  поле
+    0         4       сигнатура b"PNTS"
+    4         2       версия формата, uint16 little-endian (сейчас 1)
+    6         2       зарезервировано, 0
+    8         8       количество точек n, uint64 little-endian
+    16        16 * n  x0, y0, x1, y1, ... — float64 little-endian
+
+Загрузчик отображает файл в память через ``mmap`` и отдаёт ``PointSet``
+прямо поверх отображения: ни разбора, ни копирования, поэтому повторное
+открытие даже 10M точек ничего не стоит. Запись идёт блоками и принимает
+как готовые наборы, так и потоки результатов ``process_points_stream``.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from itertools import islice
+
+from exceptions import InvalidPointFileException
+from pointset import PointSet
+
+
+MAGIC = b"PNTS"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+
+# Сколько точек записывается за одно обращение к файлу
+WRITE_CHUNK = 65536
+
+
+def is_point_file(path):
+    """Проверяет, начинается ли файл с сигнатуры двоичного формата."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def load_points(path):
+    """
+    Открывает двоичный файл точек без чтения данных в память.
+    
+    Returns
+    -------
+    PointSet
+        Набор поверх ``mmap`` файла. Он доступен только для чтения:
+        при первом изменении набор копируется в собственный массив
+    
+    Raises
+    ------
+    InvalidPointFileException
+        Если заголовок или размер файла не соответствуют формату
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise InvalidPointFileException(path, "файл короче заголовка")
+        
+        magic, version, _, count = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise InvalidPointFileException(path, "неверная сигнатура")
+        if version != VERSION:
+            raise InvalidPointFileException(path, f"неподдерживаемая версия {version}")
+        
+        size = HEADER.size + 16 * count
+        f.seek(0, 2)
+        if f.tell() != size:
+            raise InvalidPointFileException(path, f"ожидалось {size} байт, в файле {f.tell()}")
+        
+        if count == 0:
+            return PointSet()
+        
+        mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+    
+    view = memoryview(mapped)[HEADER.size:]
+    if sys.byteorder == "little":
+        return PointSet.from_buffer(view)
+    
+    # На big-endian платформе без копирования не обойтись
+    data = array("d", view.cast("d"))
+    data.byteswap()
+    return PointSet.from_flat(data)
+
+
+def save_points(path, points):
+    """
+    Записывает точки в двоичный файл.
+    
+    Parameters
+    ----------
+    path : str or PathLike
+        Путь к файлу
+    points : PointSet or iterable
+        Точки; итератор читается один раз, блоками по ``WRITE_CHUNK``
+    
+    Returns
+    -------
+    int
+        Количество записанных точек
+    """
+    with open(path, "wb") as f:
+        return write_points(f, points)
+
+
+def write_points(f, points):
+    """
+    Записывает точки в двоичном формате в открытый файл.
+    
+    Файл должен поддерживать ``seek``: количество точек дописывается
+    в заголовок после данных. Возвращает количество записанных точек.
+    """
+    start = f.tell()
+    # Количество может быть ещё неизвестно — допишем его в конце
+    f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+    
+    if isinstance(points, PointSet) and sys.byteorder == "little":
+        f.write(points.buffer)
+        count = len(points)
+    else:
+        count = 0
+        it = iter(points)
+        while True:
+            chunk = PointSet(islice(it, WRITE_CHUNK))
+            if not chunk:
+                break
+            if sys.byteorder == "little":
+                f.write(chunk.buffer)
+            else:
+                data = array("d", chunk.buffer)
+                data.byteswap()
+                f.write(data)
+            count += len(chunk)
+    
+    end = f.tell()
+    f.seek(start)
+    f.write(HEADER.pack(MAGIC, VERSION, 0, count))
+    f.seek(end)
+    return count
\ No newline at end of file
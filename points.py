@@ -1,9 +1,26 @@
-from distance import find_closest
+import contextlib
+import os
+from array import array
+from collections.abc import Iterator
+from itertools import cycle
+from operator import add
+
+from distance import find_closest, find_all_closest
 from exceptions import (
+    BackendUnavailableException,
+    DistanceCalculationException,
+    InvalidBackendException,
     InvalidMethodException, 
     EmptyPointsListException,
-    InsufficientPointsException
+    InsufficientPointsException,
+    NonReiterableSourceException
 )
+from input_data import PointsFile
+from metrics import PROCESS_POINTS_SECONDS, size_bucket, registry as metrics
+from profiling import profiler
+from tracing import tracer
+from pointfile import is_point_file, load_points
+from pointset import PointSet
 
 
 def add_two_points(p1, p2):
@@ -21,10 +38,21 @@ def add_two_points(p1, p2):
         raise ValueError(f"Некорректные точки: {p1}, {p2}") from e
 
 
-def process_points(points, method="original"):
+def process_points(points, method="original", backend="python", workers=1):
     """
     Универсальная функция для выбора метода обработки точек.
     
+    Parameters
+    ----------
+    points : list or array
+        Точки для обработки
+    method : str
+        Метод обработки
+    backend : str
+        ``"python"`` — списки кортежей, ``"numpy"`` — массивы формы (n, 2)
+    workers : int
+        Количество процессов для метода ``original`` в бэкенде ``"python"``
+    
     Raises
     ------
     EmptyPointsListException
@@ -33,12 +61,78 @@ def process_points(points, method="original"):
         Если метод неизвестен
     InsufficientPointsException
         Если точек недостаточно для метода
+    InvalidBackendException
+        Если бэкенд неизвестен
+    BackendUnavailableException
+        Если для бэкенда не установлены зависимости
+    """
+    if not (metrics.enabled or tracer.enabled or profiler.armed("process_points")):
+        return _process_points(points, method, backend, workers)
+    
+    n = len(points) if hasattr(points, "__len__") else None
+    # Снятый профилем вызов замеряется и трассируется как обычный;
+    # профиль внутри, чтобы не включать в него накладные расходы замеров
+    capture = profiler.take("process_points", method=method, n=n)
+    with tracer.span("process_points", method=method, backend=backend, n=n), \
+            metrics.timer(PROCESS_POINTS_SECONDS, _labels(method, n)), \
+            capture or contextlib.nullcontext():
+        return _process_points(points, method, backend, workers)
+
+
+def _labels(method, n):
+    return (
+        method if method in METHODS or method == ALL_METHODS else "other",
+        "unknown" if n is None else size_bucket(n),
+    )
+
+
+def measure_processing(method, n):
     """
+    Интервал трассы и таймер ``PROCESS_POINTS_SECONDS`` вокруг блока.
+    
+    Для расчётов, которые не замеряет ``process_points`` этого процесса:
+    задача в пуле (метрики и трассы процесса пула до родителя не доходят)
+    и готовые результаты ручного ввода. ``method`` — метод из ``METHODS``
+    или ``ALL_METHODS`` для всех методов сразу.
+    
+    Пример::
+    
+        with measure_processing("sequential", len(points)):
+            result = await processing_executor.run(process_points, points, "sequential")
+    """
+    return _Measurement(method, n)
+
+
+class _Measurement:
+    __slots__ = ("_span", "_timer")
+    
+    def __init__(self, method, n):
+        name = "process_all_methods" if method == ALL_METHODS else "process_points"
+        self._span = tracer.span(name, method=method, n=n)
+        self._timer = metrics.timer(PROCESS_POINTS_SECONDS, _labels(method, n))
+    
+    def __enter__(self):
+        self._span.__enter__()
+        self._timer.__enter__()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._timer.__exit__(*exc_info)
+        self._span.__exit__(*exc_info)
+        return False
+
+
+def _process_points(points, method, backend, workers):
+    if backend == "numpy":
+        return _numpy_backend().process_points(points, method)
+    elif backend != "python":
+        raise InvalidBackendException(backend)
+    
     if not points:
         raise EmptyPointsListException()
     
     if method == "original":
-        return process_all_points(points)
+        return process_all_points(points, workers=workers)
     elif method == "sequential":
         return process_sequential(points)
     elif method == "min_sum":
@@ -49,8 +143,249 @@ def process_points(points, method="original"):
         raise InvalidMethodException(method)
 
 
-def process_all_points(points):
-    """Оригинальный алгоритм."""
+METHODS = ("original", "sequential", "min_sum", "min_x")
+
+# Метка метрик и трасс для расчёта всех методов сразу
+ALL_METHODS = "all"
+
+
+def process_all_methods(points, workers=1):
+    """
+    Обрабатывает точки всеми методами сразу.
+    
+    Обе особые точки (минимальная сумма и минимальный X) ищутся за один
+    общий проход, соседи для ``original`` — одним запросом к k-d дереву,
+    а все четыре результата заполняются за один проход по точкам.
+    
+    Если общий проход не удался (некорректные точки), методы считаются по
+    отдельности, и ошибка одного не отменяет результаты остальных.
+    
+    Returns
+    -------
+    tuple[dict, dict]
+        ``(results, errors)``: результаты удавшихся методов и тексты ошибок
+        остальных, по коду метода; вместе они покрывают все ``METHODS``.
+        Ошибки передаются строками: не всякое исключение проекта переживает
+        пересылку из процесса пула
+    
+    Raises
+    ------
+    EmptyPointsListException
+        Если список точек пуст
+    """
+    if not (metrics.enabled or tracer.enabled):
+        return _process_all_methods(points, workers)
+    with measure_processing(ALL_METHODS, len(points) if hasattr(points, "__len__") else None):
+        return _process_all_methods(points, workers)
+
+
+def _process_all_methods(points, workers):
+    if not points:
+        raise EmptyPointsListException()
+    
+    try:
+        return _process_all_methods_fused(points, workers), {}
+    except (DistanceCalculationException, TypeError, ValueError, IndexError):
+        pass
+    
+    # Некорректные точки: считаем методы по отдельности, чтобы ошибка
+    # каждого была той же, что и у process_points
+    results = {}
+    errors = {}
+    for method in METHODS:
+        try:
+            results[method] = process_points(points, method, workers=workers)
+        except Exception as e:
+            errors[method] = str(e)
+    return results, errors
+
+
+def _process_all_methods_fused(points, workers):
+    """Общий проход для process_all_methods."""
+    closest = _find_all_closest(points, workers)
+    
+    # Обе особые точки за один проход; при равенстве остаётся первая, как у min
+    it = iter(points)
+    min_sum = min_x = next(it)
+    best_sum = min_sum[0] + min_sum[1]
+    best_x = (min_x[0], min_x[1])
+    for p in it:
+        s = p[0] + p[1]
+        if s < best_sum:
+            best_sum, min_sum = s, p
+        key = (p[0], p[1])
+        if key < best_x:
+            best_x, min_x = key, p
+    
+    n = len(points)
+    if isinstance(points, PointSet):
+        sx, sy = min_sum
+        mx, my = min_x
+        out = {method: array('d') for method in METHODS}
+        original, sequential, by_sum, by_x = (out[method] for method in METHODS)
+        
+        rolled = points.rolled(1)
+        for (x, y), nx, ny, j in zip(points, rolled, rolled, closest):
+            if j is None:
+                original.extend((x, y))
+            else:
+                cx, cy = points[j]
+                original.extend((x + cx, y + cy))
+            sequential.extend((x + nx, y + ny))
+            by_sum.extend((x + sx, y + sy))
+            by_x.extend((x + mx, y + my))
+        
+        return {method: PointSet.from_flat(data) for method, data in out.items()}
+    
+    out = {method: [] for method in METHODS}
+    original, sequential, by_sum, by_x = (out[method] for method in METHODS)
+    
+    for i, p in enumerate(points):
+        j = closest[i]
+        original.append(p if j is None else add_two_points(p, points[j]))
+        sequential.append(add_two_points(p, points[(i + 1) % n]))
+        by_sum.append(add_two_points(p, min_sum))
+        by_x.append(add_two_points(p, min_x))
+    
+    return out
+
+
+def process_points_stream(source, method="original"):
+    """
+    Потоковая обработка точек: результаты выдаются по одной.
+    
+    ``sequential`` читает источник за один проход, храня только первую
+    и предыдущую точку. ``min_sum`` и ``min_x`` делают два прохода:
+    первый ищет особую точку, второй выдаёт результаты, поэтому источник
+    должен быть переитерируемым. ``original`` нуждается во всех точках
+    сразу и собирает их в компактный ``PointSet``.
+    
+    Parameters
+    ----------
+    source : iterable or path
+        Точки или путь к файлу: двоичному формату ``pointfile``
+        или текстовому ``x,y`` по одной точке на строку
+    method : str
+        Метод обработки
+    
+    Raises
+    ------
+    InvalidMethodException
+        Если метод неизвестен
+    NonReiterableSourceException
+        Если для двухпроходного метода передан одноразовый итератор
+    EmptyPointsListException
+        При чтении, если источник пуст
+    """
+    if isinstance(source, (str, os.PathLike)):
+        source = load_points(source) if is_point_file(source) else PointsFile(source)
+    
+    if method == "original":
+        return _stream_all_points(source)
+    elif method == "sequential":
+        return _stream_sequential(source)
+    elif method in ("min_sum", "min_x"):
+        if isinstance(source, Iterator):
+            raise NonReiterableSourceException(method)
+        return _stream_with_min_point(source, use_sum=(method == "min_sum"))
+    else:
+        raise InvalidMethodException(method)
+
+
+def _stream_all_points(source):
+    """Оригинальный алгоритм поверх потока: точки собираются в PointSet."""
+    points = PointSet(source)
+    if not points:
+        raise EmptyPointsListException()
+    yield from process_all_points(points)
+
+
+def _stream_sequential(source):
+    """Последовательный алгоритм за один проход."""
+    it = iter(source)
+    try:
+        first = next(it)
+    except StopIteration:
+        raise EmptyPointsListException() from None
+    
+    prev = first
+    for p in it:
+        yield add_two_points(prev, p)
+        prev = p
+    yield add_two_points(prev, first)
+
+
+def _stream_with_min_point(source, use_sum=True):
+    """Алгоритм с минимальной точкой в два прохода."""
+    try:
+        if use_sum:
+            special_point = min(source, key=lambda p: p[0] + p[1])
+        else:
+            special_point = min(source, key=lambda p: (p[0], p[1]))
+    except ValueError as e:
+        raise EmptyPointsListException() from e
+    
+    for p in source:
+        yield add_two_points(p, special_point)
+
+
+def _numpy_backend():
+    """Лениво импортирует NumPy-бэкенд."""
+    try:
+        import points_numpy
+    except ImportError as e:
+        raise BackendUnavailableException("numpy", "numpy") from e
+    return points_numpy
+
+
+def _find_all_closest(points, workers):
+    """
+    Ближайшие соседи всех точек, при ``workers > 1`` — в нескольких процессах.
+    
+    ``parallel`` тянет ``multiprocessing``, поэтому импортируется только здесь.
+    """
+    if workers > 1:
+        from parallel import PARALLEL_MIN_POINTS, find_all_closest_parallel
+        if len(points) >= PARALLEL_MIN_POINTS:
+            return find_all_closest_parallel(points, workers)
+    return find_all_closest(points)
+
+
+def process_all_points(points, workers=1):
+    """
+    Оригинальный алгоритм: каждая точка складывается с ближайшей к ней.
+    
+    Ближайшие соседи ищутся сразу для всех точек через k-d дерево,
+    поэтому обработка занимает O(n log n) вместо O(n²). При ``workers > 1``
+    запросы к дереву распределяются по процессам (см. ``parallel``),
+    результат при этом совпадает с однопроцессным побитово.
+    """
+    try:
+        closest = _find_all_closest(points, workers)
+    except DistanceCalculationException:
+        # Некорректные точки: повторяем поточечный алгоритм,
+        # чтобы ошибка была той же, что и раньше
+        return _process_all_points_naive(points)
+    
+    if isinstance(points, PointSet):
+        result = array('d')
+        for (x, y), j in zip(points, closest):
+            if j is not None:
+                cx, cy = points[j]
+                x += cx
+                y += cy
+            result.append(x)
+            result.append(y)
+        return PointSet.from_flat(result)
+    
+    return [
+        p if j is None else add_two_points(p, points[j])
+        for p, j in zip(points, closest)
+    ]
+
+
+def _process_all_points_naive(points):
+    """Оригинальный алгоритм с поиском ближайшей точки перебором."""
     result = []
     
     for p in points:
@@ -69,10 +404,18 @@ def process_all_points(points):
 
 
 def process_sequential(points):
-    """Последовательный алгоритм."""
+    """
+    Последовательный алгоритм.
+    
+    Для ``PointSet`` складывает буфер координат с его циклическим сдвигом,
+    не создавая кортежей на каждую точку.
+    """
     if not points:
         raise EmptyPointsListException()
     
+    if isinstance(points, PointSet):
+        return PointSet.from_flat(array('d', map(add, points.flat(), points.rolled(1))))
+    
     result = []
     n = len(points)
     
@@ -94,6 +437,9 @@ def process_with_min_point(points, use_sum=True):
         else:
             special_point = min(points, key=lambda p: (p[0], p[1]))
         
+        if isinstance(points, PointSet):
+            return PointSet.from_flat(array('d', map(add, points.flat(), cycle(special_point))))
+        
         return [add_two_points(p, special_point) for p in points]
     
     except ValueError as e:
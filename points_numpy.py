@@ -0,0 +1,121 @@
+"""
+Векторизованные методы обработки точек на NumPy.
+
+Принимают и возвращают массивы формы (n, 2) и не создают Python-объектов
+на каждую точку. Модуль подключается лениво из ``points.process_points``
+при ``backend="numpy"``, поэтому NumPy остаётся необязательной зависимостью.
+"""
+
+import numpy as np
+
+from exceptions import EmptyPointsListException, InvalidMethodException
+from pointset import PointSet
+
+
+# Сколько элементов матрицы расстояний считается за один блок:
+# 4M float64 — около 32 МБ на временный массив
+BLOCK_ELEMENTS = 4 * 1024 * 1024
+
+
+def as_points_array(points):
+    """
+    Приводит точки к массиву float64 формы (n, 2) без копирования, если это возможно.
+    
+    Raises
+    ------
+    ValueError
+        Если данные нельзя представить как массив пар координат
+    """
+    if isinstance(points, PointSet):
+        # Буфер PointSet уже лежит как (n, 2) float64 — читаем его напрямую
+        return np.frombuffer(points.buffer, dtype=np.float64).reshape(-1, 2)
+    
+    arr = np.asarray(points, dtype=np.float64)
+    if arr.ndim == 1 and arr.size == 0:
+        # Пустой список даёт форму (0,): это пустой набор, а не ошибка формы
+        return arr.reshape(0, 2)
+    if arr.ndim != 2 or arr.shape[1] != 2:
+        raise ValueError(f"Ожидается массив формы (n, 2), получено {arr.shape}")
+    return arr
+
+
+def process_points(points, method="original"):
+    """
+    Аналог ``points.process_points`` для массивов формы (n, 2).
+    
+    Raises
+    ------
+    EmptyPointsListException
+        Если массив точек пуст
+    InvalidMethodException
+        Если метод неизвестен
+    """
+    arr = as_points_array(points)
+    if len(arr) == 0:
+        raise EmptyPointsListException()
+    
+    if method == "original":
+        return process_all_points(arr)
+    elif method == "sequential":
+        return process_sequential(arr)
+    elif method == "min_sum":
+        return process_with_min_point(arr, use_sum=True)
+    elif method == "min_x":
+        return process_with_min_point(arr, use_sum=False)
+    else:
+        raise InvalidMethodException(method)
+
+
+def process_all_points(arr):
+    """
+    Оригинальный алгоритм: блочное ядро матрицы расстояний.
+    
+    Для каждого блока точек-запросов считается матрица расстояний до
+    всех точек, точки с теми же координатами исключаются, а ``argmin``
+    берёт первую из равноудалённых — так же, как ``min`` в ``find_closest``.
+    """
+    n = len(arr)
+    result = arr.copy()
+    if n <= 1:
+        return result
+    
+    xs = arr[:, 0]
+    ys = arr[:, 1]
+    block = max(1, BLOCK_ELEMENTS // n)
+    
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        dx = xs[None, :] - xs[start:stop, None]
+        dy = ys[None, :] - ys[start:stop, None]
+        same = dx == 0
+        same &= dy == 0
+        
+        np.square(dx, out=dx)
+        np.square(dy, out=dy)
+        dist = np.sqrt(np.add(dx, dy, out=dx), out=dx)
+        dist[same] = np.inf
+        
+        closest = np.argmin(dist, axis=1)
+        has_other = ~same.all(axis=1)
+        rows = np.arange(start, stop)[has_other]
+        result[rows] += arr[closest[has_other]]
+    
+    return result
+
+
+def process_sequential(arr):
+    """Последовательный алгоритм: сдвиг массива и сложение."""
+    return arr + np.roll(arr, -1, axis=0)
+
+
+def process_with_min_point(arr, use_sum=True):
+    """Алгоритм с минимальной точкой: argmin и сложение с broadcast."""
+    if use_sum:
+        special = np.argmin(arr[:, 0] + arr[:, 1])
+    else:
+        # Минимум по (x, y): среди точек с минимальным x берём минимальный y
+        xs = arr[:, 0]
+        candidates = np.flatnonzero(xs == xs.min())
+        special = candidates[np.argmin(arr[candidates, 1])]
+    
+    return arr + arr[special]
@@ -0,0 +1,236 @@
+"""
+Компактное хранилище точек на плоскости.
+
+Вместо списка кортежей координаты лежат подряд в одном массиве float64:
+x0, y0, x1, y1, ... Это примерно 16 байт на точку вместо 100+ у кортежа
+из двух float, а быстрые пути (NumPy, запись в файл, хэш кэша) читают
+память напрямую через ``PointSet.buffer`` без копирования. Сам набор
+протокол буфера не реализует: ``__buffer__`` на Python доступен только
+с 3.12, поэтому в ``memoryview``/``np.frombuffer`` передаётся ``buffer``.
+
+Координаты хранятся как float64, поэтому целые точки возвращаются как
+``(3.0, 4.0)``; для вывода пользователю ``format_point`` печатает целые
+значения без ``.0``, как до перехода на массив.
+"""
+
+from array import array
+from collections.abc import MutableSequence
+from itertools import chain, islice
+
+from exceptions import InvalidInputFormatException
+
+
+def format_coordinate(value):
+    """Координата для вывода: целые значения без ``.0`` (``3`` вместо ``3.0``)."""
+    if isinstance(value, float) and value.is_integer() and abs(value) < 2 ** 53:
+        return str(int(value))
+    return str(value)
+
+
+def format_point(point):
+    """Точка для вывода: ``(3, 4.5)``."""
+    x, y = point
+    return f"({format_coordinate(x)}, {format_coordinate(y)})"
+
+
+class PointSet(MutableSequence):
+    """
+    Последовательность точек, хранящая координаты в непрерывном буфере.
+    
+    Ведёт себя как список кортежей ``(x, y)``: поддерживает ``len``,
+    индексацию, срезы, итерацию, ``append`` и ``clear``, поэтому старый
+    код работает с ней без изменений. Данные хранятся в ``array('d')``
+    или во внешнем буфере (например, в ``mmap`` файла) — во втором
+    случае набор копируется в собственный массив при первом изменении.
+    """
+    
+    __slots__ = ('_data',)
+    
+    def __init__(self, points=()):
+        self._data = array('d')
+        self.extend(points)
+    
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Создаёт набор поверх буфера с чередующимися x, y без копирования.
+        
+        Parameters
+        ----------
+        buffer : bytes-like
+            Буфер с числами float64 в порядке байтов платформы.
+            Набор держит ссылку на буфер, пока жив сам
+        
+        Raises
+        ------
+        InvalidInputFormatException
+            Если размер буфера не кратен размеру точки
+        """
+        view = memoryview(buffer)
+        if view.format != 'd':
+            if view.nbytes % 16:
+                raise InvalidInputFormatException(f"буфер из {view.nbytes} байт")
+            view = view.cast('B').cast('d')
+        elif len(view) % 2:
+            raise InvalidInputFormatException(f"буфер из {len(view)} чисел")
+        
+        return cls.from_flat(view)
+    
+    @classmethod
+    def frombytes(cls, data):
+        """Создаёт набор из копии байтов, полученных через ``tobytes``."""
+        points = cls()
+        points._data.frombytes(data)
+        return points
+    
+    def tobytes(self):
+        """Возвращает координаты как байты float64 в порядке x0, y0, x1, y1, ..."""
+        return self._data.tobytes()
+    
+    def __reduce__(self):
+        return (self.__class__.frombytes, (self.tobytes(),))
+    
+    @property
+    def buffer(self):
+        """Представление координат в виде ``memoryview`` формата ``'d'``."""
+        return memoryview(self._data)
+    
+    @property
+    def xs(self):
+        """Координаты X без копирования (``memoryview`` с шагом)."""
+        return memoryview(self._data)[0::2]
+    
+    @property
+    def ys(self):
+        """Координаты Y без копирования (``memoryview`` с шагом)."""
+        return memoryview(self._data)[1::2]
+    
+    @property
+    def nbytes(self):
+        """Объём памяти под координаты в байтах."""
+        return len(self._data) * 8
+    
+    def _writable(self):
+        """Возвращает изменяемый массив, копируя внешний буфер при необходимости."""
+        if not isinstance(self._data, array):
+            self._data = array('d', self._data)
+        return self._data
+    
+    def __len__(self):
+        return len(self._data) // 2
+    
+    def __iter__(self):
+        it = iter(self._data)
+        return zip(it, it)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return PointSet.from_flat(self._data[2 * start:2 * max(start, stop)])
+            return PointSet(self[i] for i in range(start, stop, step))
+        
+        i = self._index(index)
+        return (self._data[2 * i], self._data[2 * i + 1])
+    
+    def __setitem__(self, index, point):
+        if isinstance(index, slice):
+            raise TypeError("PointSet не поддерживает присваивание срезу")
+        i = self._index(index)
+        data = self._writable()
+        data[2 * i], data[2 * i + 1] = _coords(point)
+    
+    def __delitem__(self, index):
+        data = self._writable()
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise TypeError("PointSet не поддерживает удаление срезом с шагом")
+            del data[2 * start:2 * max(start, stop)]
+            return
+        i = self._index(index)
+        del data[2 * i:2 * i + 2]
+    
+    def insert(self, index, point):
+        n = len(self)
+        if index < 0:
+            index = max(0, index + n)
+        index = min(index, n)
+        self._writable()[2 * index:2 * index] = array('d', _coords(point))
+    
+    def append(self, point):
+        self._writable().extend(_coords(point))
+    
+    def extend(self, points):
+        if isinstance(points, PointSet):
+            self._writable().extend(points._data)
+            return
+        data = self._writable()
+        for point in points:
+            data.extend(_coords(point))
+    
+    def clear(self):
+        self._data = array('d')
+    
+    def copy(self):
+        """Возвращает независимую копию набора."""
+        return PointSet.from_flat(array('d', self._data))
+    
+    @classmethod
+    def from_flat(cls, data):
+        """Оборачивает готовый ``array('d')`` или ``memoryview`` с чередующимися x, y без копирования."""
+        points = cls.__new__(cls)
+        points._data = data
+        return points
+    
+    def rolled(self, shift=1):
+        """Итератор координат, циклически сдвинутых на ``shift`` точек вперёд."""
+        k = 2 * (shift % len(self)) if len(self) else 0
+        return chain(islice(self._data, k, None), islice(self._data, 0, k))
+    
+    def flat(self):
+        """Итератор координат в порядке x0, y0, x1, y1, ..."""
+        return iter(self._data)
+    
+    def __eq__(self, other):
+        if isinstance(other, PointSet):
+            return len(self._data) == len(other._data) and all(
+                a == b for a, b in zip(self._data, other._data)
+            )
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(
+                tuple(p) == q for q, p in zip(self, other)
+            )
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __str__(self):
+        return "[" + ", ".join(map(format_point, self)) + "]"
+    
+    def __repr__(self):
+        return f"PointSet({list(self)!r})"
+    
+    def _index(self, index):
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("индекс точки вне диапазона")
+        return index
+
+
+def _coords(point):
+    """
+    Разбирает точку в пару float.
+    
+    Raises
+    ------
+    InvalidInputFormatException
+        Если точка не является парой чисел
+    """
+    try:
+        x, y = point
+        return (float(x), float(y))
+    except (TypeError, ValueError) as e:
+        raise InvalidInputFormatException(point) from e
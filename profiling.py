@@ -0,0 +1,229 @@
+"""
+Профилирование по запросу: cProfile или tracemalloc для следующих N вызовов.
+
+Цель — ``process_points`` или имя обработчика бота. ``profiler.arm``
+взводит счётчик, и каждый из следующих вызовов цели снимается целиком:
+cProfile пишет файл ``.prof`` (читается ``pstats`` и ``snakeviz``),
+tracemalloc — снимок ``.tracemalloc`` (``tracemalloc.Snapshot.load``).
+Имя файла складывается из цели, метода, размера входа и времени, например
+``process_points_original_n100000_20260101-120000-123456.prof``.
+
+Пока ничего не взведено, проверка в горячем пути — одно чтение словаря.
+Снимается один вызов за раз: вложенные цели (``process_points`` внутри
+профилируемого обработчика) отдельно не снимаются. Обработчик снимается
+через ``Capture.run_async``: cProfile включён только на его собственных
+шагах, а другие обработчики, выполняющиеся, пока он ждёт ``await``, в
+профиль не попадают. tracemalloc так не ограничить — его трассы общие
+для процесса, поэтому снимок обработчика охватывает выделения всего
+цикла событий за время снятия.
+
+Настройка из окружения: ``PROFILE_TARGETS`` (``process_points:5,method_handler:2``),
+``PROFILE_MODE`` (``cprofile`` или ``tracemalloc``) и ``PROFILE_DIR``.
+"""
+
+import logging
+import os
+import time
+
+
+logger = logging.getLogger(__name__)
+
+MODES = ("cprofile", "tracemalloc")
+
+_EXTENSIONS = {"cprofile": "prof", "tracemalloc": "tracemalloc"}
+
+# Кадров стека на одно выделение в снимке tracemalloc
+TRACEMALLOC_FRAMES = 25
+
+# Идёт ли снятие в этом процессе: вложенные вызовы не снимаются
+_active = False
+
+
+class Capture:
+    """
+    Снятие одного вызова в файл ``path``.
+    
+    Объект передаётся и в процесс пула, поэтому хранит только режим и путь.
+    """
+    
+    def __init__(self, mode, path):
+        self.mode = mode
+        self.path = path
+        self._profile = None
+    
+    def __enter__(self):
+        global _active
+        _active = True
+        # Профилировщики нужны только при снятии, поэтому импортируются здесь
+        if self.mode == "cprofile":
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            import tracemalloc
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        return self
+    
+    def __exit__(self, *exc_info):
+        global _active
+        try:
+            if self.mode == "cprofile":
+                self._profile.disable()
+                self._profile.dump_stats(self.path)
+                self._profile = None
+            else:
+                import tracemalloc
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                snapshot.dump(self.path)
+            logger.info("Профиль записан в %s", self.path)
+        except OSError:
+            logger.exception("Не удалось записать профиль в %s", self.path)
+        finally:
+            _active = False
+        return False
+    
+    def run(self, func, *args, **kwargs):
+        """Выполняет ``func(*args, **kwargs)`` под профилировщиком."""
+        with self:
+            return func(*args, **kwargs)
+    
+    async def run_async(self, coro):
+        """
+        Дожидается корутины ``coro`` под профилировщиком.
+        
+        В режиме cprofile профилировщик включается только на время шагов
+        самой корутины и выключается, пока она ждёт ``await``.
+        """
+        with self:
+            if self.mode != "cprofile":
+                return await coro
+            self._profile.disable()
+            return await _Stepped(coro, self._profile)
+
+
+class _Stepped:
+    """Ожидаемый объект, который включает профилировщик на каждом шаге корутины."""
+    
+    __slots__ = ("_coro", "_profile")
+    
+    def __init__(self, coro, profile):
+        self._coro = coro
+        self._profile = profile
+    
+    def __await__(self):
+        coro = self._coro
+        profile = self._profile
+        value, error = None, None
+        while True:
+            profile.enable()
+            try:
+                if error is None:
+                    yielded = coro.send(value)
+                else:
+                    yielded = coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                profile.disable()
+            # Пока корутина ждёт, цикл событий выполняет чужие задачи без профилировщика
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:
+                value, error = None, e
+
+
+class Profiler:
+    """
+    Счётчики взведённых целей и выдача ``Capture`` для очередного вызова.
+    
+    Parameters
+    ----------
+    directory : str
+        Каталог для файлов профилей; создаётся при первом снятии
+    """
+    
+    def __init__(self, directory="profiles"):
+        self.directory = directory
+        # цель -> [сколько вызовов осталось снять, режим]
+        self._armed = {}
+    
+    def arm(self, target, count=1, mode="cprofile"):
+        """
+        Снимать следующие ``count`` вызовов цели ``target``.
+        
+        Raises
+        ------
+        ValueError
+            Если режим неизвестен или ``count`` не положительный
+        """
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим профилирования: {mode}")
+        if count <= 0:
+            raise ValueError(f"Количество вызовов должно быть положительным: {count}")
+        self._armed[target] = [count, mode]
+    
+    def disarm(self, target=None):
+        """Снимает взвод с цели или, без аргумента, со всех целей."""
+        if target is None:
+            self._armed.clear()
+        else:
+            self._armed.pop(target, None)
+    
+    def armed(self, target):
+        return target in self._armed
+    
+    def status(self):
+        """Словарь цель -> (осталось вызовов, режим)."""
+        return {target: tuple(entry) for target, entry in self._armed.items()}
+    
+    def take(self, target, method=None, n=None):
+        """
+        ``Capture`` для очередного вызова цели или None, если она не взведена.
+        
+        Каждый выданный ``Capture`` уменьшает счётчик цели.
+        """
+        entry = self._armed.get(target)
+        if entry is None or _active:
+            return None
+        entry[0] -= 1
+        if entry[0] <= 0:
+            del self._armed[target]
+        return Capture(entry[1], self._path(target, method, n, entry[1]))
+    
+    def _path(self, target, method, n, mode):
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now % 1 * 1e6):06d}"
+        parts = [target]
+        if method is not None:
+            parts.append(str(method))
+        if n is not None:
+            parts.append(f"n{n}")
+        parts.append(stamp)
+        return os.path.join(self.directory, f"{'_'.join(parts)}.{_EXTENSIONS[mode]}")
+
+
+def parse_targets(spec):
+    """
+    Разбирает ``"process_points:5,method_handler"`` в список ``(цель, количество)``.
+    
+    Raises
+    ------
+    ValueError
+        Если количество не целое
+    """
+    targets = []
+    for item in spec.replace(" ", "").split(","):
+        if not item:
+            continue
+        target, _, count = item.partition(":")
+        targets.append((target, int(count) if count else 1))
+    return targets
+
+
+# Общий профилировщик процесса
+profiler = Profiler(directory=os.getenv("PROFILE_DIR", "profiles"))
+
+for _target, _count in parse_targets(os.getenv("PROFILE_TARGETS", "")):
+    profiler.arm(_target, _count, os.getenv("PROFILE_MODE", "cprofile"))
@@ -0,0 +1,470 @@
+"""
+Нагрузочный прогон webhook-режима бота.
+
+Синтетический прогон ведёт пользователей по настоящему сценарию меню:
+``/start`` → «Обработать точки» → «Ручной ввод» → сообщение с точками →
+``/done`` → выбор метода. Каждое обновление отправляется POST-ом на
+webhook бота, как это делает Telegram, а следующее уходит только после
+ответа бота на предыдущее. Ответы принимает заглушка Bot API, поднятая
+здесь же: время от отправки обновления до ``sendMessage``/``editMessageText``
+с ожидаемым текстом — это задержка обработки, которую видит пользователь.
+Быстрый ответ webhook (``200`` на POST) ничего о ней не говорит: PTB
+кладёт обновление в очередь и отвечает сразу, поэтому время подтверждения
+печатается отдельно.
+
+Записанные обновления (``--file``, JSONL по одному ``Update`` на строку)
+отправляются с заданной частотой без ожидания ответов: какой ответ
+ожидать на произвольное обновление, неизвестно, поэтому для них
+замеряется только подтверждение.
+
+Бот запускается с ``BOT_MODE=webhook`` и ``TELEGRAM_BASE_URL`` заглушки,
+чтобы его ответы не уходили в настоящий Telegram.
+
+Пример::
+
+    python replay_updates.py --stub-port 8081 --synthetic 1000 --users 100 \\
+        --secret "$WEBHOOK_SECRET"
+
+    # в другом терминале
+    BOT_MODE=webhook WEBHOOK_SECRET=... WEBHOOK_URL=http://127.0.0.1:8443/telegram \\
+        TELEGRAM_BASE_URL=http://127.0.0.1:8081/bot python bot.py
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import httpx
+
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# Сколько точек в сообщении синтетического пользователя
+SYNTHETIC_POINTS = 50
+
+# Шаги синтетического диалога: имя, что отправляет пользователь, и фрагмент
+# текста ответа, которым бот завершает шаг. Ответы без фрагмента (подтверждение
+# /done перед меню методов) шаг не завершают.
+DIALOG_STEPS = (
+    ("start", "/start", "ОБРАБОТКА ТОЧЕК НА ПЛОСКОСТИ"),
+    ("process", "callback:process", "ВВОД ТОЧЕК"),
+    ("input_manual", "callback:input_manual", "Введите первую точку"),
+    ("points", "points", "Всего точек"),
+    ("done", "/done", "ВЫБОР МЕТОДА ОБРАБОТКИ"),
+    ("method", "callback:method", "РЕЗУЛЬТАТЫ ОБРАБОТКИ"),
+)
+
+# Методы перебираются по кругу от диалога к диалогу
+SYNTHETIC_METHODS = ("1", "2", "3", "4")
+
+
+def load_updates(path):
+    """Читает записанные обновления из JSONL-файла."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _message(user_id, message_id, text):
+    message = {
+        "message_id": message_id,
+        "date": int(time.time()),
+        "chat": {"id": user_id, "type": "private"},
+        "from": {"id": user_id, "is_bot": False, "first_name": "load"},
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text)}]
+    return message
+
+
+def _callback(user_id, message_id, data):
+    return {
+        "id": f"{user_id}-{message_id}",
+        "from": {"id": user_id, "is_bot": False, "first_name": "load"},
+        "chat_instance": str(user_id),
+        # Кнопка висит под сообщением бота, которое заглушка только что «отправила»
+        "message": {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": 1, "is_bot": True, "first_name": "bot"},
+            "text": "",
+        },
+        "data": data,
+    }
+
+
+def dialog_updates(user_id, dialog):
+    """
+    Обновления одного синтетического диалога пользователя ``user_id``.
+    
+    Returns
+    -------
+    list[tuple]
+        ``(шаг, обновление, ожидаемый фрагмент ответа)`` в порядке отправки;
+        ``update_id`` проставляется при отправке
+    """
+    method = SYNTHETIC_METHODS[dialog % len(SYNTHETIC_METHODS)]
+    points = " ".join(
+        f"{(dialog * 7 + i * 13) % 97}.5,{-((dialog + i * 31) % 89)}" for i in range(SYNTHETIC_POINTS)
+    )
+    steps = []
+    for n, (step, action, expected) in enumerate(DIALOG_STEPS):
+        message_id = dialog * len(DIALOG_STEPS) + n + 1
+        if action == "points":
+            update = {"message": _message(user_id, message_id, points)}
+        elif action == "callback:method":
+            update = {"callback_query": _callback(user_id, message_id, f"method_{method}")}
+        elif action.startswith("callback:"):
+            update = {"callback_query": _callback(user_id, message_id, action.partition(":")[2])}
+        else:
+            update = {"message": _message(user_id, message_id, action)}
+        steps.append((step, update, expected))
+    return steps
+
+
+class StubBotAPI(ThreadingHTTPServer):
+    """
+    Заглушка Bot API: отвечает боту «ok» и сообщает о его ответах в чаты.
+    
+    ``expect`` регистрируется до отправки обновления и возвращает future
+    цикла событий, в который попадёт ``time.perf_counter()`` первого
+    ответа в чат с ожидаемым фрагментом текста.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _StubBotAPIHandler)
+        self._lock = threading.Lock()
+        # chat_id -> [(фрагмент, future, цикл)]
+        self._waiters = {}
+    
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/bot"
+    
+    def expect(self, chat_id, fragment):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self._waiters.setdefault(chat_id, []).append((fragment, future, loop))
+        return future
+    
+    def forget(self, chat_id, future):
+        with self._lock:
+            waiters = self._waiters.get(chat_id, [])
+            waiters[:] = [waiter for waiter in waiters if waiter[1] is not future]
+    
+    def replied(self, chat_id, text):
+        now = time.perf_counter()
+        with self._lock:
+            waiters = self._waiters.get(chat_id)
+            if not waiters:
+                return
+            matched = [waiter for waiter in waiters if waiter[0] in text]
+            waiters[:] = [waiter for waiter in waiters if waiter[0] not in text]
+        for _, future, loop in matched:
+            loop.call_soon_threadsafe(_resolve, future, now)
+    
+    def handle_error(self, request, client_address):
+        # Бот, остановленный посреди запроса, рвёт соединение — это не ошибка
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def _resolve(future, value):
+    if not future.done():
+        future.set_result(value)
+
+
+class _StubBotAPIHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        method = self.path.rsplit("/", 1)[-1]
+        params = _parse_params(self.headers.get("Content-Type", ""), body)
+        server = self.server
+        
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Replay", "username": "replay_bot"}
+        elif method == "getUpdates":
+            # Бот в режиме опроса: обновлений здесь нет, не даём ему крутиться впустую
+            time.sleep(0.2)
+            result = []
+        elif method in ("sendMessage", "editMessageText"):
+            chat_id = int(params.get("chat_id") or 0)
+            text = params.get("text") or ""
+            server.replied(chat_id, text)
+            result = {
+                "message_id": int(params.get("message_id") or 1),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": text,
+            }
+        else:
+            result = True
+        
+        payload = json.dumps({"ok": True, "result": result}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def _parse_params(content_type, body):
+    """Параметры запроса Bot API: PTB шлёт форму, другие клиенты — JSON."""
+    if not body:
+        return {}
+    if content_type.startswith("application/json"):
+        return json.loads(body)
+    return {key: values[0] for key, values in parse_qs(body.decode("utf-8")).items()}
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[k]
+
+
+def latency_summary(latencies):
+    """Перцентили задержек в миллисекундах."""
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1] if latencies else 0.0,
+    }
+
+
+def _headers(secret):
+    headers = {"Content-Type": "application/json"}
+    if secret:
+        headers[SECRET_HEADER] = secret
+    return headers
+
+
+async def replay(url, updates, secret=None, rate=0.0, concurrency=64, timeout=10.0):
+    """
+    Отправляет записанные обновления, не дожидаясь ответов бота.
+    
+    Parameters
+    ----------
+    url : str
+        Адрес webhook бота
+    updates : list
+        Обновления в виде словарей; ``update_id`` перенумеровываются по порядку
+    secret : str or None
+        Секретный токен webhook
+    rate : float
+        Обновлений в секунду; 0 — так быстро, как позволяет ``concurrency``
+    concurrency : int
+        Сколько запросов может быть в полёте одновременно
+    
+    Returns
+    -------
+    dict
+        Число отправленных, коды ответов, время подтверждения webhook
+        в миллисекундах и пропускная способность
+    """
+    headers = _headers(secret)
+    latencies = []
+    statuses = {}
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def send(client, body):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, content=body, headers=headers)
+            except httpx.HTTPError:
+                errors += 1
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        tasks = []
+        started = time.perf_counter()
+        for n, update in enumerate(updates):
+            update = dict(update, update_id=n + 1)
+            if rate > 0:
+                delay = started + n / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(client, json.dumps(update))))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    
+    return {
+        "sent": len(updates),
+        "errors": errors,
+        "statuses": statuses,
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(updates) / elapsed if elapsed else 0.0,
+        "ack_latency_ms": latency_summary(latencies),
+    }
+
+
+async def replay_dialogs(url, stub, dialogs, users, secret=None, rate=0.0, concurrency=64, timeout=10.0):
+    """
+    Прогоняет ``dialogs`` синтетических диалогов от ``users`` пользователей.
+    
+    Диалоги одного пользователя идут друг за другом, разных — параллельно,
+    не больше ``concurrency`` одновременно. Каждый шаг ждёт ответа бота
+    в заглушке ``stub`` не дольше ``timeout`` секунд; не дождавшийся шаг
+    считается ошибкой и обрывает диалог.
+    
+    Parameters
+    ----------
+    rate : float
+        Новых диалогов в секунду; 0 — так быстро, как позволяет ``concurrency``
+    
+    Returns
+    -------
+    dict
+        Число отправленных обновлений и завершённых диалогов, ошибки,
+        время подтверждения webhook и время до ответа бота в миллисекундах —
+        по всем шагам и по каждому шагу отдельно
+    """
+    headers = _headers(secret)
+    update_ids = itertools.count(1)
+    ack_latencies = []
+    reply_latencies = {step: [] for step, _, _ in DIALOG_STEPS}
+    statuses = {}
+    counters = {"sent": 0, "completed": 0, "errors": 0, "timeouts": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    
+    async def step(client, user_id, name, update, expected):
+        update = dict(update, update_id=next(update_ids))
+        replied = stub.expect(user_id, expected)
+        sent_at = time.perf_counter()
+        try:
+            response = await client.post(url, content=json.dumps(update), headers=headers)
+        except httpx.HTTPError:
+            stub.forget(user_id, replied)
+            counters["errors"] += 1
+            return False
+        ack_latencies.append((time.perf_counter() - sent_at) * 1000)
+        counters["sent"] += 1
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code != 200:
+            stub.forget(user_id, replied)
+            counters["errors"] += 1
+            return False
+        try:
+            replied_at = await asyncio.wait_for(replied, timeout)
+        except asyncio.TimeoutError:
+            stub.forget(user_id, replied)
+            counters["timeouts"] += 1
+            return False
+        reply_latencies[name].append((replied_at - sent_at) * 1000)
+        return True
+    
+    async def user(client, user_id, user_dialogs):
+        for dialog in user_dialogs:
+            if rate > 0:
+                delay = started + dialog / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            async with semaphore:
+                for name, update, expected in dialog_updates(user_id, dialog):
+                    if not await step(client, user_id, name, update, expected):
+                        break
+                else:
+                    counters["completed"] += 1
+    
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        await asyncio.gather(*(
+            user(client, 100000 + u, range(u, dialogs, users)) for u in range(min(users, dialogs))
+        ))
+    elapsed = time.perf_counter() - started
+    
+    all_replies = list(itertools.chain.from_iterable(reply_latencies.values()))
+    return {
+        "dialogs": dialogs,
+        "completed": counters["completed"],
+        "sent": counters["sent"],
+        "errors": counters["errors"],
+        "timeouts": counters["timeouts"],
+        "statuses": statuses,
+        "elapsed_s": elapsed,
+        "dialogs_per_s": counters["completed"] / elapsed if elapsed else 0.0,
+        "updates_per_s": counters["sent"] / elapsed if elapsed else 0.0,
+        "ack_latency_ms": latency_summary(ack_latencies),
+        "reply_latency_ms": latency_summary(all_replies),
+        "reply_latency_ms_by_step": {name: latency_summary(values) for name, values in reply_latencies.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8443/telegram")
+    parser.add_argument("--secret", default=None)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="JSONL с записанными обновлениями")
+    source.add_argument("--synthetic", type=int, help="прогнать столько синтетических диалогов")
+    parser.add_argument("--users", type=int, default=100, help="пользователей в синтетическом прогоне")
+    parser.add_argument("--repeat", type=int, default=1, help="сколько раз прогнать записанный поток")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="обновлений (--file) или новых диалогов (--synthetic) в секунду, 0 — без ограничения")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--stub-host", default="127.0.0.1", help="адрес заглушки Bot API")
+    parser.add_argument("--stub-port", type=int, default=8081, help="порт заглушки Bot API")
+    parser.add_argument("--wait", type=float, default=0.0,
+                        help="секунд на запуск бота после подъёма заглушки")
+    args = parser.parse_args(argv)
+    
+    stub = StubBotAPI(args.stub_host, args.stub_port)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    print(f"Заглушка Bot API: TELEGRAM_BASE_URL={stub.base_url}", file=sys.stderr)
+    if args.wait > 0:
+        time.sleep(args.wait)
+    
+    try:
+        if args.file:
+            recorded = load_updates(args.file)
+            updates = list(itertools.chain.from_iterable(itertools.repeat(recorded, args.repeat)))
+            report = asyncio.run(replay(
+                args.url, updates,
+                secret=args.secret, rate=args.rate,
+                concurrency=args.concurrency, timeout=args.timeout,
+            ))
+        else:
+            report = asyncio.run(replay_dialogs(
+                args.url, stub, args.synthetic, args.users,
+                secret=args.secret, rate=args.rate,
+                concurrency=args.concurrency, timeout=args.timeout,
+            ))
+    finally:
+        stub.shutdown()
+        stub.server_close()
+    
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    failed = report["errors"] or report.get("timeouts") or not set(report["statuses"]) <= {200}
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
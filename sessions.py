@@ -0,0 +1,201 @@
+"""
+Ограниченное хранилище пользовательских сессий бота.
+
+Раньше данные пользователей лежали в обычном словаре и не удалялись
+никогда: каждый, кто хоть раз написал /start, держал в памяти свои точки
+и результаты. ``SessionStore`` удаляет сессии, к которым давно не
+обращались (TTL), и вытесняет самые старые по обращению, если превышен
+бюджет памяти или число сессий, а также считает байты каждой сессии.
+Через ``loader`` и ``on_access`` хранилище подключается к диску: сессии,
+которых нет в памяти, подгружаются при первом обращении (``aget`` читает
+их в отдельном потоке), а о каждом обращении узнаёт отложенная запись —
+она и решает, изменилась ли сессия.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_SESSIONS = 100000
+
+# Как часто (в секундах) пересчитывать размеры всех сессий и удалять устаревшие
+SWEEP_INTERVAL = 60.0
+
+
+class SessionStore:
+    """
+    Словарь сессий с TTL, LRU-вытеснением и бюджетом памяти.
+    
+    Поддерживает операции, которыми бот пользовался у ``dict``:
+    ``get``, ``in``, ``[]``, присваивание и ``len``. Размер сессии берётся
+    из её метода ``nbytes()`` при каждом обращении и при периодической
+    проверке, поэтому бюджет соблюдается с точностью до последних правок.
+    
+    ``loader(user_id)`` вызывается, если сессии нет в памяти, и может вернуть
+    сессию или None; ``on_access(user_id, session)`` вызывается при каждом
+    обращении к сессии и её записи в хранилище и должен быть дешёвым:
+    само обращение ещё не значит, что сессию нужно сохранять.
+    """
+    
+    def __init__(self, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES,
+                 max_sessions=DEFAULT_MAX_SESSIONS, clock=time.monotonic,
+                 loader=None, on_access=None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        self.expired = 0
+        self.evicted = 0
+        self.loaded = 0
+        self.loader = loader
+        self.on_access = on_access
+        self._clock = clock
+        # user_id -> (сессия, время последнего обращения, размер в байтах)
+        self._sessions = OrderedDict()
+        # Пользователи, которых ``aget`` не нашёл на диске (до ближайшей проверки)
+        self._absent = set()
+        self._bytes = 0
+        self._last_sweep = clock()
+    
+    def __len__(self):
+        return len(self._sessions)
+    
+    def __contains__(self, user_id):
+        return self.get(user_id) is not None
+    
+    def __getitem__(self, user_id):
+        session = self.get(user_id)
+        if session is None:
+            raise KeyError(user_id)
+        return session
+    
+    def __setitem__(self, user_id, session):
+        self._absent.discard(user_id)
+        self._remove(user_id)
+        size = session.nbytes()
+        self._sessions[user_id] = (session, self._clock(), size)
+        self._bytes += size
+        self._enforce(keep=user_id)
+        if self.on_access is not None:
+            self.on_access(user_id, session)
+    
+    def __delitem__(self, user_id):
+        if not self._remove(user_id):
+            raise KeyError(user_id)
+    
+    def get(self, user_id, default=None):
+        """Возвращает сессию, продлевая её жизнь, или ``default``."""
+        now = self._clock()
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self.sweep()
+        
+        entry = self._sessions.get(user_id)
+        if entry is None:
+            return self._load(user_id, default)
+        
+        session, last_access, size = entry
+        if now - last_access > self.ttl:
+            self._remove(user_id)
+            self.expired += 1
+            return default
+        
+        new_size = session.nbytes()
+        self._bytes += new_size - size
+        self._sessions[user_id] = (session, now, new_size)
+        self._sessions.move_to_end(user_id)
+        self._enforce(keep=user_id)
+        if self.on_access is not None:
+            self.on_access(user_id, session)
+        return session
+    
+    async def aget(self, user_id, default=None):
+        """
+        ``get``, который читает отсутствующую в памяти сессию через ``loader``
+        в отдельном потоке, не блокируя цикл событий.
+        """
+        if self.loader is None or user_id in self._sessions:
+            return self.get(user_id, default)
+        session = await asyncio.to_thread(self.loader, user_id)
+        if user_id in self._sessions:
+            # Пока читали с диска, сессию создали заново (/start): она новее
+            return self.get(user_id, default)
+        if session is None:
+            # Синхронный get в обработчиках не пойдёт на диск повторно
+            self._absent.add(user_id)
+            return default
+        self.loaded += 1
+        self[user_id] = session
+        return session
+    
+    def _load(self, user_id, default):
+        """Подгружает сессию через ``loader``, если он задан."""
+        if self.loader is None or user_id in self._absent:
+            return default
+        session = self.loader(user_id)
+        if session is None:
+            return default
+        self.loaded += 1
+        self[user_id] = session
+        return session
+    
+    def session_bytes(self, user_id):
+        """Размер сессии в байтах на момент последнего обращения."""
+        entry = self._sessions.get(user_id)
+        return entry[2] if entry is not None else 0
+    
+    @property
+    def total_bytes(self):
+        return self._bytes
+    
+    def sweep(self):
+        """Удаляет устаревшие сессии и пересчитывает размеры остальных."""
+        now = self._clock()
+        self._last_sweep = now
+        self._absent.clear()
+        total = 0
+        for user_id, (session, last_access, _) in list(self._sessions.items()):
+            if now - last_access > self.ttl:
+                del self._sessions[user_id]
+                self.expired += 1
+                continue
+            size = session.nbytes()
+            self._sessions[user_id] = (session, last_access, size)
+            total += size
+        self._bytes = total
+        self._enforce()
+    
+    def stats(self):
+        """Счётчики хранилища."""
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_sessions": self.max_sessions,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "loaded": self.loaded,
+        }
+    
+    def _remove(self, user_id):
+        entry = self._sessions.pop(user_id, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+    
+    def _enforce(self, keep=None):
+        """Вытесняет самые давние сессии, пока не уложимся в бюджет."""
+        while self._sessions and (
+            self._bytes > self.max_bytes or len(self._sessions) > self.max_sessions
+        ):
+            user_id = next(iter(self._sessions))
+            if user_id == keep:
+                # Текущую сессию не трогаем, даже если она одна больше бюджета
+                if len(self._sessions) == 1:
+                    break
+                self._sessions.move_to_end(user_id)
+                continue
+            self._remove(user_id)
+            self.evicted += 1
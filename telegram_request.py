@@ -0,0 +1,49 @@
+"""
+HTTP-клиент Bot API с замером длительности каждого вызова.
+
+``InstrumentedRequest`` — обычный ``HTTPXRequest`` из python-telegram-bot,
+который пишет длительность и исход каждого запроса к Telegram в метрики
+с меткой метода API (``sendMessage``, ``editMessageText``, ``getUpdates``...)
+и открывает для него интервал трассы.
+"""
+
+import time
+
+from telegram.request import HTTPXRequest
+
+from metrics import registry as metrics
+from tracing import tracer
+
+
+API_CALL_SECONDS = metrics.histogram(
+    "telegram_api_call_seconds",
+    "Длительность вызовов Bot API",
+    ("endpoint",),
+)
+API_CALL_ERRORS = metrics.counter(
+    "telegram_api_call_errors_total",
+    "Вызовы Bot API, завершившиеся исключением",
+    ("endpoint",),
+)
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """``HTTPXRequest``, записывающий в метрики каждый вызов Bot API."""
+    
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        if not (metrics.enabled or tracer.enabled):
+            return await super().do_request(url, method, request_data, **kwargs)
+        
+        endpoint = url.rsplit("/", 1)[-1]
+        labels = (endpoint,)
+        started = time.perf_counter()
+        try:
+            with tracer.span(f"telegram.{endpoint}"):
+                return await super().do_request(url, method, request_data, **kwargs)
+        except Exception:
+            if metrics.enabled:
+                API_CALL_ERRORS.inc(labels)
+            raise
+        finally:
+            if metrics.enabled:
+                API_CALL_SECONDS.observe(time.perf_counter() - started, labels)
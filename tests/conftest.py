@@ -0,0 +1,12 @@
+"""
+Общая настройка тестов: модули проекта лежат в корне репозитория.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Тесты не пишут метрики и трассы и не трогают настоящие каталоги
+os.environ.setdefault("TRACE_FILE", "")
+os.environ.setdefault("PROFILE_TARGETS", "")
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+``ResultCache``: ключ по содержимому и метод, вытеснение по байтам.
+"""
+
+from cache import ENTRY_OVERHEAD, ResultCache
+from points import METHODS
+from pointset import PointSet
+
+
+def test_key_is_content_and_method():
+    cache = ResultCache()
+    first = PointSet([(1, 2), (3, 4), (0, 0)])
+    same = PointSet([(1, 2), (3, 4), (0, 0)])
+    
+    result = cache.process(first, "sequential")
+    
+    assert cache.process(same, "sequential") is result
+    assert cache.hits == 1
+    cache.process(same, "min_x")
+    assert cache.misses == 2
+    assert ResultCache.digest(first) != ResultCache.digest(PointSet([(1, 2), (3, 4)]))
+
+
+def test_only_point_sets_are_cached():
+    cache = ResultCache()
+    
+    cache.process([(1, 2), (3, 4)], "sequential")
+    cache.process([(1, 2), (3, 4)], "sequential")
+    
+    assert cache.hits == cache.misses == 0
+
+
+def test_least_recently_used_is_evicted():
+    result = PointSet([(0, 0)] * 4)
+    size = result.nbytes + ENTRY_OVERHEAD
+    cache = ResultCache(max_bytes=2 * size)
+    
+    cache.put(b"a", "m", result)
+    cache.put(b"b", "m", result)
+    assert cache.get(b"a", "m") is result
+    cache.put(b"c", "m", result)
+    
+    assert cache.evictions == 1
+    assert cache.get(b"b", "m") is None
+    assert cache.get(b"a", "m") is result
+    assert cache.get(b"c", "m") is result
+
+
+def test_entry_larger_than_budget_is_not_stored():
+    cache = ResultCache(max_bytes=10)
+    
+    cache.put(b"a", "m", PointSet([(0, 0)]))
+    
+    assert cache.get(b"a", "m") is None
+    assert cache.evictions == 0
+
+
+def test_process_all_fills_every_method():
+    cache = ResultCache()
+    points = PointSet([(1, 2), (3, 4), (5, 0)])
+    
+    results, errors = cache.process_all(points)
+    
+    assert errors == {}
+    for method in METHODS:
+        assert cache.process(points, method) is results[method]
+
+def test_fused_lookup_counts_once():
+    cache = ResultCache()
+    points = PointSet([(1, 2), (3, 4), (5, 0)])
+    
+    cache.process_all(points)
+    assert (cache.hits, cache.misses) == (0, 1)
+    
+    cache.process_all(points)
+    assert (cache.hits, cache.misses) == (1, 1)
+    
+    # Неполный набор методов в кэше — тоже один промах
+    cache.clear()
+    cache.process(points, "sequential")
+    cache.process_all(points)
+    assert (cache.hits, cache.misses) == (1, 3)
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+k-d дерево против полного перебора ``find_closest``.
+"""
+
+import random
+
+import pytest
+
+from distance import KDTree, find_all_closest, find_closest
+from metrics import FIND_ALL_CLOSEST_SECONDS, registry as metrics
+from points import process_points
+
+
+def brute_force(points):
+    """Индекс ближайшей точки для каждой точки через ``find_closest``."""
+    result = []
+    for p in points:
+        closest = find_closest(p, points)
+        result.append(None if closest is None else points.index(closest))
+    return result
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_points_match_brute_force(seed):
+    rng = random.Random(seed)
+    points = [(rng.uniform(-100, 100), rng.uniform(-100, 100)) for _ in range(300)]
+    
+    assert find_all_closest(points) == brute_force(points)
+
+
+def test_integer_grid_ties_prefer_earlier_point():
+    # На сетке у каждой точки до четырёх равноудалённых соседей
+    points = [(x, y) for x in range(12) for y in range(12)]
+    random.Random(1).shuffle(points)
+    
+    assert find_all_closest(points) == brute_force(points)
+
+
+def test_duplicates_are_skipped_and_share_answer():
+    points = [(0, 0), (5, 5), (0, 0), (1, 0), (5, 5), (0, 0)]
+    
+    result = find_all_closest(points)
+    
+    assert result == brute_force(points)
+    # Копии (0, 0) не считаются соседями друг друга
+    assert result[0] == result[2] == result[5] == 3
+
+
+def test_all_points_equal_have_no_neighbour():
+    assert find_all_closest([(2, 3)] * 4) == [None] * 4
+
+
+def test_collinear_points_match_brute_force():
+    points = [(float(i), 2.0 * i) for i in range(200)]
+    random.Random(2).shuffle(points)
+    
+    assert find_all_closest(points) == brute_force(points)
+
+
+def test_tree_stores_unique_points_in_first_occurrence_order():
+    tree = KDTree([(1, 1), (2, 2), (1, 1), (3, 3)])
+    
+    assert len(tree) == 3
+    assert tree.first == [0, 1, 3]
+    assert tree.owner == [0, 1, 0, 2]
+    assert sorted(tree.leaf_order()) == [0, 1, 2]
+
+
+def test_original_method_records_all_closest_timer(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    labels = ("1e2",)
+    before = FIND_ALL_CLOSEST_SECONDS.values.get(labels, [None, 0.0, 0])[2]
+    
+    process_points([(float(i), float(i * i % 7)) for i in range(50)], "original")
+    
+    assert FIND_ALL_CLOSEST_SECONDS.values[labels][2] == before + 1
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+``DynamicPointSet`` против пересчёта с нуля через ``process_points``.
+"""
+
+import random
+
+import pytest
+
+from dynamic import DynamicPointSet
+from points import METHODS, process_points
+
+
+def assert_matches(dynamic):
+    points = list(dynamic.points)
+    for method in METHODS:
+        assert dynamic.result(method) == process_points(points, method), method
+
+
+def test_points_added_one_by_one():
+    rng = random.Random(0)
+    dynamic = DynamicPointSet()
+    for _ in range(60):
+        dynamic.append((rng.randint(-5, 5), rng.randint(-5, 5)))
+        if len(dynamic) > 1:
+            assert_matches(dynamic)
+
+
+@pytest.mark.parametrize("batch", [1, 3, 50])
+def test_extend_in_batches(batch):
+    rng = random.Random(batch)
+    dynamic = DynamicPointSet([(0, 0), (1, 1)])
+    for _ in range(4):
+        dynamic.extend([(rng.uniform(-10, 10), rng.uniform(-10, 10)) for _ in range(batch)])
+        assert_matches(dynamic)
+
+
+def test_insert_and_delete_keep_results_current():
+    rng = random.Random(3)
+    dynamic = DynamicPointSet([(rng.randint(0, 9), rng.randint(0, 9)) for _ in range(20)])
+    for _ in range(30):
+        if rng.random() < 0.5 and len(dynamic) > 2:
+            del dynamic[rng.randrange(len(dynamic))]
+        else:
+            dynamic.insert(rng.randrange(len(dynamic) + 1), (rng.randint(0, 9), rng.randint(0, 9)))
+        assert_matches(dynamic)
+
+
+def test_clear_resets_results():
+    dynamic = DynamicPointSet([(1, 2), (3, 4)])
+    dynamic.clear()
+    dynamic.extend([(5, 5), (6, 6)])
+    
+    assert_matches(dynamic)
+
+
+def test_result_is_a_copy():
+    dynamic = DynamicPointSet([(1, 2), (3, 4)])
+    dynamic.result("sequential").append((100, 100))
+    
+    assert len(dynamic.result("sequential")) == 2
\ No newline at end of file
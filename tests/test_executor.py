@@ -0,0 +1,52 @@
+"""
+``ProcessingExecutor``: задачи в пуле и замена пула при зависшей задаче.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from exceptions import ProcessingTimeoutException
+from executor import ProcessingExecutor
+
+
+def slow_len(points, seconds):
+    time.sleep(seconds)
+    return len(points)
+
+
+@pytest.fixture
+def executor():
+    executor = ProcessingExecutor(workers=1, inline_max_points=0, timeout=0.5)
+    executor.start()
+    yield executor
+    executor.shutdown()
+
+
+def test_small_jobs_run_inline():
+    executor = ProcessingExecutor(workers=1, inline_max_points=10)
+    
+    assert asyncio.run(executor.run(slow_len, [1, 2], 0)) == 2
+    assert not executor.running
+
+
+def test_hung_job_recycles_pool_and_stops_its_process(executor):
+    async def scenario():
+        with pytest.raises(ProcessingTimeoutException):
+            await executor.run(slow_len, [1, 2], 30)
+        assert executor.recycles == 1
+        
+        (processes,) = executor._retired.values()
+        assert len(processes) == 1 and processes[0].is_alive()
+        
+        # Новый пул принимает задачи сразу, старый останавливается через timeout
+        assert await executor.run(slow_len, [1, 2, 3], 0) == 3
+        await asyncio.sleep(executor.timeout + 0.5)
+        return processes[0]
+    
+    hung = asyncio.run(scenario())
+    
+    hung.join(5)
+    assert not hung.is_alive()
+    assert executor._retired == {}
\ No newline at end of file
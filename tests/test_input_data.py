@@ -0,0 +1,62 @@
+"""
+Разбор точек из текста и файлов: точки и позиции ошибок.
+"""
+
+from exceptions import InvalidInputFormatException, InvalidNumberException
+from input_data import parse_points, parse_points_file
+
+
+def test_parses_all_supported_separators():
+    points, errors = parse_points("1,2\n3 4; 5,6 7,8\n")
+    
+    assert points == [(1, 2), (3, 4), (5, 6), (7, 8)]
+    assert errors == []
+
+
+def test_odd_number_of_fields_points_at_record_start():
+    points, errors = parse_points("1,2\n  3,4,5\n6,7")
+    
+    assert points == [(1, 2), (6, 7)]
+    assert [(e.line, e.column) for e in errors] == [(2, 3)]
+    assert isinstance(errors[0].error, InvalidInputFormatException)
+
+
+def test_bad_number_points_at_the_token():
+    points, errors = parse_points("1,2 x,4\n5,y")
+    
+    assert points == [(1, 2)]
+    assert [(e.line, e.column) for e in errors] == [(1, 5), (2, 3)]
+    assert all(isinstance(e.error, InvalidNumberException) for e in errors)
+    assert errors[0].error.field == "координата X"
+    assert errors[1].error.field == "координата Y"
+
+
+def test_semicolon_records_keep_line_number():
+    _, errors = parse_points("1,2;3\n4,5", start_line=10)
+    
+    assert [(e.line, e.column) for e in errors] == [(10, 5)]
+
+
+def test_file_errors_keep_positions_across_chunks(tmp_path):
+    path = tmp_path / "points.csv"
+    lines = [f"{i},{i}" for i in range(10)]
+    lines[2] = "2,a"
+    lines[7] = "  1,2,3"
+    path.write_text("﻿" + "\n".join(lines) + "\n", encoding="utf-8")
+    
+    points, errors, count = parse_points_file(path, chunk_lines=3)
+    
+    assert len(points) == 8
+    assert count == 2
+    assert [(e.line, e.column) for e in errors] == [(3, 3), (8, 3)]
+
+
+def test_file_keeps_only_first_errors(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("a,b\n" * 5, encoding="utf-8")
+    
+    points, errors, count = parse_points_file(path, max_errors=2)
+    
+    assert len(points) == 0
+    assert count == 5
+    assert [e.line for e in errors] == [1, 2]
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Потолки памяти бенчмарка: сопоставление правил с именами случаев.
+"""
+
+import os
+
+import pytest
+
+from benchmarks.memory import check_ceilings, load_ceilings, match_pattern, validate_ceilings
+
+
+CEILINGS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "memory_ceilings.json")
+
+
+def test_brackets_match_literally():
+    assert match_pattern("process_points[original]", "process_points[original]")
+    assert match_pattern("process_points[*]", "process_points[min_x]")
+    assert match_pattern("process_points[min_*]", "process_points[min_sum]")
+    assert not match_pattern("process_points[original]", "process_pointso")
+    assert not match_pattern("process_points[min_*]", "process_points[sequential]")
+    assert match_pattern("find_?losest", "find_closest")
+
+
+def test_unknown_rule_is_rejected():
+    with pytest.raises(ValueError):
+        validate_ceilings([{"name": "process_points[nope]"}])
+    with pytest.raises(ValueError):
+        validate_ceilings([{"name": "*", "distribution": "gaussian"}])
+
+
+def test_shipped_ceilings_are_valid():
+    assert load_ceilings(CEILINGS_PATH)
+
+
+def test_check_ceilings_reports_violation():
+    ceilings = [{"name": "process_points[original]", "peak_bytes_per_point": 100, "min_n": 10}]
+    entry = {
+        "name": "process_points[original]", "distribution": "uniform",
+        "n": 100, "peak_bytes": 20000,
+    }
+    
+    violations = check_ceilings([entry, dict(entry, n=5)], ceilings)
+    
+    assert len(violations) == 1
+    assert violations[0]["allowed_bytes"] == 10000
+    assert check_ceilings([dict(entry, name="process_points[min_x]")], ceilings) == []
\ No newline at end of file
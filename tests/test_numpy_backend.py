@@ -0,0 +1,65 @@
+"""
+NumPy-бэкенд ``process_points`` против Python-бэкенда.
+"""
+
+import random
+
+import pytest
+
+from exceptions import EmptyPointsListException
+from points import METHODS, process_points
+from pointset import PointSet
+
+pytest.importorskip("numpy")
+
+
+def both_backends(points, method):
+    expected = [tuple(p) for p in process_points(points, method, backend="python")]
+    actual = [tuple(p) for p in process_points(points, method, backend="numpy").tolist()]
+    return expected, actual
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("seed", range(3))
+def test_random_points_match_python(method, seed):
+    rng = random.Random(seed)
+    points = [(rng.uniform(-50, 50), rng.uniform(-50, 50)) for _ in range(200)]
+    
+    expected, actual = both_backends(points, method)
+    
+    assert actual == expected
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_ties_and_duplicates_match_python(method):
+    points = [(x % 5, x // 5) for x in range(25)] + [(2, 2), (0, 0), (4, 4)]
+    random.Random(4).shuffle(points)
+    
+    expected, actual = both_backends(points, method)
+    
+    assert actual == expected
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_point_set_input_matches_python(method):
+    points = PointSet([(1.5, 2), (-3, 4), (0, 0), (1.5, 2)])
+    
+    expected, actual = both_backends(points, method)
+    
+    assert actual == expected
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_single_point_matches_python(method):
+    expected, actual = both_backends([(3, -7)], method)
+    
+    assert actual == expected
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_empty_input_raises_same_exception(method, backend):
+    with pytest.raises(EmptyPointsListException):
+        process_points([], method, backend=backend)
+    with pytest.raises(EmptyPointsListException):
+        process_points(PointSet(), method, backend=backend)
\ No newline at end of file
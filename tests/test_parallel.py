@@ -0,0 +1,67 @@
+"""
+Многопроцессный поиск соседей против однопроцессного ``find_all_closest``.
+"""
+
+import random
+
+import pytest
+
+import parallel
+from distance import find_all_closest
+from points import process_points
+
+
+def grid_with_duplicates():
+    # Сетка даёт равноудалённых соседей по разные стороны границ частей,
+    # повторы проверяют склейку одинаковых координат
+    points = [(x, y) for x in range(15) for y in range(15)]
+    points += points[::7]
+    random.Random(5).shuffle(points)
+    return points
+
+
+@pytest.mark.parametrize("shards_per_worker", [1, 7])
+def test_sharded_result_matches_single_process(monkeypatch, shards_per_worker):
+    monkeypatch.setattr(parallel, "SHARDS_PER_WORKER", shards_per_worker)
+    points = grid_with_duplicates()
+    
+    assert parallel.find_all_closest_parallel(points, 2) == find_all_closest(points)
+
+
+def test_random_floats_match_single_process(monkeypatch):
+    monkeypatch.setattr(parallel, "SHARDS_PER_WORKER", 5)
+    rng = random.Random(6)
+    points = [(rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(400)]
+    
+    assert parallel.find_all_closest_parallel(points, 3) == find_all_closest(points)
+
+
+def test_degenerate_inputs_have_no_neighbours():
+    assert parallel.find_all_closest_parallel([(1, 1)], 2) == [None]
+    assert parallel.find_all_closest_parallel([(1, 1)] * 5, 2) == [None] * 5
+
+
+def test_small_input_stays_in_process(monkeypatch):
+    def fail(points, workers):
+        raise AssertionError("пул не должен запускаться")
+    
+    monkeypatch.setattr(parallel, "find_all_closest_parallel", fail)
+    points = grid_with_duplicates()[:50]
+    
+    assert process_points(points, "original", workers=4) == process_points(points, "original")
+
+
+def test_large_input_uses_pool(monkeypatch):
+    calls = []
+    original = parallel.find_all_closest_parallel
+    
+    def spy(points, workers):
+        calls.append(workers)
+        return original(points, workers)
+    
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_POINTS", 100)
+    monkeypatch.setattr(parallel, "find_all_closest_parallel", spy)
+    points = grid_with_duplicates()
+    
+    assert process_points(points, "original", workers=2) == process_points(points, "original")
+    assert calls == [2]
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Двоичный формат точек: запись и чтение без потерь.
+"""
+
+import pytest
+
+from exceptions import InvalidPointFileException
+from pointfile import HEADER, is_point_file, load_points, save_points
+from pointset import PointSet
+
+
+def test_round_trip_point_set(tmp_path):
+    path = tmp_path / "points.pnts"
+    points = PointSet([(1.5, -2.0), (0.1, 1e300), (-0.0, 3.0)])
+    
+    assert save_points(path, points) == 3
+    loaded = load_points(path)
+    
+    assert is_point_file(path)
+    assert loaded == points
+    assert loaded.tobytes() == points.tobytes()
+
+
+def test_round_trip_iterator_across_chunks(tmp_path, monkeypatch):
+    import pointfile
+    monkeypatch.setattr(pointfile, "WRITE_CHUNK", 7)
+    path = tmp_path / "stream.pnts"
+    points = [(float(i), float(-i)) for i in range(50)]
+    
+    assert save_points(path, iter(points)) == 50
+    
+    assert load_points(path) == points
+
+
+def test_empty_file_round_trip(tmp_path):
+    path = tmp_path / "empty.pnts"
+    save_points(path, PointSet())
+    
+    assert len(load_points(path)) == 0
+
+
+def test_loaded_set_copies_on_write(tmp_path):
+    path = tmp_path / "points.pnts"
+    save_points(path, PointSet([(1, 2), (3, 4)]))
+    
+    loaded = load_points(path)
+    loaded.append((5, 6))
+    
+    assert load_points(path) == [(1, 2), (3, 4)]
+
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = tmp_path / "points.pnts"
+    save_points(path, PointSet([(1, 2), (3, 4)]))
+    data = path.read_bytes()
+    path.write_bytes(data[:-8])
+    
+    with pytest.raises(InvalidPointFileException):
+        load_points(path)
+
+
+def test_wrong_signature_is_rejected(tmp_path):
+    path = tmp_path / "points.csv"
+    path.write_bytes(b"x" * HEADER.size)
+    
+    assert not is_point_file(path)
+    with pytest.raises(InvalidPointFileException):
+        load_points(path)
\ No newline at end of file
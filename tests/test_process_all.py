@@ -0,0 +1,65 @@
+"""
+``process_all_methods``: общий проход и контракт ``(results, errors)``.
+"""
+
+import random
+
+import pytest
+
+import points as points_module
+from exceptions import EmptyPointsListException
+from points import METHODS, process_all_methods, process_points
+from pointset import PointSet
+
+
+def sample(seed):
+    rng = random.Random(seed)
+    data = [(rng.randint(-20, 20), rng.randint(-20, 20)) for _ in range(150)]
+    return data + data[:10]
+
+
+@pytest.mark.parametrize("make", [list, PointSet])
+@pytest.mark.parametrize("seed", range(3))
+def test_fused_results_match_process_points(make, seed):
+    data = make(sample(seed))
+    
+    results, errors = process_all_methods(data)
+    
+    assert errors == {}
+    assert set(results) == set(METHODS)
+    for method in METHODS:
+        assert results[method] == process_points(data, method), method
+
+
+def test_single_point():
+    results, errors = process_all_methods([(2, 5)])
+    
+    assert errors == {}
+    for method in METHODS:
+        assert results[method] == process_points([(2, 5)], method)
+
+
+def test_empty_input_raises():
+    with pytest.raises(EmptyPointsListException):
+        process_all_methods([])
+
+
+def test_failed_method_keeps_the_others(monkeypatch):
+    def broken_fused(points, workers):
+        raise ValueError("общий проход не удался")
+    
+    def flaky_process_points(points, method, workers=1):
+        if method == "min_x":
+            raise ValueError("min_x сломан")
+        return process_points(points, method)
+    
+    monkeypatch.setattr(points_module, "_process_all_methods_fused", broken_fused)
+    monkeypatch.setattr(points_module, "process_points", flaky_process_points)
+    data = sample(0)
+    
+    results, errors = process_all_methods(data)
+    
+    assert errors == {"min_x": "min_x сломан"}
+    assert set(results) == set(METHODS) - {"min_x"}
+    for method in results:
+        assert results[method] == process_points(data, method)
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+``SessionStore``: TTL, LRU-вытеснение и ленивая загрузка.
+"""
+
+import asyncio
+
+from sessions import SessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class Session:
+    def __init__(self, size=10):
+        self.size = size
+    
+    def nbytes(self):
+        return self.size
+
+
+def test_expired_session_is_dropped_on_access():
+    clock = Clock()
+    store = SessionStore(ttl=10, clock=clock)
+    store[1] = Session()
+    
+    clock.now = 5
+    assert store.get(1) is not None
+    clock.now = 14
+    assert store.get(1) is not None
+    clock.now = 25
+    
+    assert store.get(1) is None
+    assert store.expired == 1
+    assert len(store) == 0
+
+
+def test_sweep_removes_expired_and_recounts_bytes():
+    clock = Clock()
+    store = SessionStore(ttl=10, clock=clock)
+    store[1] = Session(10)
+    clock.now = 8
+    store[2] = Session(20)
+    
+    clock.now = 15
+    store.sweep()
+    
+    assert 1 not in store._sessions
+    assert store.total_bytes == 20
+
+
+def test_least_recently_used_is_evicted_by_count():
+    store = SessionStore(max_sessions=2, clock=Clock())
+    store[1] = Session()
+    store[2] = Session()
+    store.get(1)
+    store[3] = Session()
+    
+    assert store.get(2) is None
+    assert store.get(1) is not None
+    assert store.evicted == 1
+
+
+def test_bytes_budget_keeps_current_session():
+    store = SessionStore(max_bytes=100, clock=Clock())
+    store[1] = Session(60)
+    store[2] = Session(60)
+    
+    assert 1 not in store._sessions
+    assert store.session_bytes(2) == 60
+    
+    # Одна сессия больше бюджета не вытесняет сама себя
+    store[3] = Session(500)
+    assert len(store) == 1
+    assert store.get(3) is not None
+
+
+def test_loader_and_on_access():
+    loaded = Session()
+    accessed = []
+    store = SessionStore(
+        clock=Clock(),
+        loader=lambda user_id: loaded if user_id == 7 else None,
+        on_access=lambda user_id, session: accessed.append(user_id),
+    )
+    
+    assert store.get(7) is loaded
+    assert store.get(7) is loaded
+    assert store.get(8) is None
+    assert store.loaded == 1
+    assert accessed == [7, 7]
+
+
+def test_aget_loads_in_thread_and_remembers_absent_users():
+    calls = []
+    
+    def loader(user_id):
+        calls.append(user_id)
+        return Session() if user_id == 1 else None
+    
+    store = SessionStore(clock=Clock(), loader=loader)
+    
+    assert asyncio.run(store.aget(1)) is not None
+    assert asyncio.run(store.aget(2)) is None
+    # Синхронный get не идёт в loader ни за загруженной, ни за отсутствующей сессией
+    store.get(1)
+    store.get(2)
+    assert calls == [1, 2]
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+``process_points_stream``: число проходов по источнику и источники-файлы.
+"""
+
+import pytest
+
+from exceptions import NonReiterableSourceException
+from pointfile import save_points
+from points import METHODS, process_points, process_points_stream
+
+
+POINTS = [(3, 1), (0, 2), (5, -4), (1, 1), (-2, 7)]
+
+
+class CountingSource:
+    """Переитерируемый источник, считающий проходы по себе."""
+    
+    def __init__(self, points):
+        self.points = points
+        self.passes = 0
+    
+    def __iter__(self):
+        self.passes += 1
+        return iter(self.points)
+
+
+def test_sequential_makes_one_pass_and_wraps_around():
+    source = CountingSource(POINTS)
+    
+    result = list(process_points_stream(source, "sequential"))
+    
+    assert source.passes == 1
+    assert result == process_points(POINTS, "sequential")
+    assert result[-1] == (POINTS[-1][0] + POINTS[0][0], POINTS[-1][1] + POINTS[0][1])
+
+
+def test_sequential_accepts_plain_iterator():
+    assert list(process_points_stream(iter(POINTS), "sequential")) == process_points(POINTS, "sequential")
+
+
+@pytest.mark.parametrize("method", ["min_sum", "min_x"])
+def test_min_methods_make_two_passes(method):
+    source = CountingSource(POINTS)
+    
+    result = list(process_points_stream(source, method))
+    
+    assert source.passes == 2
+    assert result == process_points(POINTS, method)
+
+
+@pytest.mark.parametrize("method", ["min_sum", "min_x"])
+def test_min_methods_reject_plain_iterator(method):
+    with pytest.raises(NonReiterableSourceException):
+        process_points_stream(iter(POINTS), method)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_binary_file_matches_process_points(tmp_path, method):
+    path = tmp_path / "points.pnts"
+    save_points(path, POINTS)
+    
+    assert list(process_points_stream(str(path), method)) == process_points(POINTS, method)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_text_file_matches_process_points(tmp_path, method):
+    path = tmp_path / "points.txt"
+    path.write_text("".join(f"{x},{y}\n" for x, y in POINTS), encoding="utf-8")
+    
+    assert list(process_points_stream(path, method)) == process_points(POINTS, method)
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+Трассировка запросов: вложенные интервалы (spans) с атрибутами.
+
+Интервал открывается через ``tracer.span(name, **attributes)``; текущий
+интервал хранится в ``contextvars``, поэтому вложенность сохраняется и
+внутри асинхронных обработчиков, и между задачами ``asyncio``. Решение о
+записи принимается один раз для корневого интервала с вероятностью
+``sample_rate``: у невыбранных трасс все вложенные интервалы — один общий
+пустой объект без вызовов часов. Завершённые трассы пишутся в JSONL-файл
+(одна строка на интервал) фоновым потоком, так что цикл событий на диск
+не ждёт.
+
+Настройка из окружения: ``TRACE_FILE`` (путь; пусто — выключено) и
+``TRACE_SAMPLE_RATE`` (доля трасс от 0 до 1).
+"""
+
+import contextvars
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+
+# Текущий интервал; _UNSAMPLED — внутри трассы, которую не записываем
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+class _NoopSpan:
+    """Интервал невыбранной трассы: ничего не замеряет и не записывает."""
+    
+    __slots__ = ("_token",)
+    
+    def __init__(self):
+        self._token = None
+    
+    def set(self, key, value):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _UnsampledRoot(_NoopSpan):
+    """Корень невыбранной трассы: помечает контекст, чтобы потомки не бросали жребий."""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        self._token = _current.set(_UNSAMPLED)
+        return self
+    
+    def __exit__(self, *exc_info):
+        _current.reset(self._token)
+        return False
+
+
+_UNSAMPLED = object()
+
+
+class Span:
+    """Записываемый интервал трассы."""
+    
+    __slots__ = (
+        "tracer", "name", "trace_id", "span_id", "parent_id",
+        "attributes", "start", "duration", "error", "_spans", "_token", "_perf",
+    )
+    
+    def __init__(self, tracer, name, parent, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        if parent is None:
+            self.trace_id = f"{random.getrandbits(128):032x}"
+            self.parent_id = None
+            # Завершённые интервалы трассы копятся у корня до его закрытия
+            self._spans = []
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self._spans = parent._spans
+        self.attributes = attributes
+        self.start = None
+        self.duration = None
+        self.error = None
+        self._token = None
+        self._perf = None
+    
+    def set(self, key, value):
+        """Добавляет атрибут, известный только по ходу работы (например, n)."""
+        self.attributes[key] = value
+    
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.start = time.time()
+        self._perf = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._perf
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        self._spans.append(self.to_dict())
+        if self.parent_id is None:
+            self.tracer._export(self._spans)
+        return False
+    
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": self.duration * 1000,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Tracer:
+    """
+    Источник интервалов с выборкой по трассам и экспортом в JSONL.
+    
+    Parameters
+    ----------
+    path : str or None
+        Файл для трасс; без него трассировка выключена
+    sample_rate : float
+        Доля записываемых трасс
+    """
+    
+    def __init__(self, path=None, sample_rate=0.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.exported = 0
+        self._queue = None
+        self._writer = None
+    
+    @property
+    def enabled(self):
+        return bool(self.path) and self.sample_rate > 0
+    
+    def span(self, name, **attributes):
+        """
+        Открывает интервал: ``with tracer.span("process_points", method=m, n=n): ...``.
+        """
+        if not self.enabled:
+            return _NOOP
+        parent = _current.get()
+        if parent is _UNSAMPLED:
+            return _NOOP
+        if parent is None and random.random() >= self.sample_rate:
+            return _UnsampledRoot()
+        return Span(self, name, parent, attributes)
+    
+    def current(self):
+        """Текущий записываемый интервал или None."""
+        span = _current.get()
+        return span if isinstance(span, Span) else None
+    
+    def _export(self, spans):
+        if self._queue is None:
+            self._queue = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+            self._writer.start()
+        self._queue.put(spans)
+    
+    def _write_loop(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                spans = self._queue.get()
+                if spans is None:
+                    break
+                for span in spans:
+                    f.write(json.dumps(span, ensure_ascii=False, default=str) + "\n")
+                self.exported += 1
+                if self._queue.empty():
+                    f.flush()
+    
+    def close(self):
+        """Дописывает накопленные трассы и останавливает поток записи."""
+        if self._queue is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._queue = None
+            self._writer = None
+
+
+# Общий трассировщик процесса
+tracer = Tracer(
+    path=os.getenv("TRACE_FILE") or None,
+    sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0.01")),
+)
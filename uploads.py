@@ -0,0 +1,83 @@
+"""
+Приём файлов с точками, присланных боту документом.
+
+Файл скачивается на диск блоками с проверкой размера на лету, а затем
+разбирается тоже блоками: текст (CSV, TSV, по точке в строке) — через
+``parse_points_file``, двоичный формат — через ``pointfile.load_points``.
+Целиком в памяти оказываются только итоговые точки.
+"""
+
+import httpx
+
+from exceptions import UploadTooLargeException
+from input_data import parse_points_file
+from pointfile import is_point_file, load_points
+
+
+# Облачный Bot API отдаёт через getFile файлы до 20 МБ
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+
+# Размер блока при скачивании и копировании
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+
+async def download_document(bot, document, path, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Скачивает документ из Telegram в файл ``path`` блоками.
+    
+    Raises
+    ------
+    UploadTooLargeException
+        Если документ больше ``max_bytes`` — по заявленному размеру
+        или по факту при скачивании
+    httpx.HTTPError
+        Если скачивание не удалось
+    """
+    if document.file_size and document.file_size > max_bytes:
+        raise UploadTooLargeException(document.file_size, max_bytes)
+    
+    file = await bot.get_file(document.file_id)
+    source = file.file_path
+    written = 0
+    
+    with open(path, "wb") as out:
+        if not source.startswith(("http://", "https://")):
+            # Локальный сервер Bot API отдаёт путь к уже лежащему на диске файлу
+            with open(source, "rb") as f:
+                while chunk := f.read(DOWNLOAD_CHUNK_BYTES):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise UploadTooLargeException(written, max_bytes)
+                    out.write(chunk)
+            return written
+        
+        async with httpx.AsyncClient() as client:
+            async with client.stream("GET", source) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise UploadTooLargeException(written, max_bytes)
+                    out.write(chunk)
+    return written
+
+
+def read_points_upload(path, max_errors=100):
+    """
+    Разбирает скачанный файл в точки.
+    
+    Returns
+    -------
+    tuple
+        ``(PointSet, list[ParseError], int)`` — как у ``parse_points_file``;
+        у двоичного файла ошибок разбора не бывает
+    
+    Raises
+    ------
+    InvalidPointFileException
+        Если файл с сигнатурой двоичного формата повреждён
+    """
+    if is_point_file(path):
+        # Копия отвязывает набор от mmap, чтобы временный файл можно было удалить
+        return load_points(path).copy(), [], 0
+    return parse_points_file(path, max_errors=max_errors)